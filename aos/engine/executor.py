@@ -48,14 +48,6 @@ def execute_task(
     goal_description: str,
     prior_task_outputs: Optional[List[Dict[str, Any]]] = None,
 ) -> Dict[str, Any]:
-    client = _get_api_client()
-    if not client:
-        return {
-            "result": "ANTHROPIC_API_KEY not set — cannot execute task",
-            "summary": "No API key",
-            "error": True,
-        }
-
     system = _build_system_prompt(task.skill_tags)
 
     context_parts = [
@@ -79,6 +71,14 @@ def execute_task(
     )
 
     try:
+        client = _get_api_client()
+        if not client:
+            return {
+                "result": "ANTHROPIC_API_KEY not set — cannot execute task",
+                "summary": "No API key",
+                "error": True,
+            }
+
         response = client.messages.create(
             model="claude-sonnet-4-6",
             system=system,
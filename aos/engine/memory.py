@@ -1,11 +1,11 @@
 from __future__ import annotations
-import json
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
 from .schemas import Goal, Task, MemoryEntry, MemoryType
-from .task_store import create_memory_entry, list_memory
+from .memory_log import get_log
+from .task_store import create_memory_entry, search_memory
 
 MEMORY_FILE = Path(__file__).parent.parent / "artifacts" / "memory.jsonl"
 
@@ -15,9 +15,7 @@ def _now() -> str:
 
 
 def _append_to_file(entry: Dict[str, Any]) -> None:
-    MEMORY_FILE.parent.mkdir(parents=True, exist_ok=True)
-    with MEMORY_FILE.open("a") as f:
-        f.write(json.dumps(entry) + "\n")
+    get_log(MEMORY_FILE).append(entry)
 
 
 def record_goal_success(goal: Goal, tasks: List[Task]) -> MemoryEntry:
@@ -101,16 +99,13 @@ def record_learning(
     return entry
 
 
-def get_relevant_memory(goal_description: str, limit: int = 5) -> List[MemoryEntry]:
-    all_entries = list_memory(limit=100)
-    goal_words = set(goal_description.lower().split())
-    scored = []
-    for entry in all_entries:
-        content_str = json.dumps(entry.content).lower()
-        overlap = sum(1 for w in goal_words if w in content_str)
-        scored.append((overlap, entry))
-    scored.sort(key=lambda x: x[0], reverse=True)
-    return [e for _, e in scored[:limit]]
+def get_relevant_memory(
+    goal_description: str,
+    limit: int = 5,
+    type: Optional[str] = None,
+    tags: Optional[List[str]] = None,
+) -> List[MemoryEntry]:
+    return search_memory(goal_description, limit=limit, type=type, tags=tags)
 
 
 def _classify_goal(description: str) -> str:
@@ -0,0 +1,264 @@
+from __future__ import annotations
+import argparse
+import atexit
+import gzip
+import json
+import logging
+import os
+import queue
+import re
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+MAX_BYTES = int(os.environ.get("AOS_MEMORY_LOG_MAX_BYTES", str(4 * 1024 * 1024)))
+MAX_SEGMENTS = int(os.environ.get("AOS_MEMORY_LOG_MAX_SEGMENTS", "8"))
+MAX_TOTAL_BYTES = int(os.environ.get("AOS_MEMORY_LOG_MAX_TOTAL_BYTES", str(32 * 1024 * 1024)))
+COMPRESS = os.environ.get("AOS_MEMORY_LOG_COMPRESS", "false").lower() in ("1", "true", "yes")
+
+_SEGMENT_RE = re.compile(r"\.(\d{6})\.jsonl(\.gz)?$")
+
+
+def _open_segment(path: Path, mode: str):
+    if path.suffix == ".gz":
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return path.open(mode, encoding="utf-8")
+
+
+class MemoryLog:
+    def __init__(
+        self,
+        path: Path,
+        max_bytes: int = MAX_BYTES,
+        max_segments: int = MAX_SEGMENTS,
+        max_total_bytes: int = MAX_TOTAL_BYTES,
+        compress: bool = COMPRESS,
+    ):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_segments = max(1, max_segments)
+        self.max_total_bytes = max_total_bytes
+        self.compress = compress
+        self._queue: queue.Queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._writer: Optional[threading.Thread] = None
+
+    def segments(self) -> List[Path]:
+        if not self.path.parent.exists():
+            return []
+        stem = self.path.name[: -len(".jsonl")]
+        found = []
+        for p in self.path.parent.glob(f"{stem}.*.jsonl*"):
+            m = _SEGMENT_RE.search(p.name)
+            if m and p.name.startswith(stem + "."):
+                found.append((int(m.group(1)), p))
+        return [p for _, p in sorted(found)]
+
+    def _segment_path(self, seq: int) -> Path:
+        stem = self.path.name[: -len(".jsonl")]
+        suffix = ".jsonl.gz" if self.compress else ".jsonl"
+        return self.path.with_name(f"{stem}.{seq:06d}{suffix}")
+
+    def snapshot_path(self) -> Path:
+        return self.path.with_name(self.path.name[: -len(".jsonl")] + ".snapshot.jsonl.gz")
+
+    @staticmethod
+    def _seq(segment: Path) -> int:
+        return int(_SEGMENT_RE.search(segment.name).group(1))
+
+    def _next_seq(self) -> int:
+        segments = self.segments()
+        return self._seq(segments[-1]) + 1 if segments else 1
+
+    def compacted_segments(self) -> int:
+        segments = self.segments()
+        return self._seq(segments[0]) - 1 if segments else 0
+
+    def append(self, entry: Dict[str, Any]) -> None:
+        with self._lock:
+            if self._writer is None or not self._writer.is_alive():
+                self._writer = threading.Thread(target=self._run, name="aos-memory-log", daemon=True)
+                self._writer.start()
+        self._queue.put(json.dumps(entry))
+
+    def flush(self) -> None:
+        self._queue.join()
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._write(batch)
+            except Exception as exc:
+                logger.warning("Memory log write failed (%d entries): %s", len(batch), exc)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _write(self, lines: List[str]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("a", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+            size = f.tell()
+        if size >= self.max_bytes:
+            self.rotate()
+
+    def rotate(self) -> Optional[Path]:
+        if not self.path.exists() or self.path.stat().st_size == 0:
+            return None
+        target = self._segment_path(self._next_seq())
+        if self.compress:
+            with self.path.open("rb") as src, gzip.open(target, "wb") as dst:
+                dst.writelines(src)
+            self.path.unlink()
+        else:
+            os.replace(self.path, target)
+        self.prune()
+        return target
+
+    def prune(self) -> List[Path]:
+        segments = self.segments()
+        sizes = {seg: seg.stat().st_size for seg in segments}
+        total = sum(sizes.values()) + (self.path.stat().st_size if self.path.exists() else 0)
+        dropped = []
+        while len(segments) > 1 and (
+            len(segments) > self.max_segments or (self.max_total_bytes and total > self.max_total_bytes)
+        ):
+            seg = segments.pop(0)
+            total -= sizes[seg]
+            dropped.append(seg)
+        if not dropped:
+            return []
+        entries = self._snapshot(dropped)
+        for seg in dropped:
+            seg.unlink()
+        logger.info("Compacted %d memory log segment(s) into %s (%d entries): %s..%s",
+                    len(dropped), self.snapshot_path().name, entries, dropped[0].name, dropped[-1].name)
+        return dropped
+
+    def _snapshot(self, segments: List[Path]) -> int:
+        snapshot = self.snapshot_path()
+        tmp = snapshot.with_name(snapshot.name + ".tmp")
+        seen: set = set()
+        written = 0
+        with gzip.open(tmp, "wt", encoding="utf-8") as out:
+            for seg in [snapshot, *segments]:
+                if not seg.exists():
+                    continue
+                for line in _iter_lines(seg):
+                    try:
+                        entry_id = json.loads(line).get("id")
+                    except ValueError:
+                        logger.warning("Skipping corrupt memory log line in %s", seg.name)
+                        continue
+                    if entry_id is not None:
+                        if entry_id in seen:
+                            continue
+                        seen.add(entry_id)
+                    out.write(line + "\n")
+                    written += 1
+        os.replace(tmp, snapshot)
+        return written
+
+    def replay(self) -> Iterator[Dict[str, Any]]:
+        self.flush()
+        for seg in [self.snapshot_path(), *self.segments(), self.path]:
+            if not seg.exists():
+                continue
+            for line in _iter_lines(seg):
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    logger.warning("Skipping corrupt memory log line in %s", seg.name)
+
+
+def _iter_lines(path: Path) -> Iterator[str]:
+    with _open_segment(path, "r") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield line
+
+
+_logs: Dict[str, MemoryLog] = {}
+_logs_lock = threading.Lock()
+
+
+def get_log(path: Path) -> MemoryLog:
+    with _logs_lock:
+        log = _logs.get(str(path))
+        if log is None:
+            log = _logs[str(path)] = MemoryLog(path)
+        return log
+
+
+def flush_all() -> None:
+    with _logs_lock:
+        logs = list(_logs.values())
+    for log in logs:
+        log.flush()
+
+
+atexit.register(flush_all)
+
+
+def replay_into_store(log: MemoryLog, batch_size: int = 1000) -> Dict[str, int]:
+    from .task_store import init_db, restore_memory_entries
+
+    init_db()
+    read = inserted = 0
+    batch: List[Dict[str, Any]] = []
+    for entry in log.replay():
+        read += 1
+        batch.append(entry)
+        if len(batch) >= batch_size:
+            inserted += restore_memory_entries(batch)
+            batch = []
+    if batch:
+        inserted += restore_memory_entries(batch)
+    return {"read": read, "inserted": inserted, "compacted_segments": log.compacted_segments()}
+
+
+def main() -> None:
+    from . import memory, task_store
+
+    parser = argparse.ArgumentParser(
+        description="AOS memory log maintenance",
+        epilog="prune folds the oldest segments into a gzipped snapshot (one record per entry id); "
+        "replay reads the snapshot, then the retained segments, then the active file.",
+    )
+    parser.add_argument("command", choices=["replay", "prune", "rotate", "stats"])
+    parser.add_argument("--log", type=Path, default=memory.MEMORY_FILE)
+    parser.add_argument("--db", type=Path, default=None, help="SQLite task store to replay into")
+    args = parser.parse_args()
+
+    log = get_log(args.log)
+    if args.command == "replay":
+        if args.db:
+            task_store.DB_PATH = args.db
+        print(json.dumps(replay_into_store(log)))
+    elif args.command == "prune":
+        print("\n".join(p.name for p in log.prune()) or "nothing to prune")
+    elif args.command == "rotate":
+        print(log.rotate() or "nothing to rotate")
+    else:
+        files = [log.snapshot_path(), *log.segments(), log.path]
+        print(json.dumps({
+            "segments": [{"file": p.name, "bytes": p.stat().st_size} for p in files if p.exists()],
+            "max_bytes": log.max_bytes,
+            "max_segments": log.max_segments,
+            "max_total_bytes": log.max_total_bytes,
+            "compacted_segments": log.compacted_segments(),
+            "compress": log.compress,
+        }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,15 @@
 from __future__ import annotations
 import logging
-from typing import Dict, List
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Dict, List, Optional
 
 from .schemas import Goal, GoalStatus, Task, TaskStatus
 from .task_store import (
-    create_task, get_goal, get_task,
-    list_tasks, update_goal, update_task, record_metric,
+    claim_task, create_task, get_goal, get_task, get_tasks, list_tasks, reserve_goal_tokens,
+    settle_goal_tokens, unit_of_work, update_goal, update_task, record_metric,
 )
 from .planner import decompose_goal
 from . import executor as _executor_mod
@@ -14,14 +18,55 @@ from .memory import record_goal_success, record_goal_failure, record_learning
 
 logger = logging.getLogger(__name__)
 
+MAX_WORKERS = int(os.environ.get("AOS_MAX_WORKERS", "4"))
+TASK_TOKEN_RESERVATION = int(os.environ.get("AOS_TASK_TOKEN_RESERVATION", "4000"))
 
-def _ready_tasks(tasks: List[Task]) -> List[Task]:
-    complete_ids = {t.id for t in tasks if _is_complete(t)}
-    return [
-        t for t in tasks
-        if t.status == TaskStatus.pending
-        and all(dep in complete_ids for dep in t.depends_on)
-    ]
+
+class TaskClaimedElsewhere(RuntimeError):
+    pass
+
+
+_pools: Dict[int, ThreadPoolExecutor] = {}
+_pools_lock = threading.Lock()
+
+
+def _task_pool(max_workers: int) -> ThreadPoolExecutor:
+    with _pools_lock:
+        pool = _pools.get(max_workers)
+        if pool is None:
+            pool = _pools[max_workers] = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="aos-task")
+        return pool
+
+
+class _TaskGraph:
+    def __init__(self, tasks: List[Task]):
+        self.tasks = sorted(tasks, key=lambda t: t.priority)
+        self.by_id = {t.id: t for t in self.tasks}
+        external = {dep for t in self.tasks for dep in t.depends_on if dep not in self.by_id}
+        self.external = {t.id: t for t in get_tasks(sorted(external))} if external else {}
+        self.in_flight: set = set()
+
+    def _dep(self, task_id: str) -> Optional[Task]:
+        return self.by_id.get(task_id) or self.external.get(task_id)
+
+    def _dep_complete(self, task_id: str) -> bool:
+        dep = self._dep(task_id)
+        return dep is not None and task_id not in self.in_flight and _is_complete(dep)
+
+    def ready(self) -> List[Task]:
+        return [
+            t for t in self.tasks
+            if t.id not in self.in_flight
+            and t.status == TaskStatus.pending
+            and all(self._dep_complete(dep) for dep in t.depends_on)
+        ]
+
+    def prior_outputs(self, task: Task) -> List[Dict]:
+        deps = [self._dep(dep_id) for dep_id in task.depends_on]
+        return [d.output for d in deps if d is not None and d.output]
+
+    def settled(self) -> List[Task]:
+        return [t for t in self.tasks if t.id not in self.in_flight]
 
 
 def _is_complete(task: Task) -> bool:
@@ -32,7 +77,7 @@ def _is_failed(task: Task) -> bool:
     return task.status in (TaskStatus.failed, "failed")
 
 
-def run_goal(goal_id: str) -> Dict:
+def run_goal(goal_id: str, max_workers: Optional[int] = None) -> Dict:
     goal = get_goal(goal_id)
     if not goal:
         return {"error": f"Goal {goal_id} not found"}
@@ -42,83 +87,118 @@ def run_goal(goal_id: str) -> Dict:
 
     tasks = list_tasks(goal_id=goal_id)
     if not tasks:
-        new_tasks = decompose_goal(goal)
-        for task in new_tasks:
-            create_task(task)
-        goal.task_ids = [t.id for t in new_tasks]
-        update_goal(goal)
-        tasks = new_tasks
-
-    max_rounds = 20
-    round_count = 0
+        tasks = decompose_goal(goal)
+        goal.task_ids = [t.id for t in tasks]
+        with unit_of_work():
+            for task in tasks:
+                create_task(task)
+            update_goal(goal)
+
+    graph = _TaskGraph(tasks)
+    stop_reason = _run_dag(goal, graph, max_workers or MAX_WORKERS)
+
+    if all(_is_complete(t) for t in graph.tasks):
+        _finalize_success(goal, graph.tasks)
+    else:
+        failed = [t for t in graph.tasks if _is_failed(t)]
+        reason = stop_reason or f"Tasks failed: {[t.title for t in failed]}"
+        _finalize_failure(goal, graph.tasks, reason)
 
-    while round_count < max_rounds:
-        round_count += 1
-        all_tasks = list_tasks(goal_id=goal_id)
+    return _goal_result(goal, graph.tasks)
 
-        if all(_is_complete(t) for t in all_tasks):
-            break
 
-        if any(_is_failed(t) for t in all_tasks):
-            failed = [t for t in all_tasks if _is_failed(t)]
-            exhausted = [t for t in failed if t.attempts >= t.max_attempts]
-            if exhausted:
-                _finalize_failure(goal, all_tasks, f"{len(exhausted)} task(s) exhausted retries")
-                return _goal_result(goal, all_tasks)
-
-        ready = _ready_tasks(all_tasks)
-        if not ready:
-            all_tasks_fresh = list_tasks(goal_id=goal_id)
-            if all(_is_complete(t) for t in all_tasks_fresh):
-                break
-            blocked = [t for t in all_tasks_fresh if not _is_complete(t) and not _is_failed(t)]
-            logger.warning("No ready tasks but %d not complete — possible dependency cycle", len(blocked))
-            break
-
-        prior_outputs = [
-            get_task(dep_id).output
-            for task in ready
-            for dep_id in task.depends_on
-            if get_task(dep_id) and get_task(dep_id).output
-        ]
+def _run_dag(goal: Goal, graph: _TaskGraph, max_workers: int = MAX_WORKERS) -> Optional[str]:
+    max_workers = max(1, max_workers)
+    reservation = max(0, TASK_TOKEN_RESERVATION)
+    running: Dict[Future, Task] = {}
+    stop_reason: Optional[str] = None
+    over_budget = False
 
-        for task in ready:
-            _execute_and_verify(task, goal.description, prior_outputs)
+    pool = _task_pool(max_workers)
+    while True:
+        settled = graph.settled()
 
-            if goal.tokens_used > goal.budget_tokens:
+        if stop_reason is None:
+            exhausted = [t for t in settled if _is_failed(t) and t.attempts >= t.max_attempts]
+            if exhausted:
+                stop_reason = f"{len(exhausted)} task(s) exhausted retries"
+            elif goal.tokens_used >= goal.budget_tokens:
                 logger.warning("Goal %s exceeded budget (%d tokens)", goal.id, goal.tokens_used)
-                break
-
-            goal = get_goal(goal_id)
-
-    all_tasks = list_tasks(goal_id=goal_id)
-
-    if all(_is_complete(t) for t in all_tasks):
-        _finalize_success(goal, all_tasks)
-    else:
-        failed = [t for t in all_tasks if _is_failed(t)]
-        if failed:
-            _finalize_failure(goal, all_tasks, f"Tasks failed: {[t.title for t in failed]}")
-        else:
-            _finalize_failure(goal, all_tasks, "Goal did not complete within max rounds")
-
-    return _goal_result(get_goal(goal_id), list_tasks(goal_id=goal_id))
-
-
-def _execute_and_verify(task: Task, goal_description: str, prior_outputs: List[Dict]) -> None:
-    task.status = TaskStatus.claimed
-    task.attempts += 1
-    update_task(task)
-
+                stop_reason = "Token budget exhausted"
+                over_budget = True
+
+        if stop_reason is None:
+            for task in graph.ready():
+                if len(running) >= max_workers:
+                    break
+                if not reserve_goal_tokens(goal.id, reservation):
+                    if not running:
+                        logger.warning("Goal %s budget cannot cover another task (%d tokens)", goal.id, goal.tokens_used)
+                        stop_reason = "Token budget exhausted"
+                        over_budget = True
+                    break
+                future = pool.submit(_execute_and_verify, task, goal.description, graph.prior_outputs(task), reservation)
+                running[future] = task
+                graph.in_flight.add(task.id)
+
+        if not running:
+            blocked = [t for t in settled if not _is_complete(t) and not _is_failed(t)]
+            elsewhere = [t for t in blocked if t.status in (TaskStatus.claimed, "claimed")]
+            if stop_reason is None and elsewhere:
+                stop_reason = f"{len(elsewhere)} task(s) claimed by another run"
+            elif stop_reason is None and blocked:
+                logger.warning("No ready tasks but %d not complete — possible dependency cycle", len(blocked))
+                stop_reason = f"{len(blocked)} task(s) blocked on unmet dependencies"
+            if over_budget:
+                stop_reason = f"{stop_reason} ({goal.tokens_used}/{goal.budget_tokens} tokens)"
+            return stop_reason
+
+        done, _ = wait(running, return_when=FIRST_COMPLETED)
+        for future in done:
+            task = running.pop(future)
+            graph.in_flight.discard(task.id)
+            try:
+                goal.tokens_used = max(goal.tokens_used, future.result())
+            except TaskClaimedElsewhere:
+                logger.info("Task %s is claimed by another run", task.id)
+                _adopt_stored(task)
+            except Exception as exc:
+                logger.exception("Task %s raised during execution", task.id)
+                _mark_failed(task, exc, reservation)
+
+
+def _adopt_stored(task: Task) -> None:
+    stored = get_task(task.id)
+    if stored is None:
+        task.status = TaskStatus.failed
+        task.error = "Task no longer exists"
+        return
+    task.status, task.attempts = stored.status, stored.attempts
+    task.output, task.error, task.tokens_used = stored.output, stored.error, stored.tokens_used
+
+
+def _mark_failed(task: Task, exc: Exception, reservation: int) -> None:
+    task.status = TaskStatus.failed
+    task.error = f"Execution error: {type(exc).__name__}: {exc}"
+    try:
+        with unit_of_work():
+            settle_goal_tokens(task.goal_id, reservation, 0)
+            update_task(task)
+            record_metric("task_failed", 1)
+    except Exception:
+        logger.exception("Could not record failure for task %s", task.id)
+
+
+def _execute_and_verify(task: Task, goal_description: str, prior_outputs: List[Dict], reservation: int = 0) -> int:
+    if not claim_task(task):
+        settle_goal_tokens(task.goal_id, reservation, 0)
+        raise TaskClaimedElsewhere(task.id)
+
+    started = time.perf_counter()
     output = _executor_mod.execute_task(task, goal_description, prior_outputs or [])
     tokens = output.pop("_tokens", 0)
     task.tokens_used = tokens
 
-    goal = get_goal(task.goal_id)
-    if goal:
-        goal.tokens_used = (goal.tokens_used or 0) + tokens
-        update_goal(goal)
-
     verification = verify_task_output(task.description, task.verification_plan, output)
     task.evidence.append({
         "type": "execution",
@@ -127,11 +207,12 @@ def _execute_and_verify(task: Task, goal_description: str, prior_outputs: List[D
     })
 
     v_passed = verification.get("passed") or (verification.get("score", 0) >= 0.6)
+    metric = None
     if v_passed:
         task.output = output
         task.status = TaskStatus.complete
         task.error = None
-        record_metric("task_complete", 1)
+        metric = "task_complete"
     elif task.attempts < task.max_attempts:
         task.status = TaskStatus.pending
         task.error = f"Verification failed: {verification.get('issues')}"
@@ -139,38 +220,47 @@ def _execute_and_verify(task: Task, goal_description: str, prior_outputs: List[D
         task.output = output
         task.status = TaskStatus.failed
         task.error = f"Verification failed after {task.attempts} attempts: {verification.get('issues')}"
-        record_metric("task_failed", 1)
+        metric = "task_failed"
 
-    update_task(task)
+    with unit_of_work():
+        goal_tokens = settle_goal_tokens(task.goal_id, reservation, tokens)
+        update_task(task)
+        if metric:
+            record_metric(metric, 1)
+        record_metric("task_latency_ms", (time.perf_counter() - started) * 1000)
+        record_metric("task_tokens", tokens)
+    return goal_tokens
 
 
 def _finalize_success(goal: Goal, tasks: List[Task]) -> None:
-    outputs = {t.title: t.output.get("summary", "") for t in tasks}
-    goal.status = GoalStatus.complete
-    goal.result = {
-        "status": "complete",
-        "tasks_completed": len(tasks),
-        "outputs": outputs,
-    }
-    goal.evidence.append({"type": "completion", "task_count": len(tasks)})
-    update_goal(goal)
-    record_goal_success(goal, tasks)
-    record_learning(
-        what_worked=f"Decomposed into {len(tasks)} tasks, all completed",
-        what_failed=None,
-        improvement_candidate=None,
-        goal_id=goal.id,
-    )
-    record_metric("goal_complete", 1)
-    record_metric("tokens_per_goal", goal.tokens_used)
+    with unit_of_work():
+        outputs = {t.title: t.output.get("summary", "") for t in tasks}
+        goal.status = GoalStatus.complete
+        goal.result = {
+            "status": "complete",
+            "tasks_completed": len(tasks),
+            "outputs": outputs,
+        }
+        goal.evidence.append({"type": "completion", "task_count": len(tasks)})
+        update_goal(goal)
+        record_goal_success(goal, tasks)
+        record_learning(
+            what_worked=f"Decomposed into {len(tasks)} tasks, all completed",
+            what_failed=None,
+            improvement_candidate=None,
+            goal_id=goal.id,
+        )
+        record_metric("goal_complete", 1)
+        record_metric("tokens_per_goal", goal.tokens_used)
 
 
 def _finalize_failure(goal: Goal, tasks: List[Task], reason: str) -> None:
-    goal.status = GoalStatus.failed
-    goal.result = {"status": "failed", "reason": reason}
-    update_goal(goal)
-    record_goal_failure(goal, tasks, reason)
-    record_metric("goal_failed", 1)
+    with unit_of_work():
+        goal.status = GoalStatus.failed
+        goal.result = {"status": "failed", "reason": reason}
+        update_goal(goal)
+        record_goal_failure(goal, tasks, reason)
+        record_metric("goal_failed", 1)
 
 
 def _goal_result(goal: Goal, tasks: List[Task]) -> Dict:
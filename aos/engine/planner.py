@@ -1,9 +1,9 @@
 from __future__ import annotations
 import json
 import logging
-import os
 from typing import List
 
+from core.llm_client import get_client
 from .schemas import Goal, Task, RiskLevel
 
 logger = logging.getLogger(__name__)
@@ -62,28 +62,27 @@ The JSON must contain a "result" key with the primary output and a "summary" key
 
 
 def _get_api_client():
-    api_key = os.environ.get("ANTHROPIC_API_KEY")
-    if not api_key:
-        return None
-    from anthropic import Anthropic
-    return Anthropic(api_key=api_key)
+    return get_client()
 
 
-def decompose_goal(goal: Goal) -> List[Task]:
-    client = _get_api_client()
-    if not client:
-        task = Task(
-            goal_id=goal.id,
-            title="Execute goal directly",
-            description=goal.description,
-            skill_tags=["revenue_intel"],
-            priority=1,
-            risk_level=RiskLevel.low,
-            verification_plan="output must be non-empty with result key",
-        )
-        return [task]
+def _direct_task(goal: Goal) -> Task:
+    return Task(
+        goal_id=goal.id,
+        title="Execute goal directly",
+        description=goal.description,
+        skill_tags=["revenue_intel"],
+        priority=1,
+        risk_level=RiskLevel.low,
+        verification_plan="output must be non-empty with result key",
+    )
+
 
+def decompose_goal(goal: Goal) -> List[Task]:
     try:
+        client = _get_api_client()
+        if not client:
+            return [_direct_task(goal)]
+
         response = client.messages.create(
             model="claude-sonnet-4-6",
             system=PLANNER_SYSTEM,
@@ -126,13 +125,4 @@ def decompose_goal(goal: Goal) -> List[Task]:
 
     except Exception as exc:
         logger.warning("Planner decomposition failed: %s", exc)
-        task = Task(
-            goal_id=goal.id,
-            title="Execute goal directly",
-            description=goal.description,
-            skill_tags=["revenue_intel"],
-            priority=1,
-            risk_level=RiskLevel.low,
-            verification_plan="output must be non-empty with result key",
-        )
-        return [task]
+        return [_direct_task(goal)]
@@ -1,6 +1,9 @@
 from __future__ import annotations
 import json
+import logging
+import re
 import sqlite3
+import threading
 from contextlib import contextmanager
 from datetime import datetime, timezone
 from pathlib import Path
@@ -10,24 +13,90 @@ from .schemas import Goal, GoalStatus, Task, TaskStatus, MemoryEntry, MemoryType
 
 DB_PATH = Path(__file__).parent.parent / "engine" / "aos.db"
 
+logger = logging.getLogger(__name__)
+
+_TERM_RE = re.compile(r"\w+")
+_MAX_QUERY_TERMS = 32
+_memory_index: dict = {}
+
+MEMORY_INDEX_SQL = """
+    CREATE VIRTUAL TABLE IF NOT EXISTS memory_fts USING fts5(
+        body, tags, tokenize = 'porter unicode61'
+    );
+
+    CREATE TRIGGER IF NOT EXISTS trg_memory_fts_insert AFTER INSERT ON memory_entries BEGIN
+        INSERT INTO memory_fts (rowid, body, tags) VALUES (
+            NEW.rowid,
+            (SELECT group_concat(value, ' ') FROM json_tree(NEW.content) WHERE type = 'text'),
+            (SELECT group_concat(value, ' ') FROM json_each(NEW.tags))
+        );
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_memory_fts_delete AFTER DELETE ON memory_entries BEGIN
+        DELETE FROM memory_fts WHERE rowid = OLD.rowid;
+    END;
+"""
+
+_BUCKET_SQL = "substr(recorded_at, 1, 13) || ':00:00+00:00'"
+
 
 def _now() -> str:
     return datetime.now(timezone.utc).isoformat()
 
 
-@contextmanager
-def _conn():
-    con = sqlite3.connect(str(DB_PATH))
+_local = threading.local()
+
+
+def _connection() -> sqlite3.Connection:
+    path = str(DB_PATH)
+    con = getattr(_local, "con", None)
+    if con is not None and _local.path == path:
+        return con
+    if con is not None:
+        con.close()
+    con = sqlite3.connect(path, timeout=10, cached_statements=256)
     con.execute("PRAGMA journal_mode=WAL")
+    con.execute("PRAGMA synchronous=NORMAL")
     con.row_factory = sqlite3.Row
+    _local.con, _local.path, _local.depth = con, path, 0
+    return con
+
+
+def close_connection() -> None:
+    con = getattr(_local, "con", None)
+    if con is not None:
+        con.close()
+        _local.con = None
+
+
+@contextmanager
+def _conn():
+    con = _connection()
+    if _local.depth:
+        yield con
+        return
     try:
         yield con
         con.commit()
     except Exception:
         con.rollback()
         raise
+
+
+@contextmanager
+def unit_of_work():
+    con = _connection()
+    _local.depth += 1
+    try:
+        yield con
+        if _local.depth == 1:
+            con.commit()
+    except Exception:
+        if _local.depth == 1:
+            con.rollback()
+        raise
     finally:
-        con.close()
+        _local.depth -= 1
 
 
 def init_db() -> None:
@@ -44,7 +113,8 @@ def init_db() -> None:
                 evidence TEXT NOT NULL DEFAULT '[]',
                 tokens_used INTEGER NOT NULL DEFAULT 0,
                 budget_tokens INTEGER NOT NULL DEFAULT 50000,
-                task_ids TEXT NOT NULL DEFAULT '[]'
+                task_ids TEXT NOT NULL DEFAULT '[]',
+                tokens_reserved INTEGER NOT NULL DEFAULT 0
             );
 
             CREATE TABLE IF NOT EXISTS tasks (
@@ -86,10 +156,129 @@ def init_db() -> None:
                 recorded_at TEXT NOT NULL
             );
 
+            CREATE TABLE IF NOT EXISTS metric_rollups (
+                name TEXT NOT NULL,
+                bucket TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                sum REAL NOT NULL,
+                min REAL NOT NULL,
+                max REAL NOT NULL,
+                PRIMARY KEY (name, bucket)
+            );
+
+            CREATE TABLE IF NOT EXISTS counters (
+                name TEXT PRIMARY KEY,
+                value REAL NOT NULL DEFAULT 0
+            );
+
             CREATE INDEX IF NOT EXISTS idx_tasks_goal ON tasks(goal_id);
             CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks(status);
             CREATE INDEX IF NOT EXISTS idx_memory_type ON memory_entries(type);
+
+            CREATE TRIGGER IF NOT EXISTS trg_goals_insert AFTER INSERT ON goals BEGIN
+                INSERT OR IGNORE INTO counters (name) VALUES ('goals.' || NEW.status);
+                UPDATE counters SET value = value + 1 WHERE name IN ('goals', 'goals.' || NEW.status);
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS trg_goals_status AFTER UPDATE OF status ON goals
+            WHEN OLD.status IS NOT NEW.status BEGIN
+                INSERT OR IGNORE INTO counters (name) VALUES ('goals.' || NEW.status);
+                UPDATE counters SET value = value - 1 WHERE name = 'goals.' || OLD.status;
+                UPDATE counters SET value = value + 1 WHERE name = 'goals.' || NEW.status;
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS trg_goals_delete AFTER DELETE ON goals BEGIN
+                UPDATE counters SET value = value - 1 WHERE name IN ('goals', 'goals.' || OLD.status);
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS trg_tasks_insert AFTER INSERT ON tasks BEGIN
+                INSERT OR IGNORE INTO counters (name) VALUES ('tasks.' || NEW.status);
+                UPDATE counters SET value = value + 1 WHERE name IN ('tasks', 'tasks.' || NEW.status);
+                UPDATE counters SET value = value + NEW.tokens_used WHERE name = 'tokens';
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS trg_tasks_status AFTER UPDATE OF status ON tasks
+            WHEN OLD.status IS NOT NEW.status BEGIN
+                INSERT OR IGNORE INTO counters (name) VALUES ('tasks.' || NEW.status);
+                UPDATE counters SET value = value - 1 WHERE name = 'tasks.' || OLD.status;
+                UPDATE counters SET value = value + 1 WHERE name = 'tasks.' || NEW.status;
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS trg_tasks_tokens AFTER UPDATE OF tokens_used ON tasks
+            WHEN OLD.tokens_used IS NOT NEW.tokens_used BEGIN
+                UPDATE counters SET value = value + NEW.tokens_used - OLD.tokens_used WHERE name = 'tokens';
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS trg_tasks_delete AFTER DELETE ON tasks BEGIN
+                UPDATE counters SET value = value - 1 WHERE name IN ('tasks', 'tasks.' || OLD.status);
+                UPDATE counters SET value = value - OLD.tokens_used WHERE name = 'tokens';
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS trg_memory_insert AFTER INSERT ON memory_entries BEGIN
+                UPDATE counters SET value = value + 1 WHERE name = 'memory_entries';
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS trg_memory_delete AFTER DELETE ON memory_entries BEGIN
+                UPDATE counters SET value = value - 1 WHERE name = 'memory_entries';
+            END;
         """)
+        if "tokens_reserved" not in {r[1] for r in con.execute("PRAGMA table_info(goals)")}:
+            con.execute("ALTER TABLE goals ADD COLUMN tokens_reserved INTEGER NOT NULL DEFAULT 0")
+        con.execute("UPDATE goals SET tokens_reserved = 0 WHERE tokens_reserved != 0")
+        if not con.execute("SELECT 1 FROM counters WHERE name = 'goals'").fetchone():
+            _rebuild_counters(con)
+        _init_memory_index(con)
+        if not con.execute("SELECT 1 FROM metric_rollups LIMIT 1").fetchone():
+            con.execute(f"""
+                INSERT INTO metric_rollups (name, bucket, count, sum, min, max)
+                SELECT name, {_BUCKET_SQL}, COUNT(*), SUM(value), MIN(value), MAX(value)
+                FROM metrics GROUP BY 1, 2
+            """)
+
+
+def _init_memory_index(con: sqlite3.Connection) -> None:
+    try:
+        con.executescript(MEMORY_INDEX_SQL)
+    except sqlite3.OperationalError as exc:
+        logger.warning("FTS5 unavailable, memory search falls back to a scan: %s", exc)
+        _memory_index[str(DB_PATH)] = False
+        return
+    if not con.execute("SELECT 1 FROM memory_fts LIMIT 1").fetchone():
+        con.execute("""
+            INSERT INTO memory_fts (rowid, body, tags)
+            SELECT
+                m.rowid,
+                (SELECT group_concat(value, ' ') FROM json_tree(m.content) WHERE type = 'text'),
+                (SELECT group_concat(value, ' ') FROM json_each(m.tags))
+            FROM memory_entries m
+        """)
+    _memory_index[str(DB_PATH)] = True
+
+
+def _has_memory_index(con: sqlite3.Connection) -> bool:
+    path = str(DB_PATH)
+    if path not in _memory_index:
+        _memory_index[path] = bool(con.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'memory_fts'"
+        ).fetchone())
+    return _memory_index[path]
+
+
+def _rebuild_counters(con: sqlite3.Connection) -> None:
+    con.execute("DELETE FROM counters")
+    con.execute("""
+        INSERT INTO counters (name, value)
+        SELECT 'goals', COUNT(*) FROM goals
+        UNION ALL SELECT 'goals.' || status, COUNT(*) FROM goals GROUP BY status
+        UNION ALL SELECT 'tasks', COUNT(*) FROM tasks
+        UNION ALL SELECT 'tasks.' || status, COUNT(*) FROM tasks GROUP BY status
+        UNION ALL SELECT 'tokens', COALESCE(SUM(tokens_used), 0) FROM tasks
+        UNION ALL SELECT 'memory_entries', COUNT(*) FROM memory_entries
+    """)
+
+
+def _bucket(ts: str) -> str:
+    return ts[:13] + ":00:00+00:00"
 
 
 def _goal_from_row(row: sqlite3.Row) -> Goal:
@@ -183,6 +372,27 @@ def update_goal(goal: Goal) -> None:
         )
 
 
+def reserve_goal_tokens(goal_id: str, tokens: int) -> bool:
+    with _conn() as con:
+        cur = con.execute(
+            """UPDATE goals SET tokens_reserved = tokens_reserved + ?, updated_at = ?
+               WHERE id = ? AND tokens_used + tokens_reserved + ? <= budget_tokens""",
+            (tokens, _now(), goal_id, tokens),
+        )
+        return cur.rowcount == 1
+
+
+def settle_goal_tokens(goal_id: str, reserved: int, tokens: int) -> int:
+    with _conn() as con:
+        con.execute(
+            """UPDATE goals SET tokens_used = tokens_used + ?,
+               tokens_reserved = max(tokens_reserved - ?, 0), updated_at = ? WHERE id = ?""",
+            (tokens, reserved, _now(), goal_id),
+        )
+        row = con.execute("SELECT tokens_used FROM goals WHERE id = ?", (goal_id,)).fetchone()
+    return row[0] if row else 0
+
+
 def create_task(task: Task) -> Task:
     with _conn() as con:
         con.execute(
@@ -211,6 +421,20 @@ def get_task(task_id: str) -> Optional[Task]:
     return _task_from_row(row) if row else None
 
 
+def get_tasks(task_ids: List[str]) -> List[Task]:
+    found = {}
+    ids = list(dict.fromkeys(task_ids))
+    with _conn() as con:
+        for i in range(0, len(ids), 500):
+            chunk = ids[i:i + 500]
+            rows = con.execute(
+                f"SELECT * FROM tasks WHERE id IN ({','.join('?' * len(chunk))})", chunk
+            ).fetchall()
+            for row in rows:
+                found[row["id"]] = _task_from_row(row)
+    return [found[t] for t in ids if t in found]
+
+
 def list_tasks(goal_id: Optional[str] = None, status: Optional[str] = None) -> List[Task]:
     with _conn() as con:
         if goal_id and status:
@@ -233,6 +457,22 @@ def list_tasks(goal_id: Optional[str] = None, status: Optional[str] = None) -> L
     return [_task_from_row(r) for r in rows]
 
 
+def claim_task(task: Task) -> bool:
+    task.updated_at = _now()
+    with _conn() as con:
+        cur = con.execute(
+            """UPDATE tasks SET status='claimed', attempts=attempts+1, updated_at=?
+               WHERE id=? AND status='pending'""",
+            (task.updated_at, task.id),
+        )
+        if cur.rowcount != 1:
+            return False
+        row = con.execute("SELECT attempts FROM tasks WHERE id = ?", (task.id,)).fetchone()
+    task.status = TaskStatus.claimed
+    task.attempts = row[0]
+    return True
+
+
 def update_task(task: Task) -> None:
     task.updated_at = _now()
     with _conn() as con:
@@ -264,6 +504,36 @@ def create_memory_entry(entry: MemoryEntry) -> MemoryEntry:
     return entry
 
 
+def restore_memory_entries(entries: List[dict]) -> int:
+    rows = [
+        (
+            e["id"], e["type"], json.dumps(e.get("content") or {}), json.dumps(e.get("tags") or []),
+            e["created_at"], e.get("source_task_id"), e.get("source_goal_id"),
+        )
+        for e in entries
+    ]
+    with _conn() as con:
+        cur = con.executemany(
+            """INSERT OR IGNORE INTO memory_entries (id, type, content, tags, created_at,
+               source_task_id, source_goal_id)
+               VALUES (?, ?, ?, ?, ?, ?, ?)""",
+            rows,
+        )
+        return max(cur.rowcount, 0)
+
+
+def _memory_from_row(r: sqlite3.Row) -> MemoryEntry:
+    return MemoryEntry(
+        id=r["id"],
+        type=MemoryType(r["type"]),
+        content=json.loads(r["content"]),
+        tags=json.loads(r["tags"]),
+        created_at=r["created_at"],
+        source_task_id=r["source_task_id"],
+        source_goal_id=r["source_goal_id"],
+    )
+
+
 def list_memory(type: Optional[str] = None, limit: int = 50) -> List[MemoryEntry]:
     with _conn() as con:
         if type:
@@ -275,51 +545,94 @@ def list_memory(type: Optional[str] = None, limit: int = 50) -> List[MemoryEntry
             rows = con.execute(
                 "SELECT * FROM memory_entries ORDER BY created_at DESC LIMIT ?", (limit,)
             ).fetchall()
-    return [
-        MemoryEntry(
-            id=r["id"],
-            type=MemoryType(r["type"]),
-            content=json.loads(r["content"]),
-            tags=json.loads(r["tags"]),
-            created_at=r["created_at"],
-            source_task_id=r["source_task_id"],
-            source_goal_id=r["source_goal_id"],
-        )
-        for r in rows
-    ]
+    return [_memory_from_row(r) for r in rows]
+
+
+def search_memory(
+    query: str,
+    limit: int = 5,
+    type: Optional[str] = None,
+    tags: Optional[List[str]] = None,
+) -> List[MemoryEntry]:
+    terms = list(dict.fromkeys(t.lower() for t in _TERM_RE.findall(query or "")))[:_MAX_QUERY_TERMS]
+    filters, params = [], []
+    if type:
+        filters.append("m.type = ?")
+        params.append(type)
+    if tags:
+        filters.append(f"EXISTS (SELECT 1 FROM json_each(m.tags) WHERE value IN ({','.join('?' * len(tags))}))")
+        params.extend(tags)
+    where = "".join(f" AND {f}" for f in filters)
+
+    with _conn() as con:
+        if not terms:
+            rows = con.execute(
+                f"SELECT m.* FROM memory_entries m WHERE 1=1{where} ORDER BY m.created_at DESC LIMIT ?",
+                (*params, limit),
+            ).fetchall()
+            return [_memory_from_row(r) for r in rows]
+        if _has_memory_index(con):
+            rows = con.execute(
+                f"""SELECT m.* FROM memory_fts f JOIN memory_entries m ON m.rowid = f.rowid
+                    WHERE memory_fts MATCH ?{where} ORDER BY f.rank LIMIT ?""",
+                (" OR ".join(f'"{t}"' for t in terms), *params, limit),
+            ).fetchall()
+            return [_memory_from_row(r) for r in rows]
+        rows = con.execute(f"SELECT m.* FROM memory_entries m WHERE 1=1{where}", params).fetchall()
+
+    scored = []
+    for r in rows:
+        text = r["content"].lower()
+        overlap = sum(1 for t in terms if t in text)
+        if overlap:
+            scored.append((overlap, r["created_at"], r))
+    scored.sort(key=lambda x: (x[0], x[1]), reverse=True)
+    return [_memory_from_row(r) for _, _, r in scored[:limit]]
 
 
 def record_metric(name: str, value: float) -> None:
     with _conn() as con:
         con.execute(
-            "INSERT INTO metrics (name, value, recorded_at) VALUES (?, ?, ?)",
-            (name, value, _now()),
+            """INSERT INTO metric_rollups (name, bucket, count, sum, min, max)
+               VALUES (?, ?, 1, ?, ?, ?)
+               ON CONFLICT (name, bucket) DO UPDATE SET
+                   count = count + 1,
+                   sum = sum + excluded.sum,
+                   min = MIN(min, excluded.min),
+                   max = MAX(max, excluded.max)""",
+            (name, _bucket(_now()), value, value, value),
         )
 
 
+def get_metric_series(name: str, since: Optional[str] = None) -> List[dict]:
+    with _conn() as con:
+        rows = con.execute(
+            """SELECT bucket, count, sum, min, max FROM metric_rollups
+               WHERE name = ? AND bucket >= ? ORDER BY bucket ASC""",
+            (name, _bucket(since) if since else ""),
+        ).fetchall()
+    return [
+        {
+            "bucket": r["bucket"],
+            "count": r["count"],
+            "sum": r["sum"],
+            "avg": r["sum"] / r["count"] if r["count"] else 0,
+            "min": r["min"],
+            "max": r["max"],
+        }
+        for r in rows
+    ]
+
+
 def get_metrics_summary() -> dict:
     with _conn() as con:
-        total_goals = con.execute("SELECT COUNT(*) FROM goals").fetchone()[0]
-        complete_goals = con.execute(
-            "SELECT COUNT(*) FROM goals WHERE status='complete'"
-        ).fetchone()[0]
-        total_tasks = con.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
-        complete_tasks = con.execute(
-            "SELECT COUNT(*) FROM tasks WHERE status='complete'"
-        ).fetchone()[0]
-        failed_tasks = con.execute(
-            "SELECT COUNT(*) FROM tasks WHERE status='failed'"
-        ).fetchone()[0]
-        total_tokens = con.execute(
-            "SELECT COALESCE(SUM(tokens_used), 0) FROM tasks"
-        ).fetchone()[0]
-        memory_count = con.execute("SELECT COUNT(*) FROM memory_entries").fetchone()[0]
+        counters = {r["name"]: r["value"] for r in con.execute("SELECT name, value FROM counters")}
     return {
-        "goals_total": total_goals,
-        "goals_complete": complete_goals,
-        "tasks_total": total_tasks,
-        "tasks_complete": complete_tasks,
-        "tasks_failed": failed_tasks,
-        "tokens_total": total_tokens,
-        "memory_entries": memory_count,
+        "goals_total": int(counters.get("goals", 0)),
+        "goals_complete": int(counters.get("goals.complete", 0)),
+        "tasks_total": int(counters.get("tasks", 0)),
+        "tasks_complete": int(counters.get("tasks.complete", 0)),
+        "tasks_failed": int(counters.get("tasks.failed", 0)),
+        "tokens_total": int(counters.get("tokens", 0)),
+        "memory_entries": int(counters.get("memory_entries", 0)),
     }
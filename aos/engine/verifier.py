@@ -1,8 +1,9 @@
 from __future__ import annotations
 import logging
-import os
 from typing import Any, Dict, Optional
 
+from core.llm_client import get_client
+
 logger = logging.getLogger(__name__)
 
 
@@ -39,13 +40,10 @@ def _llm_verify(
     verification_plan: str,
     output: Dict[str, Any],
 ) -> Dict[str, Any]:
-    api_key = os.environ.get("ANTHROPIC_API_KEY")
-    if not api_key:
-        return {"passed": True, "score": 0.7, "issues": [], "method": "skipped_no_key"}
-
     try:
-        from anthropic import Anthropic
-        client = Anthropic(api_key=api_key)
+        client = get_client()
+        if client is None:
+            return {"passed": True, "score": 0.7, "issues": [], "method": "skipped_no_key"}
 
         preview_parts = []
         if "summary" in output:
@@ -1,4 +1,11 @@
-from fastapi import APIRouter, HTTPException
+import base64
+import json
+import os
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request
+from core.columnar import accepts_columnar, columnar_response, query_columnar
 from core.db import query, query_one
 
 router = APIRouter(prefix="/api")
@@ -15,63 +22,238 @@ def account_names():
     return [{"id": r["account_id"], "name": r["account_name"], "health": r.get("health_band")} for r in rows]
 
 
+ACCOUNT_COLUMNS = (
+    "account_id", "account_name", "segment", "country", "owner_ae", "plan", "renewal_date",
+    "current_arr_eur", "health_score", "health_band", "days_to_renewal", "usage_drop_ratio",
+    "tickets_high", "unpaid_invoices", "primary_risk_driver",
+)
+
+ACCOUNT_SORTS: dict[str, tuple[str, ...]] = {
+    "risk": ("coalesce(health_score, 'infinity'::DOUBLE)", "-current_arr_eur", "account_id"),
+    "arr": ("-current_arr_eur", "account_id"),
+    "renewal": ("coalesce(days_to_renewal, 9223372036854775807)", "account_id"),
+    "name": ("lower(account_name)", "account_id"),
+}
+
+ACCOUNTS_PAGE = 100
+ACCOUNTS_MAX_PAGE = 1000
+
+
+def _encode_cursor(sort: str, keys: list) -> str:
+    raw = json.dumps([sort, keys], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str, sort: str) -> list:
+    try:
+        cursor_sort, keys = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if cursor_sort != sort or len(keys) != len(ACCOUNT_SORTS[sort]):
+        raise HTTPException(status_code=400, detail="Cursor does not match sort order")
+    return keys
+
+
 @router.get("/accounts")
-def list_accounts():
-    return query("""
-        SELECT
-            ao.account_id
-          , ao.account_name
-          , ao.segment
-          , ao.country
-          , ao.owner_ae
-          , ao.plan
-          , ao.renewal_date
-          , ao.current_arr_eur
-          , h.health_score
-          , h.health_band
-          , h.days_to_renewal
-          , h.usage_drop_ratio
-          , h.tickets_high
-          , h.unpaid_invoices
-          , ae.primary_risk_driver
-        FROM ai_dm_account_overview ao
-        JOIN ai_fct_account_health_score h ON ao.account_id = h.account_id
-        JOIN ai_arr_exposure ae ON ao.account_id = ae.account_id
-        ORDER BY h.health_score ASC, ao.current_arr_eur DESC NULLS LAST
-    """)
+def list_accounts(
+    request: Request,
+    limit: int = Query(ACCOUNTS_PAGE, ge=1, le=ACCOUNTS_MAX_PAGE),
+    cursor: Optional[str] = None,
+    sort: str = "risk",
+    segment: list[str] = Query([]),
+    band: list[str] = Query([]),
+    owner: list[str] = Query([]),
+    renewal_within: Optional[int] = Query(None, ge=0),
+    q: Optional[str] = None,
+    columns: Optional[str] = None,
+    include_total: bool = False,
+):
+    if sort not in ACCOUNT_SORTS:
+        raise HTTPException(status_code=400, detail=f"Unknown sort: {sort}")
+    selected = ACCOUNT_COLUMNS
+    if columns:
+        requested = [c.strip() for c in columns.split(",") if c.strip()]
+        unknown = [c for c in requested if c not in ACCOUNT_COLUMNS]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown columns: {', '.join(unknown)}")
+        selected = ("account_id", *(c for c in requested if c != "account_id"))
+
+    where = ["current_arr_eur IS NOT NULL"]
+    params: dict = {}
+    for name, column, values in (("segment", "segment", segment), ("band", "health_band", band), ("owner", "owner_ae", owner)):
+        if values:
+            where.append(f"list_contains(${name}, {column})")
+            params[name] = values
+    if renewal_within is not None:
+        where.append("days_to_renewal BETWEEN 0 AND $renewal_within")
+        params["renewal_within"] = renewal_within
+    if q and q.strip():
+        where.append("contains(lower(account_name), lower($q))")
+        params["q"] = q.strip()
+
+    total = None
+    if include_total:
+        total = query(f"SELECT count(*) AS n FROM ai_account_snapshot WHERE {' AND '.join(where)}", params)[0]["n"]
+
+    keys = ACCOUNT_SORTS[sort]
+    if cursor:
+        values = _decode_cursor(cursor, sort)
+        where.append(f"({', '.join(keys)}) > ({', '.join(f'$cursor_{i}' for i in range(len(keys)))})")
+        params.update({f"cursor_{i}": v for i, v in enumerate(values)})
+    params["limit"] = limit + 1
+    key_cols = [f"_key_{i}" for i in range(len(keys))]
+
+    sql = f"""
+        SELECT {', '.join(selected)}
+             , {', '.join(f'{k} AS {c}' for k, c in zip(keys, key_cols))}
+        FROM ai_account_snapshot
+        WHERE {' AND '.join(where)}
+        ORDER BY {', '.join(key_cols)}
+        LIMIT $limit
+    """
+    if accepts_columnar(request.headers.get("accept")):
+        result = query_columnar(sql, params, order_by=key_cols, limit=limit, tail=key_cols)
+        next_cursor = _encode_cursor(sort, [result["tail"][c] for c in key_cols]) if result["more"] else None
+        return columnar_response(result, next_cursor=next_cursor, total=total)
+
+    rows = query(sql, params)
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _encode_cursor(sort, [rows[-1][f"_key_{i}"] for i in range(len(keys))])
+    page = [{c: r[c] for c in selected} for r in rows]
+    return {"rows": page, "next_cursor": next_cursor, "total": total}
+
+
+USAGE_SPARKLINE_POINTS = int(os.environ.get("USAGE_SPARKLINE_POINTS", "60"))
+USAGE_MAX_POINTS = 5000
+USAGE_BUCKETS = ("day", "week", "month")
+
+
+def _downsample(series: str) -> str:
+    buckets = "(($points::BIGINT - 2) // 2)"
+    interior = f"(len({series}) - 2)"
+    return f"""
+        CASE WHEN $points::BIGINT IS NULL OR len({series}) <= $points::BIGINT THEN {series}
+        ELSE list_transform(
+            list_concat(
+                [1],
+                flatten(list_transform(
+                    range({buckets}),
+                    lambda b: list_transform(
+                        range(2 + b * {interior} // greatest({buckets}, 1), 2 + (b + 1) * {interior} // greatest({buckets}, 1)),
+                        lambda i: {{'active_users': {series}[i].active_users, 'i': i}}
+                    )
+                ).list_transform(lambda keys: list_sort(list_distinct([list_min(keys).i, list_max(keys).i])))),
+                [len({series})]
+            ),
+            lambda i: {series}[i]
+        ) END
+    """
+
+
+def _usage_series_sql(bucket: str) -> str:
+    if bucket == "day":
+        columns, group_by = "date_day, active_users, key_events", ""
+    else:
+        columns = f"""
+            date_trunc('{bucket}', date_day)::DATE AS date_day
+          , round(avg(active_users), 1) AS active_users
+          , sum(key_events) AS key_events
+        """
+        group_by = "GROUP BY 1"
+    return f"""
+        SELECT p.date_day, p.active_users, p.key_events, source_points
+        FROM (
+            SELECT unnest({_downsample("series")}) AS p, len(series) AS source_points
+            FROM (
+                SELECT list({{'date_day': date_day, 'active_users': active_users, 'key_events': key_events}}
+                            ORDER BY date_day) AS series
+                FROM (
+                    SELECT {columns}
+                    FROM ai_fct_account_usage_trend
+                    WHERE account_id = $account_id
+                      AND ($start::DATE IS NULL OR date_day >= $start::DATE)
+                      AND ($end::DATE IS NULL OR date_day <= $end::DATE)
+                    {group_by}
+                ) usage
+            ) s
+        ) d
+        ORDER BY p.date_day
+    """
+
+
+USAGE_SERIES_SQL = {bucket: _usage_series_sql(bucket) for bucket in USAGE_BUCKETS}
+USAGE_SERIES_ORDER = ("date_day",)
+
+ACCOUNT_DETAIL_SQL = f"""
+    WITH ao AS (
+        SELECT * FROM ai_dm_account_overview WHERE account_id = $account_id LIMIT 1
+    ), h AS (
+        SELECT * FROM ai_fct_account_health_score WHERE account_id = $account_id LIMIT 1
+    ), ep AS (
+        SELECT * FROM ai_fct_account_expansion_potential WHERE account_id = $account_id LIMIT 1
+    ), ae AS (
+        SELECT primary_risk_driver FROM ai_arr_exposure WHERE account_id = $account_id LIMIT 1
+    ), u AS (
+        SELECT {_downsample("series")} AS usage_trend
+        FROM (
+            SELECT list(
+                {{'date_day': date_day, 'active_users': active_users, 'key_events': key_events}}
+                ORDER BY date_day ASC
+            ) AS series
+            FROM ai_fct_account_usage_trend
+            WHERE account_id = $account_id
+        ) s
+    )
+    SELECT
+        ao AS overview
+      , CASE WHEN h.account_id IS NULL THEN NULL ELSE h END AS health
+      , CASE WHEN ep.account_id IS NULL THEN NULL ELSE ep END AS expansion
+      , COALESCE(u.usage_trend, []) AS usage_trend
+      , ae.primary_risk_driver
+    FROM ao
+    LEFT JOIN h ON TRUE
+    LEFT JOIN ep ON TRUE
+    LEFT JOIN ae ON TRUE
+    CROSS JOIN u
+"""
+
+
+def _detail_params(account_id: str) -> dict:
+    return {"account_id": account_id, "points": USAGE_SPARKLINE_POINTS}
 
 
 @router.get("/accounts/{account_id}")
 def get_account(account_id: str):
-    overview = query_one(
-        "SELECT * FROM ai_dm_account_overview WHERE account_id = ?", [account_id]
-    )
-    if not overview:
+    detail = query_one(ACCOUNT_DETAIL_SQL, _detail_params(account_id))
+    if not detail:
         raise HTTPException(status_code=404, detail="Account not found")
+    return detail
 
-    health = query_one(
-        "SELECT * FROM ai_fct_account_health_score WHERE account_id = ?", [account_id]
-    )
-    expansion = query_one(
-        "SELECT * FROM ai_fct_account_expansion_potential WHERE account_id = ?", [account_id]
-    )
-    usage_trend = query(
-        """
-        SELECT date_day, active_users, key_events
-        FROM ai_fct_account_usage_trend
-        WHERE account_id = ?
-        ORDER BY date_day ASC
-        """,
-        [account_id],
-    )
-    exposure = query_one(
-        "SELECT primary_risk_driver FROM ai_arr_exposure WHERE account_id = ?", [account_id]
-    )
 
+@router.get("/accounts/{account_id}/usage")
+def get_account_usage(
+    account_id: str,
+    request: Request,
+    bucket: str = "day",
+    points: Optional[int] = Query(None, ge=2, le=USAGE_MAX_POINTS),
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+):
+    if bucket not in USAGE_SERIES_SQL:
+        raise HTTPException(status_code=400, detail=f"Unknown bucket: {bucket}")
+    if start and end and start > end:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+    sql = USAGE_SERIES_SQL[bucket]
+    params = {"account_id": account_id, "start": start, "end": end, "points": points}
+    meta = {"account_id": account_id, "bucket": bucket, "start": start, "end": end}
+    if accepts_columnar(request.headers.get("accept")):
+        result = query_columnar(sql, params, order_by=USAGE_SERIES_ORDER, tail=("source_points",))
+        return columnar_response(result, **meta, source_points=result["tail"].get("source_points") or 0)
+    rows = query(sql, params)
     return {
-        "overview": overview,
-        "health": health,
-        "expansion": expansion,
-        "usage_trend": usage_trend,
-        "primary_risk_driver": exposure["primary_risk_driver"] if exposure else None,
+        **meta,
+        "source_points": rows[0]["source_points"] if rows else 0,
+        "points": [{k: r[k] for k in ("date_day", "active_users", "key_events")} for r in rows],
     }
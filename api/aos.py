@@ -1,13 +1,14 @@
 from __future__ import annotations
 import logging
-from typing import Optional
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel
 
 from aos.engine.task_store import (
     init_db, create_goal, get_goal, list_goals,
-    list_tasks, list_memory, get_metrics_summary,
+    list_tasks, list_memory, search_memory, get_metrics_summary, get_metric_series,
 )
 from aos.engine.schemas import Goal, GoalStatus
 from aos.engine.orchestrator import run_goal as _run_goal
@@ -97,11 +98,28 @@ def get_memory(type: Optional[str] = None, limit: int = 20):
     return [e.to_dict() for e in entries]
 
 
+@router.get("/memory/search")
+def search_memory_entries(
+    q: str,
+    type: Optional[str] = None,
+    tag: Optional[List[str]] = Query(None),
+    limit: int = 10,
+):
+    entries = search_memory(q, limit=max(1, min(limit, 100)), type=type, tags=tag)
+    return [e.to_dict() for e in entries]
+
+
 @router.get("/metrics")
 def get_metrics():
     return get_metrics_summary()
 
 
+@router.get("/metrics/series")
+def get_metrics_series(name: str, hours: int = 168):
+    since = (datetime.now(timezone.utc) - timedelta(hours=max(1, hours))).isoformat()
+    return {"name": name, "bucket_seconds": 3600, "series": get_metric_series(name, since=since)}
+
+
 @router.get("/momentum")
 def get_momentum():
     pending_goals = list_goals(status="pending", limit=5)
@@ -153,7 +171,7 @@ def health():
 def quick_run_mock(req: GoalRequest):
     from aos.engine.schemas import Goal as _Goal
     from aos.engine.task_store import create_goal as _cg, create_task
-    from aos.engine.orchestrator import _execute_and_verify, _finalize_success, _finalize_failure, _goal_result
+    from aos.engine.orchestrator import _TaskGraph, _run_dag, _finalize_success, _finalize_failure, _goal_result
     from aos.evals.mock_executor import mock_execute_task, mock_decompose_goal
     import aos.engine.executor as _exec
 
@@ -178,8 +196,7 @@ def quick_run_mock(req: GoalRequest):
     goal.status = GoalStatus.running
     update_goal(goal)
 
-    for task in tasks:
-        _execute_and_verify(task, goal.description, [])
+    _run_dag(goal, _TaskGraph(tasks))
 
     from aos.engine.task_store import list_tasks as _lt
     all_tasks = _lt(goal_id=goal.id)
@@ -198,7 +215,7 @@ def _mock_run_fn():
     from aos.engine.task_store import create_task as _ct, update_goal as _ug
     from aos.evals.mock_executor import mock_execute_task, mock_decompose_goal
     import aos.engine.executor as _exec
-    from aos.engine.orchestrator import _execute_and_verify, _finalize_success, _goal_result
+    from aos.engine.orchestrator import _TaskGraph, _run_dag, _finalize_success, _goal_result
     from aos.engine.task_store import list_tasks as _lt, get_goal as _gg
     from aos.engine.schemas import GoalStatus
 
@@ -213,8 +230,7 @@ def _mock_run_fn():
         goal.task_ids = [t.id for t in tasks]
         goal.status = GoalStatus.running
         _ug(goal)
-        for task in tasks:
-            _execute_and_verify(task, goal.description, [])
+        _run_dag(goal, _TaskGraph(tasks))
         all_tasks = _lt(goal_id=goal.id)
         _finalize_success(goal, all_tasks)
         return _goal_result(_gg(goal_id), all_tasks)
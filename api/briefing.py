@@ -4,76 +4,60 @@ from typing import Optional
 
 from fastapi import APIRouter
 from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
 
-from core.db import query
-from core.llm import generate_action_asset, generate_briefing
+from core import briefing_cache
+from core.db import cached_query
+from core.llm import BRIEFING_SYSTEM, generate_action_asset, generate_briefing
 
 router = APIRouter(prefix="/api")
 
 
+USAGE_ANOMALIES_SQL = """
+    SELECT account_id, account_name, current_arr_eur, avg_early, avg_recent, drop_ratio
+    FROM ai_fct_usage_anomalies
+    WHERE anomaly_rank <= 5
+    ORDER BY anomaly_rank
+"""
+
+
 def _detect_usage_anomalies() -> list[dict]:
-    return query("""
-        WITH ordered AS (
-            SELECT
-                account_id,
-                active_users,
-                ROW_NUMBER() OVER (PARTITION BY account_id ORDER BY date_day ASC)  AS rn_asc,
-                ROW_NUMBER() OVER (PARTITION BY account_id ORDER BY date_day DESC) AS rn_desc,
-                COUNT(*) OVER (PARTITION BY account_id) AS total_pts
-            FROM ai_fct_account_usage_trend
-        ),
-        early_avg AS (
-            SELECT account_id, AVG(active_users) AS avg_early
-            FROM ordered
-            WHERE rn_asc <= 3
-            GROUP BY account_id
-        ),
-        recent_avg AS (
-            SELECT account_id, AVG(active_users) AS avg_recent
-            FROM ordered
-            WHERE rn_desc <= 3 AND total_pts >= 5
-            GROUP BY account_id
-        )
-        SELECT
-            e.account_id,
-            ao.account_name,
-            ao.current_arr_eur,
-            ROUND(e.avg_early, 1)  AS avg_early,
-            ROUND(r.avg_recent, 1) AS avg_recent,
-            ROUND(1.0 - r.avg_recent / NULLIF(e.avg_early, 0), 2) AS drop_ratio
-        FROM early_avg e
-        JOIN recent_avg r ON e.account_id = r.account_id
-        JOIN ai_dm_account_overview ao ON e.account_id = ao.account_id
-        WHERE e.avg_early > 0 AND r.avg_recent < e.avg_early * 0.7
-        ORDER BY drop_ratio DESC NULLS LAST
-        LIMIT 5
-    """)
+    return cached_query(USAGE_ANOMALIES_SQL, endpoint="briefing")
 
 
-@router.get("/briefing")
-def get_briefing():
-    arr_data = query("""
+def _briefing_inputs() -> tuple[list[dict], list[dict], list[dict], list[dict]]:
+    arr_data = cached_query("""
         SELECT health_band, SUM(current_arr_eur) AS arr_eur, COUNT(*) AS cnt
         FROM ai_arr_exposure
         GROUP BY health_band
         ORDER BY CASE health_band WHEN 'red' THEN 1 WHEN 'yellow' THEN 2 ELSE 3 END
-    """)
-    urgent_renewals = query("""
+    """, endpoint="briefing")
+    urgent_renewals = cached_query("""
         SELECT account_name, days_to_renewal, current_arr_eur, primary_risk_driver
         FROM ai_fct_renewals_at_risk
         WHERE days_to_renewal BETWEEN 0 AND 14
         ORDER BY days_to_renewal ASC, current_arr_eur DESC NULLS LAST
         LIMIT 3
-    """)
-    top_expansion = query("""
+    """, endpoint="briefing")
+    top_expansion = cached_query("""
         SELECT account_name, expansion_score, current_arr_eur, recommended_angle
         FROM ai_fct_expansion_shortlist
         WHERE health_score >= 0.7
         ORDER BY expansion_score DESC NULLS LAST
         LIMIT 3
-    """)
-    anomalies = _detect_usage_anomalies()
-    return generate_briefing(arr_data, urgent_renewals, top_expansion, anomalies)
+    """, endpoint="briefing")
+    return arr_data, urgent_renewals, top_expansion, _detect_usage_anomalies()
+
+
+@router.get("/briefing")
+async def get_briefing(refresh: bool = False):
+    arr_data, urgent_renewals, top_expansion, anomalies = await run_in_threadpool(_briefing_inputs)
+    fp = briefing_cache.fingerprint(BRIEFING_SYSTEM, arr_data, urgent_renewals, top_expansion, anomalies)
+    return await briefing_cache.get_or_generate(
+        fp,
+        lambda: generate_briefing(arr_data, urgent_renewals, top_expansion, anomalies),
+        force=refresh,
+    )
 
 
 class ActionRequest(BaseModel):
@@ -86,8 +70,8 @@ class ActionRequest(BaseModel):
 
 
 @router.post("/action-asset")
-def create_action_asset(req: ActionRequest):
-    return generate_action_asset(
+async def create_action_asset(req: ActionRequest):
+    return await generate_action_asset(
         req.action_type,
         req.intent,
         req.account_name,
@@ -1,17 +1,24 @@
 from __future__ import annotations
+import asyncio
+import json
 import os
+import re
+import threading
+from collections import defaultdict
 from typing import Optional
 
-import duckdb
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
 
-from core.db import query, query_one, DB_PATH
-from core.intent import detect_intent
-from core.guardrails import compute_guardrails
+from core.db import build_key, cached_query, get_conn, query
+from core.intent import AccountNameIndex, detect_intent
+from core.guardrails import analyze_sql, compute_guardrails, load_allowlist
 from core.interpreters import interpret
 from core.question_packs import FOLLOWUP_SUGGESTIONS
-from core.llm import STATUS_MESSAGES, generate_insight
+from core.llm import STATUS_MESSAGES, generate_insight, stream_insight
 
 router = APIRouter(prefix="/api")
 
@@ -20,21 +27,21 @@ SQL_TEMPLATES: dict[str, str] = {
         SELECT account_id, account_name, plan, subscription_status, renewal_date,
                current_mrr_eur, current_arr_eur, seats_purchased
         FROM ai_dm_account_overview
-        WHERE lower(account_name) = lower('{account_name}')
+        WHERE lower(account_name) = lower($account_name)
         LIMIT 1
     """,
     "health_summary": """
         SELECT account_id, account_name, health_score, health_band,
                days_to_renewal, usage_drop_ratio, tickets_high, unpaid_invoices
         FROM ai_fct_account_health_score
-        WHERE lower(account_name) = lower('{account_name}')
+        WHERE lower(account_name) = lower($account_name)
         LIMIT 1
     """,
     "expansion_potential": """
         SELECT account_id, account_name, health_score,
                seat_utilization_ratio, expansion_score, expansion_band
         FROM ai_fct_account_expansion_potential
-        WHERE lower(account_name) = lower('{account_name}')
+        WHERE lower(account_name) = lower($account_name)
         LIMIT 1
     """,
     "renewals_at_risk": """
@@ -42,18 +49,18 @@ SQL_TEMPLATES: dict[str, str] = {
                health_score, health_band, current_arr_eur,
                usage_drop_ratio, tickets_high, unpaid_invoices, primary_risk_driver
         FROM ai_fct_renewals_at_risk
-        WHERE days_to_renewal BETWEEN 0 AND {horizon_days}
-          AND health_score < {health_threshold}
+        WHERE days_to_renewal BETWEEN 0 AND $horizon_days
+          AND health_score < $health_threshold
         ORDER BY health_score ASC, current_arr_eur DESC NULLS LAST
-        LIMIT {limit_n}
+        LIMIT $limit_n
     """,
     "expansion_shortlist": """
         SELECT account_id, account_name, expansion_score, current_arr_eur,
                utilization, health_score, recommended_angle, supporting_signal
         FROM ai_fct_expansion_shortlist
-        WHERE health_score >= {minimum_health}
+        WHERE health_score >= $minimum_health
         ORDER BY expansion_score DESC NULLS LAST, current_arr_eur DESC NULLS LAST
-        LIMIT {top_n}
+        LIMIT $top_n
     """,
     "arr_exposure_overview": """
         SELECT health_band
@@ -66,6 +73,29 @@ SQL_TEMPLATES: dict[str, str] = {
 }
 
 
+ACCOUNT_INTENTS = ("account_overview", "health_summary", "expansion_potential")
+
+_ACCOUNT_FILTER_RE = re.compile(r"WHERE lower\(account_name\) = lower\(\$account_name\)\s+LIMIT 1")
+
+BATCH_ACCOUNT_SQL: dict[str, str] = {
+    intent: _ACCOUNT_FILTER_RE.sub(
+        "WHERE lower(account_name) IN (SELECT lower(unnest($account_names)))", SQL_TEMPLATES[intent]
+    )
+    for intent in ACCOUNT_INTENTS
+}
+
+TEMPLATE_PARAMS: dict[str, tuple[str, ...]] = {
+    intent: tuple(dict.fromkeys(re.findall(r"\$([a-zA-Z_]\w*)", sql))) for intent, sql in SQL_TEMPLATES.items()
+}
+
+SQL_ANALYSIS: dict[str, dict] = {
+    sql: analyze_sql(sql) for sql in (*SQL_TEMPLATES.values(), *BATCH_ACCOUNT_SQL.values())
+}
+
+BATCH_MAX_ITEMS = int(os.environ.get("CHAT_BATCH_MAX_ITEMS", "2000"))
+BATCH_CONCURRENCY = int(os.environ.get("CHAT_BATCH_CONCURRENCY", "8"))
+
+
 class ChatRequest(BaseModel):
     question: str
     account_id: Optional[str] = None
@@ -73,45 +103,155 @@ class ChatRequest(BaseModel):
     use_ai: bool = True
 
 
-def _resolve_request(question: str, account_id: Optional[str]):
-    accounts_raw = query("SELECT account_id, account_name FROM ai_dm_account_overview ORDER BY account_name")
-    account_names = [r["account_name"] for r in accounts_raw]
-    allowed = {r["asset_name"] for r in query("SELECT asset_name FROM dim_ai_allowed_assets WHERE is_allowed_for_ai")}
+class ChatBatchRequest(BaseModel):
+    questions: list[str]
+    account_ids: list[str] = []
+    all_accounts: bool = False
+    use_ai: bool = True
+
+
+_account_index: Optional[tuple[tuple, AccountNameIndex]] = None
+_account_index_lock = threading.Lock()
 
-    parsed = detect_intent(question, account_names)
-    intent = parsed["intent"]
 
+def _get_account_index() -> AccountNameIndex:
+    global _account_index
+    key = build_key()
+    cached = _account_index
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    with _account_index_lock:
+        if _account_index is None or _account_index[0] != key:
+            rows = query("SELECT account_id, account_name FROM ai_dm_account_overview ORDER BY account_name")
+            index = AccountNameIndex([r["account_name"] for r in rows], [r["account_id"] for r in rows])
+            _account_index = (key, index)
+        return _account_index[1]
+
+
+def _bind_account(parsed: dict, account_id: Optional[str], account_index: AccountNameIndex) -> Optional[str]:
     if account_id and not parsed["account_name"]:
-        acc = query_one("SELECT account_name FROM ai_dm_account_overview WHERE account_id = ?", [account_id])
-        if acc:
-            parsed["account_name"] = acc["account_name"]
+        name = account_index.name_for(account_id)
+        if name:
+            parsed["account_name"] = name
             if "account_name" in parsed["params"]:
-                parsed["params"]["account_name"] = acc["account_name"]
+                parsed["params"]["account_name"] = name
+
+    if parsed["intent"] in ACCOUNT_INTENTS and not parsed.get("account_name"):
+        return "Account not identified — select one from the dropdown or mention the account name."
+    if parsed["intent"] not in SQL_TEMPLATES:
+        return f"No template for intent: {parsed['intent']}"
+    return None
+
 
-    needs_account = intent in ("account_overview", "health_summary", "expansion_potential")
-    if needs_account and not parsed.get("account_name"):
-        return None, intent, parsed, None, allowed, "Account not identified — select one from the dropdown or mention the account name."
+def _resolve_request(question: str, account_id: Optional[str]):
+    account_index = _get_account_index()
+    allowed = load_allowlist()
+
+    parsed = detect_intent(question, account_index.names, account_index=account_index)
+    intent = parsed["intent"]
 
-    template = SQL_TEMPLATES.get(intent)
-    if not template:
-        return None, intent, parsed, None, allowed, f"No template for intent: {intent}"
+    error = _bind_account(parsed, account_id, account_index)
+    if error:
+        return None, intent, parsed, None, allowed, error
 
+    sql = SQL_TEMPLATES[intent]
     try:
-        sql = template.format(**parsed["params"])
+        params = _bind_params(intent, parsed["params"])
     except KeyError as e:
         return None, intent, parsed, None, allowed, f"Missing parameter: {e}"
 
     try:
-        con = duckdb.connect(str(DB_PATH), read_only=True)
-        res = con.execute(sql)
-        cols = [d[0] for d in res.description]
-        rows = [dict(zip(cols, row)) for row in res.fetchall()]
-        con.close()
+        with get_conn() as con:
+            cols, rows = _fetch(con, sql, params)
     except Exception as exc:
         return None, intent, parsed, None, allowed, str(exc)
 
-    guardrails = compute_guardrails(sql, allowed, (len(rows), len(cols) if cols else 0))
-    return rows, intent, parsed, {"sql": sql.strip(), "guardrails": guardrails}, allowed, None
+    guardrails = compute_guardrails(sql, allowed, (len(rows), len(cols)), SQL_ANALYSIS[sql])
+    return rows, intent, parsed, {"sql": sql.strip(), "params": params, "guardrails": guardrails}, allowed, None
+
+
+def _bind_params(intent: str, params: dict) -> dict:
+    return {name: params[name] for name in TEMPLATE_PARAMS[intent]}
+
+
+def _fetch(con, sql: str, params: Optional[dict] = None) -> tuple[list[str], list[dict]]:
+    res = con.execute(sql, params) if params else con.execute(sql)
+    cols = [d[0] for d in res.description]
+    return cols, [dict(zip(cols, row)) for row in res.fetchall()]
+
+
+def _resolve_batch(questions: list[str], account_ids: list[str], all_accounts: bool) -> list[dict]:
+    account_index = _get_account_index()
+    allowed = load_allowlist()
+    targets = account_index.ids if all_accounts else (account_ids or [None])
+
+    detected = {
+        q: detect_intent(q, account_index.names, account_index=account_index)
+        for q in dict.fromkeys(questions)
+    }
+    items: list[dict] = []
+    account_names: dict[str, set[str]] = defaultdict(set)
+    portfolio: dict[tuple, None] = {}
+    for question in questions:
+        for account_id in targets:
+            base = detected[question]
+            parsed = {**base, "params": dict(base["params"])}
+            item = {"question": question, "account_id": account_id, "intent": parsed["intent"], "parsed": parsed}
+            item["error"] = _bind_account(parsed, account_id, account_index)
+            if not item["error"]:
+                if parsed["intent"] in ACCOUNT_INTENTS:
+                    item["key"] = (BATCH_ACCOUNT_SQL[parsed["intent"]],)
+                    account_names[parsed["intent"]].add(parsed["account_name"].lower())
+                else:
+                    try:
+                        params = _bind_params(parsed["intent"], parsed["params"])
+                        item["key"] = (SQL_TEMPLATES[parsed["intent"]], tuple(params.items()))
+                        portfolio[item["key"]] = None
+                    except KeyError as e:
+                        item["error"] = f"Missing parameter: {e}"
+            items.append(item)
+
+    results: dict[tuple, tuple] = {}
+    with get_conn() as con:
+        for intent, names in account_names.items():
+            sql = BATCH_ACCOUNT_SQL[intent]
+            params = {"account_names": sorted(names)}
+            try:
+                cols, rows = _fetch(con, sql, params)
+            except Exception as exc:
+                results[(sql,)] = (None, None, None, str(exc))
+                continue
+            by_name: dict[str, list[dict]] = {}
+            for row in rows:
+                by_name.setdefault(row["account_name"].lower(), [row])
+            results[(sql,)] = (params, cols, by_name, None)
+        for key in portfolio:
+            sql, params = key[0], dict(key[1])
+            try:
+                cols, rows = _fetch(con, sql, params)
+                results[key] = (params, cols, rows, None)
+            except Exception as exc:
+                results[key] = (None, None, None, str(exc))
+
+    for item in items:
+        if item["error"]:
+            continue
+        params, cols, rows, error = results[item["key"]]
+        if error:
+            item["error"] = error
+            continue
+        sql = item["key"][0]
+        if item["intent"] in ACCOUNT_INTENTS:
+            name = item["parsed"]["account_name"].lower()
+            params = {"account_names": [name]}
+            rows = rows.get(name, [])
+        item["rows"] = rows
+        item["evidence"] = {
+            "sql": sql.strip(),
+            "params": params,
+            "guardrails": compute_guardrails(sql, allowed, (len(rows), len(cols)), SQL_ANALYSIS[sql]),
+        }
+    return items
 
 
 @router.get("/chat/config")
@@ -121,23 +261,23 @@ def chat_config():
 
 @router.get("/chat/snapshot")
 def chat_snapshot():
-    red = query("""
+    red = cached_query("""
         SELECT COUNT(*) AS cnt, COALESCE(SUM(current_arr_eur), 0) AS arr
         FROM ai_arr_exposure WHERE health_band = 'red'
-    """)
-    urgent = query("""
+    """, endpoint="chat_snapshot")
+    urgent = cached_query("""
         SELECT COUNT(*) AS cnt
         FROM ai_fct_renewals_at_risk
         WHERE days_to_renewal BETWEEN 0 AND 30
-    """)
-    urgent_next = query("""
+    """, endpoint="chat_snapshot")
+    urgent_next = cached_query("""
         SELECT account_name, days_to_renewal
         FROM ai_fct_renewals_at_risk
         WHERE days_to_renewal BETWEEN 0 AND 30
         ORDER BY days_to_renewal ASC
         LIMIT 1
-    """)
-    exp = query("""
+    """, endpoint="chat_snapshot")
+    exp = cached_query("""
         SELECT COUNT(*) AS cnt,
                MAX(CASE WHEN rn = 1 THEN account_name END) AS top_name,
                MAX(CASE WHEN rn = 1 THEN expansion_score END) AS top_score
@@ -147,7 +287,7 @@ def chat_snapshot():
             FROM ai_fct_expansion_shortlist
             WHERE health_score >= 0.6
         ) t
-    """)
+    """, endpoint="chat_snapshot")
     return {
         "at_risk_count": red[0]["cnt"] if red else 0,
         "at_risk_arr": red[0]["arr"] if red else 0,
@@ -160,32 +300,40 @@ def chat_snapshot():
     }
 
 
+def _error_response(intent, parsed, error: str) -> dict:
+    return {
+        "intent": intent,
+        "account_name": parsed.get("account_name") if parsed else None,
+        "title": "Account not identified" if "Account" in error else "Error",
+        "narrative": error,
+        "bullets": [],
+        "next_action": "",
+        "followups": FOLLOWUP_SUGGESTIONS.get(intent, []) if parsed else [],
+        "evidence": {"sql": "", "guardrails": {}},
+        "rows": [],
+        "error": True,
+    }
+
+
 @router.post("/chat")
-def chat(req: ChatRequest):
+async def chat(req: ChatRequest):
     req.question = req.question.strip()[:400]
-    rows, intent, parsed, evidence, allowed, error = _resolve_request(req.question, req.account_id)
+    rows, intent, parsed, evidence, allowed, error = await run_in_threadpool(
+        _resolve_request, req.question, req.account_id
+    )
 
     if error:
-        return {
-            "intent": intent,
-            "account_name": parsed.get("account_name") if parsed else None,
-            "title": "Account not identified" if "Account" in error else "Error",
-            "narrative": error,
-            "bullets": [],
-            "next_action": "",
-            "followups": FOLLOWUP_SUGGESTIONS.get(intent, []) if parsed else [],
-            "evidence": {"sql": "", "guardrails": {}},
-            "rows": [],
-            "error": True,
-        }
+        return _error_response(intent, parsed, error)
 
-    insight = generate_insight(intent, rows, req.question, parsed.get("account_name"), req.history, req.use_ai)
-    interpreted_title = interpret(intent, rows[0] if rows else {}, rows)["title"]
+    insight = await generate_insight(intent, rows, req.question, parsed.get("account_name"), req.history, req.use_ai)
+    return _answer_response(intent, parsed, rows, evidence, insight)
 
+
+def _answer_response(intent, parsed, rows: list[dict], evidence: dict, insight: dict) -> dict:
     return {
         "intent": intent,
         "account_name": parsed.get("account_name"),
-        "title": interpreted_title,
+        "title": interpret(intent, rows[0] if rows else {}, rows)["title"],
         "narrative": insight.get("narrative", ""),
         "bullets": insight.get("bullets", []),
         "next_action": insight.get("next_action", ""),
@@ -194,3 +342,80 @@ def chat(req: ChatRequest):
         "rows": rows,
         "status": STATUS_MESSAGES.get(intent, "Thinking…"),
     }
+
+
+@router.post("/chat/batch")
+async def chat_batch(req: ChatBatchRequest):
+    questions = [q.strip()[:400] for q in req.questions if q.strip()]
+    if not questions:
+        raise HTTPException(status_code=400, detail="No questions given")
+    targets = len(await run_in_threadpool(_get_account_index)) if req.all_accounts else max(1, len(req.account_ids))
+    if len(questions) * targets > BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"Batch too large (max {BATCH_MAX_ITEMS} question/account pairs)")
+
+    items = await run_in_threadpool(_resolve_batch, questions, req.account_ids, req.all_accounts)
+    semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+    insights: dict[tuple, asyncio.Future] = {}
+
+    async def generate(item: dict, account_name: Optional[str]) -> dict:
+        async with semaphore:
+            return await generate_insight(item["intent"], item["rows"], item["question"], account_name, [], req.use_ai)
+
+    async def answer(index: int, item: dict) -> dict:
+        head = {"index": index, "question": item["question"], "account_id": item["account_id"]}
+        if item["error"]:
+            return {**head, **_error_response(item["intent"], item["parsed"], item["error"])}
+        parsed, rows = item["parsed"], item["rows"]
+        account_name = parsed.get("account_name") if item["intent"] in ACCOUNT_INTENTS else None
+        key = (item["intent"], item["key"], item["question"], account_name)
+        if key not in insights:
+            insights[key] = asyncio.ensure_future(generate(item, account_name))
+        insight = await asyncio.shield(insights[key])
+        return {**head, **_answer_response(item["intent"], parsed, rows, item["evidence"], insight)}
+
+    async def lines():
+        tasks = [asyncio.ensure_future(answer(i, item)) for i, item in enumerate(items)]
+        try:
+            for done in asyncio.as_completed(tasks):
+                yield json.dumps(jsonable_encoder(await done)) + "\n"
+        finally:
+            for task in [*tasks, *insights.values()]:
+                task.cancel()
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson", headers={"X-Batch-Size": str(len(items))})
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(jsonable_encoder(data))}\n\n"
+
+
+@router.post("/chat/stream")
+async def chat_stream(req: ChatRequest):
+    req.question = req.question.strip()[:400]
+
+    async def events():
+        rows, intent, parsed, evidence, allowed, error = await run_in_threadpool(
+            _resolve_request, req.question, req.account_id
+        )
+        if error:
+            yield _sse("error", _error_response(intent, parsed, error))
+            return
+
+        yield _sse("meta", {
+            "intent": intent,
+            "account_name": parsed.get("account_name"),
+            "title": interpret(intent, rows[0] if rows else {}, rows)["title"],
+            "evidence": evidence,
+            "rows": rows,
+            "status": STATUS_MESSAGES.get(intent, "Thinking…"),
+        })
+        async for event, payload in stream_insight(
+            intent, rows, req.question, parsed.get("account_name"), req.history, req.use_ai
+        ):
+            yield _sse(event, payload)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,108 +1,156 @@
-from collections import defaultdict
-from datetime import date, datetime
-
-from fastapi import APIRouter
-from core.db import query
+from fastapi import APIRouter, Query, Request
+from core.columnar import accepts_columnar, columnar_response, query_columnar
+from core.db import cached_query
 
 router = APIRouter(prefix="/api")
 
+RISK_MATRIX_PAGE = 50
+RISK_MATRIX_MAX_PAGE = 1000
 
-@router.get("/portfolio")
-def get_portfolio():
-    risk_rows = query("""
-        SELECT
-            ae.account_id
-          , ae.account_name
-          , ao.segment
-          , ae.health_score
-          , ae.health_band
-          , ae.current_arr_eur
-          , ae.primary_risk_driver
-          , h.days_to_renewal
-          , h.usage_drop_ratio
-          , h.tickets_high
-          , h.unpaid_invoices
-          , ao.renewal_date
-          , ao.owner_ae
-        FROM ai_arr_exposure ae
-        JOIN ai_dm_account_overview ao ON ae.account_id = ao.account_id
-        JOIN ai_fct_account_health_score h ON ae.account_id = h.account_id
-        ORDER BY ae.health_score ASC, ae.current_arr_eur DESC NULLS LAST
-    """)
-
-    total_arr = sum(r["current_arr_eur"] or 0 for r in risk_rows)
-    red_arr = sum(r["current_arr_eur"] or 0 for r in risk_rows if r["health_band"] == "red")
-
-    health_counts: dict[str, int] = {"green": 0, "yellow": 0, "red": 0}
-    for r in risk_rows:
-        band = r["health_band"] or "green"
-        health_counts[band] = health_counts.get(band, 0) + 1
-
-    eligible = [r for r in risk_rows if r["days_to_renewal"] is not None and r["days_to_renewal"] >= 0]
-    next_renewal = min(eligible, key=lambda x: x["days_to_renewal"]) if eligible else None
-
-    arr_bands = query("""
-        SELECT health_band
-             , SUM(current_arr_eur) AS arr_eur
-             , COUNT(*) AS accounts_count
-        FROM ai_arr_exposure
-        GROUP BY health_band
-        ORDER BY CASE health_band WHEN 'green' THEN 1 WHEN 'yellow' THEN 2 WHEN 'red' THEN 3 END
-    """)
-
-    renewals = query("""
-        SELECT account_id, account_name, renewal_date, days_to_renewal,
-               health_score, health_band, current_arr_eur, primary_risk_driver
-        FROM ai_fct_renewals_at_risk
-        WHERE days_to_renewal BETWEEN 0 AND 90
-        ORDER BY days_to_renewal ASC, health_score ASC
-        LIMIT 20
-    """)
-
-    today = date.today()
-    pipeline_raw: dict[str, dict[str, float]] = defaultdict(lambda: {"green": 0.0, "yellow": 0.0, "red": 0.0})
-    for r in risk_rows:
-        rd = r.get("renewal_date")
-        if rd is None:
-            continue
-        if isinstance(rd, str):
-            try:
-                rd = date.fromisoformat(rd[:10])
-            except ValueError:
-                continue
-        elif hasattr(rd, "date"):
-            rd = rd.date()
-        days_out = (rd - today).days
-        if 0 <= days_out <= 180:
-            key = rd.strftime("%b %Y")
-            band = r.get("health_band") or "green"
-            pipeline_raw[key][band] += r.get("current_arr_eur") or 0
-
-    def _month_sort(m: str) -> datetime:
-        try:
-            return datetime.strptime(m, "%b %Y")
-        except ValueError:
-            return datetime.min
-
-    renewal_pipeline = [
-        {"month": m, "green": round(v["green"]), "yellow": round(v["yellow"]), "red": round(v["red"])}
-        for m, v in sorted(pipeline_raw.items(), key=lambda x: _month_sort(x[0]))
+RISK_MATRIX_ORDER = ("health_score ASC", "current_arr_eur DESC NULLS LAST", "account_id")
+
+RISK_MATRIX_SQL = f"""
+    SELECT
+        account_id
+      , account_name
+      , segment
+      , health_score
+      , exposure_band AS health_band
+      , current_arr_eur
+      , primary_risk_driver
+      , days_to_renewal
+      , usage_drop_ratio
+      , tickets_high
+      , unpaid_invoices
+      , renewal_date
+      , owner_ae
+    FROM ai_account_snapshot
+    WHERE current_arr_eur IS NOT NULL
+    ORDER BY {", ".join(RISK_MATRIX_ORDER)}
+    LIMIT ? OFFSET ?
+"""
+
+PORTFOLIO_KPI_SQL = """
+    WITH accounts AS (
+        SELECT account_name
+             , coalesce(exposure_band, 'green') AS band
+             , current_arr_eur
+             , days_to_renewal
+             , health_score
+             , account_id
+        FROM ai_account_snapshot
+        WHERE current_arr_eur IS NOT NULL
+    ), next_renewal AS (
+        SELECT account_name, days_to_renewal
+        FROM accounts
+        WHERE days_to_renewal >= 0
+        ORDER BY days_to_renewal ASC, health_score ASC, current_arr_eur DESC NULLS LAST, account_id
+        LIMIT 1
+    )
+    SELECT coalesce(sum(current_arr_eur), 0) AS total_arr
+         , count(*) AS total_accounts
+         , coalesce(sum(current_arr_eur) FILTER (WHERE band = 'red'), 0) AS arr_at_risk
+         , count(*) FILTER (WHERE band = 'red') AS red_count
+         , count(*) FILTER (WHERE band = 'yellow') AS yellow_count
+         , count(*) FILTER (WHERE band = 'green') AS green_count
+         , (SELECT days_to_renewal FROM next_renewal) AS next_renewal_days
+         , (SELECT account_name FROM next_renewal) AS next_renewal_name
+    FROM accounts
+"""
+
+RENEWAL_PIPELINE_SQL = """
+    SELECT strftime(date_trunc('month', renewal_date::DATE), '%b %Y') AS month
+         , coalesce(sum(current_arr_eur) FILTER (WHERE band = 'green'), 0) AS green
+         , coalesce(sum(current_arr_eur) FILTER (WHERE band = 'yellow'), 0) AS yellow
+         , coalesce(sum(current_arr_eur) FILTER (WHERE band = 'red'), 0) AS red
+    FROM (
+        SELECT renewal_date, coalesce(exposure_band, 'green') AS band, current_arr_eur
+        FROM ai_account_snapshot
+        WHERE current_arr_eur IS NOT NULL
+          AND renewal_date::DATE - current_date BETWEEN 0 AND 180
+    ) t
+    GROUP BY date_trunc('month', renewal_date::DATE)
+    ORDER BY date_trunc('month', renewal_date::DATE)
+"""
+
+ARR_BANDS_SQL = """
+    SELECT health_band
+         , SUM(current_arr_eur) AS arr_eur
+         , COUNT(*) AS accounts_count
+    FROM ai_arr_exposure
+    GROUP BY health_band
+    ORDER BY CASE health_band WHEN 'green' THEN 1 WHEN 'yellow' THEN 2 WHEN 'red' THEN 3 END
+"""
+
+RENEWALS_90D_SQL = """
+    SELECT account_id, account_name, renewal_date, days_to_renewal,
+           health_score, health_band, current_arr_eur, primary_risk_driver
+    FROM ai_fct_renewals_at_risk
+    WHERE days_to_renewal BETWEEN 0 AND 90
+    ORDER BY days_to_renewal ASC, health_score ASC
+    LIMIT 20
+"""
+
+
+def _kpis(row: dict) -> dict:
+    total_arr, red_arr = row["total_arr"], row["arr_at_risk"]
+    return {
+        "total_arr": total_arr,
+        "total_accounts": row["total_accounts"],
+        "arr_at_risk": red_arr,
+        "arr_at_risk_pct": round(red_arr / total_arr * 100, 1) if total_arr else 0,
+        "red_count": row["red_count"],
+        "yellow_count": row["yellow_count"],
+        "green_count": row["green_count"],
+        "next_renewal_days": row["next_renewal_days"],
+        "next_renewal_name": row["next_renewal_name"],
+    }
+
+
+def _pipeline(rows: list[dict]) -> list[dict]:
+    return [
+        {"month": r["month"], "green": round(r["green"]), "yellow": round(r["yellow"]), "red": round(r["red"])}
+        for r in rows
     ]
 
+
+def _risk_matrix_page(limit: int, offset: int) -> list[dict]:
+    return cached_query(RISK_MATRIX_SQL, [limit, offset], endpoint="portfolio")
+
+
+@router.get("/portfolio")
+def get_portfolio(
+    matrix_limit: int = Query(RISK_MATRIX_PAGE, ge=0, le=RISK_MATRIX_MAX_PAGE),
+):
+    kpis = _kpis(cached_query(PORTFOLIO_KPI_SQL, endpoint="portfolio")[0])
+    return {
+        "kpis": kpis,
+        "arr_bands": cached_query(ARR_BANDS_SQL, endpoint="portfolio"),
+        "renewal_pipeline": _pipeline(cached_query(RENEWAL_PIPELINE_SQL, endpoint="portfolio")),
+        "renewals_90d": cached_query(RENEWALS_90D_SQL, endpoint="portfolio"),
+        "risk_matrix": _risk_matrix_page(matrix_limit, 0) if matrix_limit else [],
+        "risk_matrix_total": kpis["total_accounts"],
+    }
+
+
+@router.get("/portfolio/risk-matrix")
+def get_risk_matrix(
+    request: Request,
+    limit: int = Query(RISK_MATRIX_PAGE, ge=1, le=RISK_MATRIX_MAX_PAGE),
+    offset: int = Query(0, ge=0),
+):
+    total = cached_query(PORTFOLIO_KPI_SQL, endpoint="portfolio")[0]["total_accounts"]
+    if accepts_columnar(request.headers.get("accept")):
+        result = query_columnar(RISK_MATRIX_SQL, [limit, offset], order_by=RISK_MATRIX_ORDER)
+        next_offset = offset + result["rows"]
+        return columnar_response(
+            result, total=total, offset=offset, next_offset=next_offset if next_offset < total else None
+        )
+    rows = _risk_matrix_page(limit, offset)
+    next_offset = offset + len(rows)
     return {
-        "kpis": {
-            "total_arr": total_arr,
-            "total_accounts": len(risk_rows),
-            "arr_at_risk": red_arr,
-            "arr_at_risk_pct": round(red_arr / total_arr * 100, 1) if total_arr else 0,
-            "red_count": health_counts.get("red", 0),
-            "yellow_count": health_counts.get("yellow", 0),
-            "green_count": health_counts.get("green", 0),
-            "next_renewal_days": next_renewal["days_to_renewal"] if next_renewal else None,
-            "next_renewal_name": next_renewal["account_name"] if next_renewal else None,
-        },
-        "arr_bands": arr_bands,
-        "renewal_pipeline": renewal_pipeline,
-        "renewals_90d": renewals,
-        "risk_matrix": risk_rows,
+        "rows": rows,
+        "total": total,
+        "offset": offset,
+        "next_offset": next_offset if next_offset < total else None,
     }
@@ -0,0 +1,10 @@
+from fastapi import APIRouter
+from core.db import cache_stats, pool_stats
+from core.guardrails import verdict_stats
+
+router = APIRouter(prefix="/api")
+
+
+@router.get("/system/db")
+def db_stats():
+    return {"pool": pool_stats(), "cache": cache_stats(), "guardrails": verdict_stats()}
@@ -0,0 +1,119 @@
+from __future__ import annotations
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Awaitable, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+CACHE_PATH = Path(os.environ.get(
+    "BRIEFING_CACHE_PATH",
+    str(Path(__file__).parent.parent / "duckdb" / "briefing_cache.sqlite"),
+))
+CACHE_TTL = float(os.environ.get("BRIEFING_CACHE_TTL", "3600"))
+CACHE_MAX_STALE = float(os.environ.get("BRIEFING_CACHE_MAX_STALE", "86400"))
+
+_inflight: dict[str, asyncio.Task] = {}
+_schema_ready = False
+
+
+@contextmanager
+def _conn():
+    global _schema_ready
+    CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    con = sqlite3.connect(str(CACHE_PATH), timeout=5)
+    try:
+        if not _schema_ready:
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute("""
+                CREATE TABLE IF NOT EXISTS briefing_cache (
+                    fingerprint TEXT PRIMARY KEY,
+                    payload TEXT NOT NULL,
+                    generated_at REAL NOT NULL
+                )
+            """)
+            _schema_ready = True
+        yield con
+        con.commit()
+    finally:
+        con.close()
+
+
+def fingerprint(*inputs) -> str:
+    raw = json.dumps(inputs, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def _load(fp: str) -> Optional[tuple[dict, float]]:
+    try:
+        with _conn() as con:
+            row = con.execute(
+                "SELECT payload, generated_at FROM briefing_cache WHERE fingerprint = ?", (fp,)
+            ).fetchone()
+    except sqlite3.Error as exc:
+        logger.warning("Briefing cache read failed: %s", exc)
+        return None
+    if not row:
+        return None
+    return json.loads(row[0]), row[1]
+
+
+def _store(fp: str, payload: dict) -> None:
+    try:
+        with _conn() as con:
+            con.execute(
+                "INSERT OR REPLACE INTO briefing_cache (fingerprint, payload, generated_at) VALUES (?, ?, ?)",
+                (fp, json.dumps(payload, default=str), time.time()),
+            )
+            con.execute(
+                "DELETE FROM briefing_cache WHERE generated_at < ?",
+                (time.time() - CACHE_TTL - CACHE_MAX_STALE,),
+            )
+    except sqlite3.Error as exc:
+        logger.warning("Briefing cache write failed: %s", exc)
+
+
+async def _generate_and_store(fp: str, generate: Callable[[], Awaitable[dict]]) -> dict:
+    result = await generate()
+    if result.get("ai_generated"):
+        await asyncio.to_thread(_store, fp, result)
+    return result
+
+
+def _refresh_in_background(fp: str, generate: Callable[[], Awaitable[dict]]) -> None:
+    if fp in _inflight:
+        return
+
+    async def _run():
+        try:
+            await _generate_and_store(fp, generate)
+        except Exception as exc:
+            logger.warning("Background briefing refresh failed: %s", exc)
+        finally:
+            _inflight.pop(fp, None)
+
+    _inflight[fp] = asyncio.get_running_loop().create_task(_run())
+
+
+async def get_or_generate(fp: str, generate: Callable[[], Awaitable[dict]], force: bool = False) -> dict:
+    cached = None if force else await asyncio.to_thread(_load, fp)
+    if cached is None:
+        result = await _generate_and_store(fp, generate)
+        return {**result, "cached": False, "stale": False}
+
+    payload, generated_at = cached
+    age = time.time() - generated_at
+    if age <= CACHE_TTL:
+        return {**payload, "cached": True, "stale": False, "age_seconds": round(age)}
+    if age <= CACHE_TTL + CACHE_MAX_STALE:
+        _refresh_in_background(fp, generate)
+        return {**payload, "cached": True, "stale": True, "age_seconds": round(age)}
+
+    result = await _generate_and_store(fp, generate)
+    return {**result, "cached": False, "stale": False}
@@ -0,0 +1,100 @@
+from __future__ import annotations
+import json
+import threading
+from collections import OrderedDict
+from typing import Optional, Sequence
+
+from fastapi.responses import Response
+
+from core.db import get_conn
+
+COLUMNAR_MEDIA_TYPE = "application/vnd.revenue-intel.columnar+json"
+RESULT_COLUMNS_MAX_ENTRIES = 256
+
+_columns: OrderedDict[str, list[str]] = OrderedDict()
+_columns_lock = threading.Lock()
+
+
+def _media_ranges(accept: str) -> dict[str, float]:
+    ranges = {}
+    for part in accept.split(","):
+        media, *options = [p.strip() for p in part.split(";")]
+        q = 1.0
+        for opt in options:
+            if opt.startswith("q="):
+                try:
+                    q = float(opt[2:])
+                except ValueError:
+                    q = 0.0
+        if media:
+            ranges[media.lower()] = q
+    return ranges
+
+
+def accepts_columnar(accept: Optional[str]) -> bool:
+    if not accept:
+        return False
+    ranges = _media_ranges(accept)
+    q = ranges.get(COLUMNAR_MEDIA_TYPE, 0.0)
+    return q > 0 and q >= ranges.get("application/json", 0.0)
+
+
+def _quote_ident(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _quote_str(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+def result_columns(con, sql: str, params=None) -> list[str]:
+    with _columns_lock:
+        cols = _columns.get(sql)
+        if cols is not None:
+            _columns.move_to_end(sql)
+            return cols
+    res = con.execute(f"SELECT * FROM ({sql}) __q LIMIT 0", params or [])
+    cols = [d[0] for d in res.description]
+    with _columns_lock:
+        _columns[sql] = cols
+        while len(_columns) > RESULT_COLUMNS_MAX_ENTRIES:
+            _columns.popitem(last=False)
+    return cols
+
+
+def query_columnar(
+    sql: str,
+    params=None,
+    *,
+    order_by: Sequence[str],
+    limit: Optional[int] = None,
+    tail: Sequence[str] = (),
+) -> dict:
+    with get_conn() as con:
+        columns = result_columns(con, sql, params)
+        data_cols = [c for c in columns if c not in tail]
+        keep = "" if limit is None else f" FILTER (WHERE __ord <= {int(limit)})"
+        data = ", ".join(f"{_quote_str(c)}: list({_quote_ident(c)} ORDER BY __ord){keep}" for c in data_cols)
+        last = "".join(
+            f", arg_max({_quote_ident(c)}, __ord){keep}" for c in tail
+        )
+        row = con.execute(f"""
+            SELECT to_json({{{data}}})::VARCHAR, count(*){last}
+            FROM (SELECT *, row_number() OVER (ORDER BY {', '.join(order_by)}) AS __ord FROM ({sql}) __q) __r
+        """, params or []).fetchone()
+    fetched = row[1]
+    rows = fetched if limit is None else min(fetched, int(limit))
+    payload = row[0] if rows else json.dumps({c: [] for c in data_cols}, separators=(",", ":"))
+    return {
+        "columns": data_cols,
+        "data": payload,
+        "rows": rows,
+        "more": limit is not None and fetched > int(limit),
+        "tail": dict(zip(tail, row[2:])),
+    }
+
+
+def columnar_response(result: dict, **meta) -> Response:
+    head = json.dumps({"columns": result["columns"], "rows": result["rows"], **meta}, default=str, separators=(",", ":"))
+    body = head[:-1] + ',"data":' + result["data"] + "}"
+    return Response(content=body, media_type=COLUMNAR_MEDIA_TYPE, headers={"Vary": "Accept"})
@@ -1,18 +1,348 @@
 from __future__ import annotations
-import duckdb
+import os
+import threading
+import time
+from collections import OrderedDict
 from contextlib import contextmanager
 from pathlib import Path
+from typing import Optional
+
+import duckdb
 
 DB_PATH = Path(__file__).parent.parent / "duckdb" / "revenue_intel.duckdb"
+BUILD_FLAG_PATH = DB_PATH.with_name(DB_PATH.name + ".build")
+
+POOL_SIZE = int(os.environ.get("DUCKDB_POOL_SIZE", "8"))
+POOL_TIMEOUT = float(os.environ.get("DUCKDB_POOL_TIMEOUT", "10"))
+POOL_MAX_IDLE = float(os.environ.get("DUCKDB_POOL_MAX_IDLE", "30"))
+
+CACHE_TTL = float(os.environ.get("DUCKDB_CACHE_TTL", "300"))
+CACHE_MAX_ENTRIES = int(os.environ.get("DUCKDB_CACHE_MAX_ENTRIES", "256"))
+CACHE_MAX_ROWS = int(os.environ.get("DUCKDB_CACHE_MAX_ROWS", "200000"))
+
+
+class PoolTimeout(RuntimeError):
+    pass
+
+
+class BuildInProgress(PoolTimeout):
+    pass
+
+
+def _file_key(path: Path) -> tuple:
+    st = os.stat(path)
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+class _Generation:
+    def __init__(self, path: Path, key: tuple):
+        self.key = key
+        self.root = duckdb.connect(str(path), read_only=True)
+        self.in_use = 0
+        self.retired = False
+
+    def close(self) -> None:
+        try:
+            self.root.close()
+        except Exception:
+            pass
+
+
+class ConnectionPool:
+    def __init__(
+        self,
+        path: Path,
+        size: int = POOL_SIZE,
+        timeout: float = POOL_TIMEOUT,
+        max_idle: float = POOL_MAX_IDLE,
+        build_flag: Optional[Path] = None,
+    ):
+        self.path = path
+        self.build_flag = build_flag or path.with_name(path.name + ".build")
+        self.size = max(1, size)
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self._cond = threading.Condition()
+        self._local = threading.local()
+        self._gen: Optional[_Generation] = None
+        self._idle: list[tuple[duckdb.DuckDBPyConnection, _Generation, float]] = []
+        self._open = 0
+        self._waits = 0
+        self._checkouts = 0
+        self._reopens = 0
+        self._build_releases = 0
+        self._reaper: Optional[threading.Thread] = None
+
+    def build_requested(self) -> bool:
+        return self.build_flag.exists()
+
+    def _release_for_build(self) -> None:
+        gen = self._gen
+        if gen is not None:
+            self._retire(gen)
+            self._build_releases += 1
+
+    def _current_generation(self) -> _Generation:
+        key = _file_key(self.path)
+        gen = self._gen
+        if gen is not None and gen.key == key:
+            return gen
+        if gen is not None:
+            self._retire(gen)
+            self._reopens += 1
+        self._gen = _Generation(self.path, key)
+        return self._gen
+
+    def _retire(self, gen: _Generation) -> None:
+        gen.retired = True
+        keep = []
+        for cur, g, ts in self._idle:
+            if g is gen:
+                self._close_cursor(cur)
+            else:
+                keep.append((cur, g, ts))
+        self._idle = keep
+        if gen.in_use == 0:
+            gen.close()
+        if self._gen is gen:
+            self._gen = None
+
+    def _close_cursor(self, cur: duckdb.DuckDBPyConnection) -> None:
+        self._open -= 1
+        try:
+            cur.close()
+        except Exception:
+            pass
+
+    def _acquire(self) -> tuple[duckdb.DuckDBPyConnection, _Generation]:
+        deadline = time.monotonic() + self.timeout
+        waited = False
+        with self._cond:
+            while True:
+                if self.build_requested():
+                    self._release_for_build()
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise BuildInProgress(f"DuckDB build in progress ({self.build_flag.name} present)")
+                    if not waited:
+                        self._waits += 1
+                        waited = True
+                    self._cond.wait(min(remaining, 0.25))
+                    continue
+                gen = self._current_generation()
+                while self._idle:
+                    cur, g, _ = self._idle.pop()
+                    if g is gen:
+                        gen.in_use += 1
+                        self._checkouts += 1
+                        return cur, gen
+                    self._close_cursor(cur)
+                if self._open < self.size:
+                    cur = gen.root.cursor()
+                    self._open += 1
+                    gen.in_use += 1
+                    self._checkouts += 1
+                    self._ensure_reaper()
+                    return cur, gen
+                if not waited:
+                    self._waits += 1
+                    waited = True
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolTimeout(f"No DuckDB connection available within {self.timeout}s")
+                self._cond.wait(remaining)
+
+    def _release(self, cur: duckdb.DuckDBPyConnection, gen: _Generation, broken: bool = False) -> None:
+        with self._cond:
+            gen.in_use -= 1
+            if broken or gen.retired:
+                self._close_cursor(cur)
+            else:
+                self._idle.append((cur, gen, time.monotonic()))
+            if gen.retired and gen.in_use == 0:
+                gen.close()
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self):
+        held = getattr(self._local, "held", None)
+        if held is not None:
+            held[2] += 1
+            try:
+                yield held[0]
+            finally:
+                held[2] -= 1
+            return
+        cur, gen = self._acquire()
+        self._local.held = [cur, gen, 1]
+        broken = False
+        try:
+            yield cur
+        except duckdb.ConnectionException:
+            broken = True
+            raise
+        finally:
+            self._local.held = None
+            self._release(cur, gen, broken)
+
+    def reap_idle(self) -> int:
+        cutoff = time.monotonic() - self.max_idle
+        with self._cond:
+            stale = [(cur, g) for cur, g, ts in self._idle if ts < cutoff]
+            self._idle = [(cur, g, ts) for cur, g, ts in self._idle if ts >= cutoff]
+            for cur, _ in stale:
+                self._close_cursor(cur)
+            if self.build_requested():
+                self._release_for_build()
+            elif self._gen is not None and self._open == 0:
+                self._retire(self._gen)
+            return len(stale)
+
+    def _ensure_reaper(self) -> None:
+        if self.max_idle <= 0 or (self._reaper is not None and self._reaper.is_alive()):
+            return
+
+        def _loop():
+            while True:
+                time.sleep(max(1.0, self.max_idle / 2))
+                self.reap_idle()
+                with self._cond:
+                    if self._gen is None and not self._idle:
+                        self._reaper = None
+                        return
+
+        self._reaper = threading.Thread(target=_loop, name="duckdb-pool-reaper", daemon=True)
+        self._reaper.start()
+
+    def close_all(self) -> None:
+        with self._cond:
+            for cur, _, _ in self._idle:
+                self._close_cursor(cur)
+            self._idle = []
+            if self._gen is not None:
+                self._retire(self._gen)
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "size": self.size,
+                "open": self._open,
+                "idle": len(self._idle),
+                "in_use": self._open - len(self._idle),
+                "waits": self._waits,
+                "checkouts": self._checkouts,
+                "reopens": self._reopens,
+                "build_releases": self._build_releases,
+                "build_requested": self.build_requested(),
+                "db_loaded": self._gen is not None,
+            }
+
+
+class ResultCache:
+    def __init__(self, path: Path, ttl: float = CACHE_TTL, max_entries: int = CACHE_MAX_ENTRIES, max_rows: int = CACHE_MAX_ROWS):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max(1, max_entries)
+        self.max_rows = max(1, max_rows)
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[tuple, tuple[float, list[dict]]] = OrderedDict()
+        self._rows = 0
+        self._build_key: Optional[tuple] = None
+        self._counters: dict[str, dict[str, int]] = {}
+        self._evictions = 0
+        self._invalidations = 0
+
+    def _count(self, endpoint: str, field: str) -> None:
+        counters = self._counters.setdefault(endpoint, {"hits": 0, "misses": 0})
+        counters[field] += 1
+
+    def _check_build(self) -> None:
+        key = _file_key(self.path)
+        if key != self._build_key:
+            if self._build_key is not None and self._entries:
+                self._invalidations += 1
+            self._entries.clear()
+            self._rows = 0
+            self._build_key = key
+
+    def get(self, key: tuple, endpoint: str) -> Optional[list[dict]]:
+        with self._lock:
+            self._check_build()
+            hit = self._entries.get(key)
+            if hit is not None and hit[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self._count(endpoint, "hits")
+                return hit[1]
+            if hit is not None:
+                self._drop(key)
+            self._count(endpoint, "misses")
+            return None
+
+    def put(self, key: tuple, rows: list[dict], build_key: tuple) -> None:
+        if len(rows) > self.max_rows:
+            return
+        with self._lock:
+            if build_key != self._build_key:
+                return
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (time.monotonic() + self.ttl, rows)
+            self._rows += len(rows)
+            while len(self._entries) > self.max_entries or self._rows > self.max_rows:
+                self._drop(next(iter(self._entries)))
+                self._evictions += 1
+
+    def _drop(self, key: tuple) -> None:
+        _, rows = self._entries.pop(key)
+        self._rows -= len(rows)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._rows = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "rows": self._rows,
+                "max_entries": self.max_entries,
+                "max_rows": self.max_rows,
+                "ttl_seconds": self.ttl,
+                "evictions": self._evictions,
+                "invalidations": self._invalidations,
+                "endpoints": {k: dict(v) for k, v in self._counters.items()},
+            }
+
+
+_pool = ConnectionPool(DB_PATH, build_flag=BUILD_FLAG_PATH)
+_cache = ResultCache(DB_PATH)
+
+
+def build_key() -> tuple:
+    return _file_key(DB_PATH)
+
+
+def pool_stats() -> dict:
+    return _pool.stats()
+
+
+def close_pool() -> None:
+    _pool.close_all()
+
+
+def cache_stats() -> dict:
+    return _cache.stats()
+
+
+def clear_cache() -> None:
+    _cache.clear()
 
 
 @contextmanager
 def get_conn():
-    con = duckdb.connect(str(DB_PATH), read_only=True)
-    try:
+    with _pool.connection() as con:
         yield con
-    finally:
-        con.close()
 
 
 def query(sql: str, params: list = None) -> list[dict]:
@@ -25,3 +355,13 @@ def query(sql: str, params: list = None) -> list[dict]:
 def query_one(sql: str, params: list = None) -> dict | None:
     rows = query(sql, params)
     return rows[0] if rows else None
+
+
+def cached_query(sql: str, params: list = None, endpoint: str = "default") -> list[dict]:
+    key = (sql, tuple(params or ()))
+    rows = _cache.get(key, endpoint)
+    if rows is None:
+        build_key = _file_key(DB_PATH)
+        rows = query(sql, params)
+        _cache.put(key, rows, build_key)
+    return [dict(r) for r in rows]
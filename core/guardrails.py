@@ -1,5 +1,15 @@
 from __future__ import annotations
+import json
+import os
 import re
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Callable, Iterable, Optional
+
+import duckdb
+
+from core.db import build_key, query
 
 BLOCKED_KEYWORDS = [
     "insert", "update", "delete", "merge", "create",
@@ -11,54 +21,258 @@ PII_PATTERNS = [
     "postcode", "zip", "iban", "card", "credit", "password", "token",
 ]
 
+VERDICT_CACHE_MAX_ENTRIES = int(os.environ.get("GUARDRAIL_CACHE_MAX_ENTRIES", "4096"))
+ENGINE = os.environ.get("GUARDRAIL_ENGINE", "regex").lower()
+
+_NON_IDENT_RE = re.compile(r"[^a-zA-Z0-9_]")
+_TABLE_RE = re.compile(r"(?:from|join)\s+([a-zA-Z0-9_]+)", re.IGNORECASE)
+_SELECT_LIST_RE = re.compile(r"select\s+(.*?)\s+from\s", re.IGNORECASE | re.DOTALL)
+_COLUMN_SPLIT_RE = re.compile(r",(?![^()]*\))")
+_ALIAS_RE = re.compile(r"\s+as\s+", re.IGNORECASE)
+_LIMIT_RE = re.compile(r"\blimit\s+(?:\d+\b|\$[a-zA-Z_]\w*|\?)", re.IGNORECASE)
+_BLOCKED_RE = re.compile(r"\b(" + "|".join(BLOCKED_KEYWORDS) + r")\b", re.IGNORECASE)
+_PII_RE = re.compile("|".join(re.escape(p) for p in PII_PATTERNS))
+
 
 def _normalize(name: str) -> str:
-    return re.sub(r"[^a-zA-Z0-9_]", "", name or "").lower()
+    return _NON_IDENT_RE.sub("", name or "").lower()
+
+
+def fingerprint(sql: str) -> str:
+    return " ".join((sql or "").split())
 
 
 def extract_tables(sql: str) -> list[str]:
-    return [m.group(1) for m in re.finditer(r"(?:from|join)\s+([a-zA-Z0-9_]+)", sql, re.IGNORECASE)]
+    return _TABLE_RE.findall(sql)
 
 
 def _extract_select_columns(sql: str) -> list[str]:
-    match = re.search(r"select\s+(.*?)\s+from\s", sql, re.IGNORECASE | re.DOTALL)
+    match = _SELECT_LIST_RE.search(sql)
     if not match:
         return []
-    parts = re.split(r",(?![^()]*\))", match.group(1))
     cols = []
-    for part in parts:
+    for part in _COLUMN_SPLIT_RE.split(match.group(1)):
         tok = part.strip()
         if not tok:
             continue
-        tok = re.split(r"\s+as\s+", tok, flags=re.IGNORECASE)[0]
+        tok = _ALIAS_RE.split(tok, 1)[0]
         tok = tok.split()[0].split(".")[-1]
         cols.append(tok)
     return cols
 
 
 def _blocked_found(sql: str) -> list[str]:
-    return [kw.upper() for kw in BLOCKED_KEYWORDS if re.search(rf"\b{kw}\b", sql, re.IGNORECASE)]
-
-
-def compute_guardrails(sql: str, allowed_assets: set[str], df_shape: tuple[int, int]) -> dict:
-    s = (sql or "").strip()
-    low = s.lower()
-    blocked = _blocked_found(s)
-    select_only = (low.startswith("select") or low.startswith("with")) and not blocked
-    tables = extract_tables(s)
-    allowlisted = bool(tables) and all(_normalize(t) in {a.lower() for a in allowed_assets} for t in tables)
-    has_limit = bool(re.search(r"\blimit\s+\d+\b", s, re.IGNORECASE))
-    cols = _extract_select_columns(s)
-    pii_hits = [c for c in cols if any(p in _normalize(c) for p in PII_PATTERNS)]
-    no_pii = len(pii_hits) == 0 if cols else True
-    rows, ncols = df_shape
+    found = {m.lower() for m in _BLOCKED_RE.findall(sql)}
+    return [kw.upper() for kw in BLOCKED_KEYWORDS if kw in found] if found else []
+
+
+def _analyze(sql: str) -> dict:
+    low = sql.lower()
+    blocked = _blocked_found(sql)
+    cols = _extract_select_columns(sql)
     return {
-        "select_only": select_only,
-        "allowlisted_assets": allowlisted,
-        "row_limit_present": has_limit,
-        "no_pii_columns": no_pii,
+        "select_only": (low.startswith("select") or low.startswith("with")) and not blocked,
+        "row_limit_present": bool(_LIMIT_RE.search(sql)),
+        "no_pii_columns": not any(_PII_RE.search(_normalize(c)) for c in cols),
         "blocked_keywords_found": blocked,
-        "tables_used": tables,
+        "tables_used": extract_tables(sql),
+    }
+
+
+_parser_local = threading.local()
+
+
+def parse_sql(sql: str) -> dict:
+    con = getattr(_parser_local, "con", None)
+    if con is None:
+        con = _parser_local.con = duckdb.connect()
+    return json.loads(con.execute("SELECT json_serialize_sql(?)", [sql]).fetchone()[0])
+
+
+def _collect_relations(node, ctes: frozenset, out: list[str]) -> None:
+    if isinstance(node, list):
+        for child in node:
+            _collect_relations(child, ctes, out)
+        return
+    if not isinstance(node, dict):
+        return
+    cte_map = node.get("cte_map")
+    if cte_map and cte_map.get("map"):
+        ctes = ctes | {entry["key"].lower() for entry in cte_map["map"]}
+    kind = node.get("type")
+    if kind == "BASE_TABLE":
+        parts = [p for p in (node.get("catalog_name"), node.get("schema_name")) if p]
+        name = node["table_name"]
+        if parts or name.lower() not in ctes:
+            out.append(".".join([*parts, name]))
+    elif kind == "TABLE_FUNCTION":
+        out.append(node["function"]["function_name"] + "()")
+    for value in node.values():
+        if isinstance(value, (dict, list)):
+            _collect_relations(value, ctes, out)
+
+
+def _column_refs(expr, out: list[str]) -> None:
+    if isinstance(expr, list):
+        for child in expr:
+            _column_refs(child, out)
+        return
+    if not isinstance(expr, dict):
+        return
+    if expr.get("class") == "COLUMN_REF":
+        out.append(expr["column_names"][-1])
+    elif expr.get("class") == "SUBQUERY":
+        return
+    for value in expr.values():
+        if isinstance(value, (dict, list)):
+            _column_refs(value, out)
+
+
+def _projection(node: dict) -> tuple[list[str], list[str]]:
+    while node.get("type") == "SET_OPERATION_NODE":
+        node = node["left"]
+    names, refs = [], []
+    for expr in node.get("select_list", []):
+        before = len(refs)
+        _column_refs(expr, refs)
+        if expr.get("alias"):
+            names.append(expr["alias"])
+        elif expr.get("class") == "STAR":
+            names.append("*")
+        elif expr.get("class") == "COLUMN_REF":
+            names.append(expr["column_names"][-1])
+        else:
+            names.append(expr.get("function_name") or (refs[before] if len(refs) > before else expr.get("class", "").lower()))
+    return names, refs
+
+
+def _limit(node: dict) -> tuple[bool, Optional[int]]:
+    for modifier in node.get("modifiers", []):
+        if modifier.get("type") in ("LIMIT_MODIFIER", "LIMIT_PERCENT_MODIFIER") and modifier.get("limit"):
+            limit = modifier["limit"]
+            value = limit.get("value", {}).get("value") if limit.get("class") == "CONSTANT" else None
+            return True, value if isinstance(value, int) else None
+    return False, None
+
+
+def _analyze_ast(sql: str) -> dict:
+    tree = parse_sql(sql)
+    if tree.get("error") or len(tree["statements"]) != 1:
+        return {
+            "select_only": False,
+            "row_limit_present": False,
+            "no_pii_columns": True,
+            "blocked_keywords_found": _blocked_found(sql),
+            "tables_used": [],
+            "statement_type": "error" if tree.get("error_type") == "parser" else "other",
+            "error": tree.get("error_message") or "Multiple statements are not allowed",
+        }
+    node = tree["statements"][0]["node"]
+    tables: list[str] = []
+    _collect_relations(node, frozenset(), tables)
+    names, refs = _projection(node)
+    has_limit, limit = _limit(node)
+    return {
+        "select_only": True,
+        "row_limit_present": has_limit,
+        "no_pii_columns": not any(_PII_RE.search(_normalize(c)) for c in (*names, *refs)),
+        "blocked_keywords_found": [],
+        "tables_used": list(dict.fromkeys(tables)),
+        "statement_type": "select",
+        "projected_columns": names,
+        "row_limit": limit,
+    }
+
+
+class VerdictCache:
+    def __init__(self, analyzer: Callable[[str], dict], max_entries: int = VERDICT_CACHE_MAX_ENTRIES):
+        self.analyzer = analyzer
+        self.max_entries = max(1, max_entries)
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, dict] = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+    def analyze(self, sql: str) -> dict:
+        key = fingerprint(sql)
+        with self._lock:
+            hit = self._entries.get(key)
+            if hit is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return hit
+            self._misses += 1
+        verdict = self.analyzer(key)
+        with self._lock:
+            self._entries[key] = verdict
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return verdict
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self._hits,
+                "misses": self._misses,
+            }
+
+
+_verdicts = {"regex": VerdictCache(_analyze), "ast": VerdictCache(_analyze_ast)}
+
+
+def analyze_sql(sql: str, engine: Optional[str] = None) -> dict:
+    return _verdicts[engine or ENGINE].analyze(sql)
+
+
+def verdict_stats() -> dict:
+    return {"engine": ENGINE, **{name: cache.stats() for name, cache in _verdicts.items()}}
+
+
+@lru_cache(maxsize=32)
+def _lowered(assets: frozenset) -> frozenset:
+    return frozenset(a.lower() for a in assets)
+
+
+_allowlist: Optional[tuple[tuple, frozenset]] = None
+_allowlist_lock = threading.Lock()
+
+
+def load_allowlist() -> frozenset:
+    global _allowlist
+    key = build_key()
+    cached = _allowlist
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    with _allowlist_lock:
+        if _allowlist is None or _allowlist[0] != key:
+            rows = query("SELECT asset_name FROM dim_ai_allowed_assets WHERE is_allowed_for_ai")
+            _allowlist = (key, frozenset(r["asset_name"].lower() for r in rows))
+        return _allowlist[1]
+
+
+def compute_guardrails(
+    sql: str,
+    allowed_assets: Iterable[str],
+    df_shape: tuple[int, int],
+    analysis: dict | None = None,
+) -> dict:
+    analysis = analysis or analyze_sql(sql)
+    tables = analysis["tables_used"]
+    allowed = _lowered(allowed_assets if isinstance(allowed_assets, frozenset) else frozenset(allowed_assets))
+    rows, ncols = df_shape
+    return {
+        "select_only": analysis["select_only"],
+        "allowlisted_assets": bool(tables) and all(not t.endswith("()") and _normalize(t) in allowed for t in tables),
+        "row_limit_present": analysis["row_limit_present"],
+        "no_pii_columns": analysis["no_pii_columns"],
+        "blocked_keywords_found": list(analysis["blocked_keywords_found"]),
+        "tables_used": list(tables),
         "result_rows": rows,
         "result_cols": ncols,
     }
@@ -1,6 +1,10 @@
 from __future__ import annotations
-import copy
+import heapq
+import math
 import re
+from collections import Counter, defaultdict
+from typing import Optional
+
 from rapidfuzz import process, fuzz
 
 INTENT_PATTERNS: dict[str, list[str]] = {
@@ -43,27 +47,78 @@ _DEFAULT_PARAMS: dict[str, dict] = {
 _RISK_WORDS = {"at risk", "at-risk", "risk", "risky", "churn", "danger", "critical", "struggling", "troubled"}
 
 
+def _trie_pattern(words: list[str]) -> str:
+    trie: dict = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def render(node: dict) -> str:
+        branches = [re.escape(ch) + render(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return render(trie)
+
+
+def _compile_keywords(patterns: dict[str, list[str]]) -> tuple[re.Pattern, dict[str, tuple[str, ...]]]:
+    keywords = sorted({kw for kws in patterns.values() for kw in kws})
+    prefixes = {kw: tuple(k for k in keywords if kw.startswith(k)) for kw in keywords}
+    return re.compile(f"(?=({_trie_pattern(keywords)}))"), prefixes
+
+
+_KEYWORD_RE, _KEYWORD_PREFIXES = _compile_keywords(INTENT_PATTERNS)
+_KEYWORD_INTENTS: dict[str, tuple[str, ...]] = {
+    kw: tuple(intent for intent, kws in INTENT_PATTERNS.items() if kw in kws)
+    for kw in _KEYWORD_PREFIXES
+}
+_RISK_RE = re.compile("|".join(re.escape(w) for w in sorted(_RISK_WORDS, key=len, reverse=True)))
+
+_NEXT_DAYS_RE = re.compile(r"next\s+(\d+)\s+days?")
+_IN_DAYS_RE = re.compile(r"in\s+(\d+)\s+days?")
+_DAYS_RE = re.compile(r"(\d+)\s+days?")
+_WEEK_RE = re.compile(r"next\s+week|this\s+week")
+_MONTH_RE = re.compile(r"next\s+month|this\s+month")
+_TOP_RE = re.compile(r"top\s+(\d+)")
+_ACCOUNTS_RE = re.compile(r"(\d+)\s+accounts?")
+
+
+def score_intents(q: str) -> dict[str, int]:
+    scores = dict.fromkeys(INTENT_PATTERNS, 0)
+    found = _KEYWORD_RE.findall(q)
+    if not found:
+        return scores
+    for kw in set().union(*[_KEYWORD_PREFIXES[m] for m in set(found)]):
+        for name in _KEYWORD_INTENTS[kw]:
+            scores[name] += 1
+    return scores
+
+
 def _extract_days(q: str) -> int | None:
-    m = re.search(r"next\s+(\d+)\s+days?", q) or re.search(r"in\s+(\d+)\s+days?", q)
+    m = _NEXT_DAYS_RE.search(q) or _IN_DAYS_RE.search(q)
     if m:
         return int(m.group(1))
-    m = re.search(r"(\d+)\s+days?", q)
+    m = _DAYS_RE.search(q)
     if m:
         return int(m.group(1))
-    if re.search(r"next\s+week|this\s+week", q):
+    if _WEEK_RE.search(q):
         return 7
-    if re.search(r"next\s+month|this\s+month", q):
+    if _MONTH_RE.search(q):
         return 30
-    if re.search(r"quarter", q):
+    if "quarter" in q:
         return 90
     return None
 
 
 def _extract_limit(q: str) -> int | None:
-    m = re.search(r"top\s+(\d+)", q)
+    m = _TOP_RE.search(q)
     if m:
         return int(m.group(1))
-    m = re.search(r"(\d+)\s+accounts?", q)
+    m = _ACCOUNTS_RE.search(q)
     if m:
         n = int(m.group(1))
         if 1 <= n <= 100:
@@ -80,19 +135,84 @@ def extract_account(question: str, account_names: list[str]) -> str | None:
     return match[0] if match else None
 
 
-def detect_intent(question: str, account_names: list[str]) -> dict:
+_TOKEN_RE = re.compile(r"\w+")
+
+PREFILTER_MIN_NAMES = 2000
+PREFILTER_MAX_CANDIDATES = 512
+PREFILTER_MIN_COVERAGE = 0.4
+PREFILTER_MAX_DF = 0.25
+
+
+def _trigrams(text: str) -> set[str]:
+    grams = set()
+    for token in _TOKEN_RE.findall(text.lower()):
+        if len(token) < 3:
+            continue
+        grams.update(token[i:i + 3] for i in range(len(token) - 2))
+    return grams
+
+
+class AccountNameIndex:
+    def __init__(self, names: list[str], ids: Optional[list[str]] = None):
+        self.names = names
+        self.ids = list(ids) if ids else []
+        self._by_id = dict(zip(ids, names)) if ids else {}
+        self._postings: Optional[dict[str, list[int]]] = None
+        self._gram_counts: list[int] = []
+        self._min_hits: list[int] = []
+        self._unindexed: list[int] = []
+        if len(names) >= PREFILTER_MIN_NAMES:
+            grams_by_name = [_trigrams(name) for name in names]
+            postings: dict[str, list[int]] = defaultdict(list)
+            for i, grams in enumerate(grams_by_name):
+                for gram in grams:
+                    postings[gram].append(i)
+            max_df = len(names) * PREFILTER_MAX_DF
+            self._postings = {g: ids for g, ids in postings.items() if len(ids) <= max_df}
+            for i, grams in enumerate(grams_by_name):
+                kept = sum(1 for gram in grams if gram in self._postings)
+                self._gram_counts.append(kept)
+                self._min_hits.append(max(1, math.ceil(kept * PREFILTER_MIN_COVERAGE)))
+                if not kept:
+                    self._unindexed.append(i)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def name_for(self, account_id: str) -> Optional[str]:
+        return self._by_id.get(account_id)
+
+    def candidates(self, question: str) -> list[str]:
+        if self._postings is None:
+            return self.names
+        counts: Counter = Counter()
+        for gram in _trigrams(question):
+            ids = self._postings.get(gram)
+            if ids:
+                counts.update(ids)
+        if not counts:
+            return self.names
+        gram_counts, min_hits = self._gram_counts, self._min_hits
+        scored = [(hits / gram_counts[i], hits, i) for i, hits in counts.items() if hits >= min_hits[i]]
+        if not scored:
+            return self.names
+        top = sorted({i for _, _, i in heapq.nlargest(PREFILTER_MAX_CANDIDATES, scored)}.union(self._unindexed))
+        return [self.names[i] for i in top]
+
+    def match(self, question: str) -> str | None:
+        return extract_account(question, self.candidates(question))
+
+
+def detect_intent(question: str, account_names: list[str], account_index: Optional[AccountNameIndex] = None) -> dict:
     q = question.lower()
 
-    scores = {
-        intent: sum(1 for kw in keywords if kw in q)
-        for intent, keywords in INTENT_PATTERNS.items()
-    }
+    scores = score_intents(q)
     best = max(scores, key=scores.get)
     if scores[best] == 0:
         best = "account_overview"
 
-    account = extract_account(question, account_names)
-    params = copy.deepcopy(_DEFAULT_PARAMS[best])
+    account = account_index.match(question) if account_index is not None else extract_account(question, account_names)
+    params = dict(_DEFAULT_PARAMS[best])
     if "account_name" in params:
         params["account_name"] = account
 
@@ -104,7 +224,7 @@ def detect_intent(question: str, account_names: list[str]) -> dict:
         if limit is not None:
             params["limit_n"] = limit
         # Relax health filter when user asks about renewals generically (not specifically risky)
-        if not any(w in q for w in _RISK_WORDS):
+        if not _RISK_RE.search(q):
             params["health_threshold"] = 1.0
 
     if best == "expansion_shortlist":
@@ -1,8 +1,10 @@
 from __future__ import annotations
 import json
 import logging
-import os
-from typing import Any
+import re
+from typing import Any, AsyncIterator
+
+from core.llm_client import get_async_client
 
 logger = logging.getLogger(__name__)
 
@@ -69,71 +71,169 @@ def format_rows_for_llm(intent: str, rows: list[dict], account_name: str | None)
     return "\n".join(summary_lines)
 
 
-def generate_insight(
+def _insight_fallback(intent: str, rows: list[dict]) -> dict:
+    from core.interpreters import interpret
+    from core.question_packs import FOLLOWUP_SUGGESTIONS
+
+    fallback = interpret(intent, rows[0] if rows else {}, rows)
+    return {**fallback, "followups": FOLLOWUP_SUGGESTIONS.get(intent, [])[:3]}
+
+
+def _insight_messages(
     intent: str,
     rows: list[dict],
     question: str,
     account_name: str | None,
     history: list[dict],
-    use_ai: bool = True,
-) -> dict:
-    from core.interpreters import interpret
-    from core.question_packs import FOLLOWUP_SUGGESTIONS
+) -> list[dict]:
+    data_context = format_rows_for_llm(intent, rows, account_name)
+    user_content = (
+        f"User question: {question}\n\n"
+        f"Intent: {intent}\n"
+        f"Account context: {account_name or 'Portfolio-level query'}\n\n"
+        f"Query results:\n{data_context}\n\n"
+        "Generate a response as Piotr. Return only valid JSON."
+    )
+
+    messages = []
+    for h in history[-6:]:
+        role = h.get("role", "user")
+        content = h.get("content", "")
+        if role in ("user", "assistant") and content:
+            messages.append({"role": role, "content": content})
+    messages.append({"role": "user", "content": user_content})
+    return messages
+
+
+def _insight_result(raw: str) -> dict:
+    raw = raw.strip()
+    if raw.startswith("```"):
+        parts = raw.split("```")
+        raw = parts[1] if len(parts) > 1 else raw
+        if raw.startswith("json"):
+            raw = raw[4:]
+        raw = raw.strip()
 
-    api_key = os.environ.get("ANTHROPIC_API_KEY")
+    result = json.loads(raw)
+    return {
+        "narrative": result.get("narrative", ""),
+        "bullets": result.get("bullets", [])[:4],
+        "next_action": result.get("next_action", ""),
+        "followups": result.get("followups", [])[:3],
+    }
 
-    if not use_ai or not api_key:
-        fallback = interpret(intent, rows[0] if rows else {}, rows)
-        return {**fallback, "followups": FOLLOWUP_SUGGESTIONS.get(intent, [])[:3]}
 
+async def generate_insight(
+    intent: str,
+    rows: list[dict],
+    question: str,
+    account_name: str | None,
+    history: list[dict],
+    use_ai: bool = True,
+) -> dict:
     try:
-        from anthropic import Anthropic
-        client = Anthropic(api_key=api_key)
-
-        data_context = format_rows_for_llm(intent, rows, account_name)
-        user_content = (
-            f"User question: {question}\n\n"
-            f"Intent: {intent}\n"
-            f"Account context: {account_name or 'Portfolio-level query'}\n\n"
-            f"Query results:\n{data_context}\n\n"
-            "Generate a response as Piotr. Return only valid JSON."
-        )
-
-        messages = []
-        for h in history[-6:]:
-            role = h.get("role", "user")
-            content = h.get("content", "")
-            if role in ("user", "assistant") and content:
-                messages.append({"role": role, "content": content})
-        messages.append({"role": "user", "content": user_content})
+        client = get_async_client() if use_ai else None
+        if client is None:
+            return _insight_fallback(intent, rows)
 
-        response = client.messages.create(
+        response = await client.messages.create(
             model="claude-sonnet-4-6",
             system=SYSTEM_PROMPT,
-            messages=messages,
+            messages=_insight_messages(intent, rows, question, account_name, history),
             max_tokens=600,
         )
-
-        raw = response.content[0].text.strip()
-        if raw.startswith("```"):
-            parts = raw.split("```")
-            raw = parts[1] if len(parts) > 1 else raw
-            if raw.startswith("json"):
-                raw = raw[4:]
-            raw = raw.strip()
-
-        result = json.loads(raw)
-        return {
-            "narrative": result.get("narrative", ""),
-            "bullets": result.get("bullets", [])[:4],
-            "next_action": result.get("next_action", ""),
-            "followups": result.get("followups", [])[:3],
-        }
+        return _insight_result(response.content[0].text)
 
     except Exception as exc:
         logger.warning("LLM generation failed (%s): %s", intent, exc)
-        fallback = interpret(intent, rows[0] if rows else {}, rows)
-        return {**fallback, "followups": FOLLOWUP_SUGGESTIONS.get(intent, [])[:3]}
+        return _insight_fallback(intent, rows)
+
+
+class _JsonStringField:
+    _ESCAPES = {"n": "\n", "t": "\t", "r": "\r", "b": "\b", "f": "\f"}
+
+    def __init__(self, field: str):
+        self._key_re = re.compile(r'"' + re.escape(field) + r'"\s*:\s*"')
+        self._buf = ""
+        self._pos: int | None = None
+        self.done = False
+
+    def feed(self, chunk: str) -> str:
+        self._buf += chunk
+        if self.done:
+            return ""
+        if self._pos is None:
+            m = self._key_re.search(self._buf)
+            if not m:
+                return ""
+            self._pos = m.end()
+
+        buf, i, out = self._buf, self._pos, []
+        while i < len(buf):
+            c = buf[i]
+            if c == "\\":
+                if i + 1 >= len(buf):
+                    break
+                esc = buf[i + 1]
+                if esc == "u":
+                    if i + 6 > len(buf):
+                        break
+                    out.append(chr(int(buf[i + 2:i + 6], 16)))
+                    i += 6
+                    continue
+                out.append(self._ESCAPES.get(esc, esc))
+                i += 2
+                continue
+            if c == '"':
+                self.done = True
+                i += 1
+                break
+            out.append(c)
+            i += 1
+        self._pos = i
+        return "".join(out)
+
+
+async def stream_insight(
+    intent: str,
+    rows: list[dict],
+    question: str,
+    account_name: str | None,
+    history: list[dict],
+    use_ai: bool = True,
+) -> AsyncIterator[tuple[str, dict]]:
+    try:
+        client = get_async_client() if use_ai else None
+    except Exception as exc:
+        logger.warning("LLM client unavailable (%s): %s", intent, exc)
+        client = None
+    if client is None:
+        result = _insight_fallback(intent, rows)
+        yield "narrative", {"delta": result.get("narrative", "")}
+        yield "done", result
+        return
+
+    raw_parts: list[str] = []
+    try:
+        narrative = _JsonStringField("narrative")
+        async with client.messages.stream(
+            model="claude-sonnet-4-6",
+            system=SYSTEM_PROMPT,
+            messages=_insight_messages(intent, rows, question, account_name, history),
+            max_tokens=600,
+        ) as stream:
+            async for text in stream.text_stream:
+                raw_parts.append(text)
+                delta = narrative.feed(text)
+                if delta:
+                    yield "narrative", {"delta": delta}
+        result = _insight_result("".join(raw_parts))
+
+    except Exception as exc:
+        logger.warning("LLM streaming failed (%s): %s", intent, exc)
+        result = _insight_fallback(intent, rows)
+
+    yield "done", result
 
 
 # ─── Briefing ──────────────────────────────────────────────────────────────
@@ -252,19 +352,16 @@ def _briefing_fallback(
     return {"insights": insights[:3], "ai_generated": False}
 
 
-def generate_briefing(
+async def generate_briefing(
     arr_data: list[dict],
     urgent_renewals: list[dict],
     top_expansion: list[dict],
     anomalies: list[dict],
 ) -> dict:
-    api_key = os.environ.get("ANTHROPIC_API_KEY")
-    if not api_key:
-        return _briefing_fallback(arr_data, urgent_renewals, top_expansion, anomalies)
-
     try:
-        from anthropic import Anthropic
-        client = Anthropic(api_key=api_key)
+        client = get_async_client()
+        if client is None:
+            return _briefing_fallback(arr_data, urgent_renewals, top_expansion, anomalies)
 
         band_map = {r["health_band"]: r for r in arr_data}
         red = band_map.get("red", {})
@@ -288,7 +385,7 @@ def generate_briefing(
             lines = [f"  - {r['account_name']}: {int((r['drop_ratio'] or 0)*100)}% usage drop, {_eur_str(r['current_arr_eur'])}" for r in anomalies]
             parts.append("Usage anomalies detected:\n" + "\n".join(lines))
 
-        response = client.messages.create(
+        response = await client.messages.create(
             model="claude-sonnet-4-6",
             system=BRIEFING_SYSTEM,
             messages=[{"role": "user", "content": "Portfolio data:\n" + "\n".join(parts) + "\n\nGenerate 3 actionable briefing insights."}],
@@ -304,7 +401,7 @@ def generate_briefing(
 
 # ─── Action Assets ─────────────────────────────────────────────────────────
 
-def generate_action_asset(
+async def generate_action_asset(
     action_type: str,
     intent: str,
     account_name: str | None,
@@ -312,10 +409,6 @@ def generate_action_asset(
     bullets: list[str],
     next_action: str,
 ) -> dict:
-    api_key = os.environ.get("ANTHROPIC_API_KEY")
-    if not api_key:
-        return {"error": True, "message": "Set ANTHROPIC_API_KEY to generate action assets."}
-
     type_labels = {
         "email": "a professional follow-up email",
         "slack": "a Slack message for the team",
@@ -328,8 +421,9 @@ def generate_action_asset(
     }
 
     try:
-        from anthropic import Anthropic
-        client = Anthropic(api_key=api_key)
+        client = get_async_client()
+        if client is None:
+            return {"error": True, "message": "Set ANTHROPIC_API_KEY to generate action assets."}
 
         context = (
             f"Account: {account_name or 'Portfolio'}\n"
@@ -340,7 +434,7 @@ def generate_action_asset(
         type_label = type_labels.get(action_type, "a business document")
         fmt = format_hints.get(action_type, '{"body":"..."}')
 
-        response = client.messages.create(
+        response = await client.messages.create(
             model="claude-sonnet-4-6",
             system=ACTION_SYSTEM,
             messages=[{
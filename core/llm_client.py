@@ -0,0 +1,62 @@
+from __future__ import annotations
+import os
+import threading
+from typing import Any, Optional
+
+LLM_TIMEOUT = float(os.environ.get("LLM_TIMEOUT", "60"))
+LLM_MAX_RETRIES = int(os.environ.get("LLM_MAX_RETRIES", "2"))
+LLM_MAX_CONNECTIONS = int(os.environ.get("LLM_MAX_CONNECTIONS", "16"))
+LLM_MAX_KEEPALIVE = int(os.environ.get("LLM_MAX_KEEPALIVE", str(LLM_MAX_CONNECTIONS)))
+
+_lock = threading.Lock()
+_sync_client: Optional[tuple[str, Any]] = None
+_async_client: Optional[tuple[str, Any]] = None
+
+
+def _client_kwargs(api_key: str) -> dict:
+    return {"api_key": api_key, "timeout": LLM_TIMEOUT, "max_retries": LLM_MAX_RETRIES}
+
+
+def _limits():
+    import httpx
+
+    return httpx.Limits(max_connections=LLM_MAX_CONNECTIONS, max_keepalive_connections=LLM_MAX_KEEPALIVE)
+
+
+def get_client():
+    global _sync_client
+    api_key = os.environ.get("ANTHROPIC_API_KEY")
+    if not api_key:
+        return None
+    with _lock:
+        if _sync_client is None or _sync_client[0] != api_key:
+            from anthropic import Anthropic, DefaultHttpxClient
+
+            client = Anthropic(**_client_kwargs(api_key), http_client=DefaultHttpxClient(limits=_limits()))
+            _sync_client = (api_key, client)
+        return _sync_client[1]
+
+
+def get_async_client():
+    global _async_client
+    api_key = os.environ.get("ANTHROPIC_API_KEY")
+    if not api_key:
+        return None
+    with _lock:
+        if _async_client is None or _async_client[0] != api_key:
+            from anthropic import AsyncAnthropic, DefaultAsyncHttpxClient
+
+            client = AsyncAnthropic(**_client_kwargs(api_key), http_client=DefaultAsyncHttpxClient(limits=_limits()))
+            _async_client = (api_key, client)
+        return _async_client[1]
+
+
+async def aclose() -> None:
+    global _sync_client, _async_client
+    with _lock:
+        sync_client, async_client = _sync_client, _async_client
+        _sync_client = _async_client = None
+    if sync_client is not None:
+        sync_client[1].close()
+    if async_client is not None:
+        await async_client[1].close()
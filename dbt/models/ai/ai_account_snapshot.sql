@@ -0,0 +1,73 @@
+{{ config(materialized='table') }}
+
+with overview as (
+    select *
+    from {{ ref('dm_account_overview') }}
+),
+health as (
+    select *
+    from {{ ref('fct_account_health_score') }}
+),
+expansion as (
+    select *
+    from {{ ref('fct_account_expansion_potential') }}
+)
+select
+    overview.account_id
+  , overview.account_name
+  , overview.segment
+  , overview.country
+  , overview.owner_ae
+  , overview.plan
+  , overview.subscription_status
+  , overview.start_date
+  , overview.renewal_date
+  , overview.current_mrr_eur
+  , overview.current_arr_eur
+  , overview.seats_purchased
+
+  , health.days_to_renewal
+  , health.avg_active_users
+  , health.min_active_users
+  , health.max_active_users
+  , health.usage_drop_ratio
+  , health.tickets_total
+  , health.tickets_high
+  , health.unpaid_invoices
+  , health.health_score
+  , health.health_band
+
+  -- ARR exposure uses its own, stricter banding (0.8 / 0.6)
+  , case
+        when health.health_score >= 0.8 then 'green'
+        when health.health_score >= 0.6 then 'yellow'
+        else 'red'
+    end as exposure_band
+  , case
+        when health.usage_drop_ratio >= 0.20 then 'Usage decline'
+        when health.tickets_high >= 1 then 'Support tickets'
+        when health.unpaid_invoices >= 1 then 'Unpaid invoices'
+        when health.days_to_renewal is not null and health.days_to_renewal < 60 then 'Renewal soon'
+        else 'Other'
+    end as primary_risk_driver
+
+  , expansion.seat_utilization_ratio
+  , expansion.expansion_score
+  , expansion.expansion_band
+  , case
+        when expansion.seat_utilization_ratio >= 0.85 then 'Add seats'
+        when expansion.seat_utilization_ratio < 0.5 and (expansion.current_mrr_eur * 12) > 10000 then 'Adoption + expansion later'
+        when expansion.health_score >= 0.7 then 'Upgrade plan / add module'
+        else 'Review opportunity'
+    end as recommended_angle
+  , case
+        when expansion.seat_utilization_ratio >= 0.85 then 'seat_headroom'
+        when expansion.seat_utilization_ratio < 0.5 then 'usage_trend'
+        else 'feature_adoption'
+    end as supporting_signal
+
+from overview
+left join health
+    on overview.account_id = health.account_id
+left join expansion
+    on overview.account_id = expansion.account_id
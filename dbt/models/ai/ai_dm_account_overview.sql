@@ -13,4 +13,4 @@ select
   , current_mrr_eur
   , current_arr_eur
   , seats_purchased
-from {{ ref('dm_account_overview') }}
+from {{ ref('ai_account_snapshot') }}
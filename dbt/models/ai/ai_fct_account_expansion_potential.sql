@@ -10,4 +10,4 @@ select
   , seat_utilization_ratio
   , expansion_score
   , expansion_band
-from {{ ref('fct_account_expansion_potential') }}
+from {{ ref('ai_account_snapshot') }}
@@ -13,4 +13,4 @@ select
   , unpaid_invoices
   , health_score
   , health_band
-from {{ ref('fct_account_health_score') }}
+from {{ ref('ai_account_snapshot') }}
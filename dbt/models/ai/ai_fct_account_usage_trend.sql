@@ -1,9 +1,22 @@
-{{ config(materialized='table') }}
+{{ config(
+    materialized='incremental',
+    unique_key=['account_id', 'date_day'],
+    incremental_strategy='delete+insert'
+) }}
 
 SELECT
-    account_id,
-    date_day,
-    active_users,
-    key_events
-FROM {{ ref('product_usage_daily') }}
-ORDER BY account_id, date_day
+    usage.account_id,
+    usage.date_day,
+    usage.active_users,
+    usage.key_events
+FROM {{ ref('product_usage_daily') }} AS usage
+{% if is_incremental() %}
+LEFT JOIN (
+    SELECT account_id, MAX(date_day) AS last_date_day
+    FROM {{ this }}
+    GROUP BY account_id
+) AS prior ON usage.account_id = prior.account_id
+WHERE prior.last_date_day IS NULL
+   OR usage.date_day > prior.last_date_day
+{% endif %}
+ORDER BY usage.account_id, usage.date_day
@@ -12,4 +12,4 @@ select
   , tickets_high
   , unpaid_invoices
   , primary_risk_driver
-from {{ ref('fct_renewals_at_risk') }}
+from {{ ref('ai_account_snapshot') }}
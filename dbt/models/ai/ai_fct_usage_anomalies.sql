@@ -0,0 +1,39 @@
+{{ config(materialized='table') }}
+
+-- One row per account with enough usage history to compare early and recent
+-- activity. anomaly_rank orders accounts whose recent average fell more than
+-- 30% below their early average; it is null for everyone else.
+
+with usage as (
+    select *
+    from {{ ref('fct_account_usage_anomalies') }}
+    where avg_recent is not null
+),
+overview as (
+    select *
+    from {{ ref('dm_account_overview') }}
+),
+scored as (
+    select
+        usage.account_id
+      , overview.account_name
+      , overview.current_arr_eur
+      , usage.usage_days
+      , usage.last_date_day
+      , round(usage.avg_early, 1) as avg_early
+      , round(usage.avg_recent, 1) as avg_recent
+      , round(1.0 - usage.avg_recent / nullif(usage.avg_early, 0), 2) as drop_ratio
+      , usage.avg_early > 0 and usage.avg_recent < usage.avg_early * 0.7 as is_usage_anomaly
+    from usage
+    join overview
+        on usage.account_id = overview.account_id
+)
+select
+    *
+  , case
+        when is_usage_anomaly then row_number() over (
+            partition by is_usage_anomaly
+            order by drop_ratio desc nulls last, current_arr_eur desc nulls last, account_id
+        )
+    end as anomaly_rank
+from scored
@@ -16,9 +16,8 @@ with overview as (
 
     select
         account_id
-      , avg(active_users) as avg_active_users
-    from {{ ref('product_usage_daily') }}
-    group by 1
+      , sum_active_users::double / nullif(active_user_days, 0) as avg_active_users
+    from {{ ref('fct_account_usage_rollup') }}
 
 )
 
@@ -16,11 +16,10 @@ with customers as (
 
     select
         account_id
-      , avg(active_users) as avg_active_users
-      , min(active_users) as min_active_users
-      , max(active_users) as max_active_users
-    from {{ ref('product_usage_daily') }}
-    group by 1
+      , sum_active_users::double / nullif(active_user_days, 0) as avg_active_users
+      , min_active_users
+      , max_active_users
+    from {{ ref('fct_account_usage_rollup') }}
 
 )
 
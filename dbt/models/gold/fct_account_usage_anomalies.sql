@@ -0,0 +1,51 @@
+{{ config(
+    materialized='incremental',
+    unique_key='account_id',
+    incremental_strategy='delete+insert'
+) }}
+
+-- Early (first three points) vs recent (last three points) active-user
+-- averages per account. Incremental runs recompute only accounts whose
+-- usage rollup advanced past the last_date_day stored here or whose day count
+-- changed (e.g. backfilled days after a rollup full refresh). Restated values
+-- on existing days keep the same day count and need `make build-full`.
+
+with changed as (
+
+    select rollup.account_id
+    from {{ ref('fct_account_usage_rollup') }} as rollup
+    {% if is_incremental() %}
+    left join {{ this }} as prior
+        on rollup.account_id = prior.account_id
+    where prior.last_date_day is null
+       or rollup.last_date_day > prior.last_date_day
+       or rollup.usage_days <> prior.usage_days
+    {% endif %}
+
+)
+
+, ordered as (
+
+    select
+        usage.account_id
+      , usage.date_day
+      , usage.active_users
+      , row_number() over (partition by usage.account_id order by usage.date_day asc) as rn_asc
+      , row_number() over (partition by usage.account_id order by usage.date_day desc) as rn_desc
+      , count(*) over (partition by usage.account_id) as usage_days
+    from {{ ref('product_usage_daily') }} as usage
+    semi join changed
+        on usage.account_id = changed.account_id
+
+)
+
+select
+    account_id
+  , max(usage_days) as usage_days
+  , max(date_day) as last_date_day
+  , avg(active_users) filter (where rn_asc <= 3) as avg_early
+  , case
+        when max(usage_days) >= 5 then avg(active_users) filter (where rn_desc <= 3)
+    end as avg_recent
+from ordered
+group by 1
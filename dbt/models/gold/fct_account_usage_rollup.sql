@@ -0,0 +1,69 @@
+{{ config(
+    materialized='incremental',
+    unique_key='account_id',
+    incremental_strategy='delete+insert',
+    on_schema_change='fail'
+) }}
+
+-- Running per-account usage aggregates. Incremental runs only scan days after
+-- each account's last_date_day; use --full-refresh to pick up restated history.
+-- Averages divide by active_user_days (days with a non-null active_users) so
+-- they match avg(active_users) over the raw rows.
+
+with usage as (
+
+    select
+        usage.account_id
+      , usage.date_day
+      , usage.active_users
+    from {{ ref('product_usage_daily') }} as usage
+    {% if is_incremental() %}
+    left join {{ this }} as prior
+        on usage.account_id = prior.account_id
+    where prior.last_date_day is null
+       or usage.date_day > prior.last_date_day
+    {% endif %}
+
+)
+
+, new_days as (
+
+    select
+        account_id
+      , count(*) as usage_days
+      , count(active_users) as active_user_days
+      , sum(active_users) as sum_active_users
+      , min(active_users) as min_active_users
+      , max(active_users) as max_active_users
+      , min(date_day) as first_date_day
+      , max(date_day) as last_date_day
+    from usage
+    group by 1
+
+)
+
+{% if is_incremental() %}
+
+select
+    new_days.account_id
+  , new_days.usage_days + coalesce(prior.usage_days, 0) as usage_days
+  , new_days.active_user_days + coalesce(prior.active_user_days, 0) as active_user_days
+  , coalesce(
+        new_days.sum_active_users + prior.sum_active_users
+      , new_days.sum_active_users
+      , prior.sum_active_users
+    ) as sum_active_users
+  , least(new_days.min_active_users, coalesce(prior.min_active_users, new_days.min_active_users)) as min_active_users
+  , greatest(new_days.max_active_users, coalesce(prior.max_active_users, new_days.max_active_users)) as max_active_users
+  , coalesce(prior.first_date_day, new_days.first_date_day) as first_date_day
+  , new_days.last_date_day
+from new_days
+left join {{ this }} as prior
+    on new_days.account_id = prior.account_id
+
+{% else %}
+
+select *
+from new_days
+
+{% endif %}
@@ -62,3 +62,12 @@ select
     'account_id,date_day',
     true,
     'Daily active users and key events per account; powers usage sparklines and trend analysis.'
+
+union all
+select
+    'model',
+    'ai_fct_usage_anomalies',
+    'account_id',
+    'account_id',
+    true,
+    'Early vs recent active-user averages, drop ratio and anomaly rank per account; powers the Daily Briefing.'
@@ -0,0 +1,44 @@
+{{ config(severity=var('incremental_drift_severity', 'error')) }}
+
+-- Fails with one row per account whose incrementally maintained early/recent
+-- usage averages differ from a from-scratch computation over product_usage_daily.
+-- Restated history is only picked up by `make build-full`.
+
+with ordered as (
+
+    select
+        account_id
+      , date_day
+      , active_users
+      , row_number() over (partition by account_id order by date_day asc) as rn_asc
+      , row_number() over (partition by account_id order by date_day desc) as rn_desc
+      , count(*) over (partition by account_id) as usage_days
+    from {{ ref('product_usage_daily') }}
+
+)
+
+, full_refresh as (
+
+    select
+        account_id
+      , max(usage_days) as usage_days
+      , max(date_day) as last_date_day
+      , avg(active_users) filter (where rn_asc <= 3) as avg_early
+      , case
+            when max(usage_days) >= 5 then avg(active_users) filter (where rn_desc <= 3)
+        end as avg_recent
+    from ordered
+    group by 1
+
+)
+
+, incremental as (
+
+    select account_id, usage_days, last_date_day, avg_early, avg_recent
+    from {{ ref('fct_account_usage_anomalies') }}
+
+)
+
+(select 'missing_from_incremental' as issue, * from (select * from full_refresh except select * from incremental))
+union all
+(select 'unexpected_in_incremental' as issue, * from (select * from incremental except select * from full_refresh))
@@ -0,0 +1,41 @@
+{{ config(severity=var('incremental_drift_severity', 'error')) }}
+
+-- Fails with one row per account whose incrementally maintained rollup
+-- differs from a from-scratch aggregation of product_usage_daily. Incremental
+-- runs only read days after last_date_day, so restated history shows up here
+-- until `make build-full` is run.
+
+with full_refresh as (
+
+    select
+        account_id
+      , count(*) as usage_days
+      , count(active_users) as active_user_days
+      , sum(active_users) as sum_active_users
+      , min(active_users) as min_active_users
+      , max(active_users) as max_active_users
+      , min(date_day) as first_date_day
+      , max(date_day) as last_date_day
+    from {{ ref('product_usage_daily') }}
+    group by 1
+
+)
+
+, incremental as (
+
+    select
+        account_id
+      , usage_days
+      , active_user_days
+      , sum_active_users
+      , min_active_users
+      , max_active_users
+      , first_date_day
+      , last_date_day
+    from {{ ref('fct_account_usage_rollup') }}
+
+)
+
+(select 'missing_from_incremental' as issue, * from (select * from full_refresh except select * from incremental))
+union all
+(select 'unexpected_in_incremental' as issue, * from (select * from incremental except select * from full_refresh))
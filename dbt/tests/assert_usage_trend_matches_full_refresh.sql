@@ -0,0 +1,19 @@
+{{ config(severity=var('incremental_drift_severity', 'error')) }}
+
+-- Fails with one row per (account_id, date_day) where the incremental usage
+-- trend differs from the current product_usage_daily seed. Restated or deleted
+-- days are only picked up by `make build-full`.
+
+with full_refresh as (
+    select account_id, date_day, active_users, key_events
+    from {{ ref('product_usage_daily') }}
+)
+
+, incremental as (
+    select account_id, date_day, active_users, key_events
+    from {{ ref('ai_fct_account_usage_trend') }}
+)
+
+(select 'missing_from_incremental' as issue, * from (select * from full_refresh except select * from incremental))
+union all
+(select 'unexpected_in_incremental' as issue, * from (select * from incremental except select * from full_refresh))
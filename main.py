@@ -1,3 +1,4 @@
+from contextlib import asynccontextmanager
 from pathlib import Path
 from dotenv import load_dotenv
 from fastapi import FastAPI
@@ -11,8 +12,19 @@ from api.accounts import router as accounts_router  # noqa: E402
 from api.chat import router as chat_router  # noqa: E402
 from api.briefing import router as briefing_router  # noqa: E402
 from api.aos import router as aos_router  # noqa: E402
+from api.system import router as system_router  # noqa: E402
+from core import llm_client  # noqa: E402
+from core.db import close_pool  # noqa: E402
 
-app = FastAPI(title="Revenue Intelligence Agent", docs_url=None, redoc_url=None)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    await llm_client.aclose()
+    close_pool()
+
+
+app = FastAPI(title="Revenue Intelligence Agent", docs_url=None, redoc_url=None, lifespan=lifespan)
 
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
@@ -21,6 +33,7 @@ app.include_router(accounts_router)
 app.include_router(chat_router)
 app.include_router(briefing_router)
 app.include_router(aos_router)
+app.include_router(system_router)
 
 INDEX = Path(__file__).parent / "templates" / "index.html"
 
@@ -0,0 +1,70 @@
+from __future__ import annotations
+import argparse
+import random
+
+import duckdb
+
+from api.accounts import ACCOUNT_DETAIL_SQL, _detail_params
+from scripts.bench_warehouse import build_warehouse, measure, print_table
+
+LEGACY_QUERIES = [
+    ("one", "SELECT * FROM ai_dm_account_overview WHERE account_id = ?"),
+    ("one", "SELECT * FROM ai_fct_account_health_score WHERE account_id = ?"),
+    ("one", "SELECT * FROM ai_fct_account_expansion_potential WHERE account_id = ?"),
+    ("all", """
+        SELECT date_day, active_users, key_events
+        FROM ai_fct_account_usage_trend
+        WHERE account_id = ?
+        ORDER BY date_day ASC
+    """),
+    ("one", "SELECT primary_risk_driver FROM ai_arr_exposure WHERE account_id = ?"),
+]
+
+
+def _fetch(con: duckdb.DuckDBPyConnection, sql: str, params: list) -> list[dict]:
+    res = con.execute(sql, params)
+    cols = [d[0] for d in res.description]
+    return [dict(zip(cols, row)) for row in res.fetchall()]
+
+
+def _legacy(con: duckdb.DuckDBPyConnection, account_id: str) -> list:
+    out = []
+    for kind, sql in LEGACY_QUERIES:
+        rows = _fetch(con, sql, [account_id])
+        out.append((rows[0] if rows else None) if kind == "one" else rows)
+    return out
+
+
+def _combined(con: duckdb.DuckDBPyConnection, account_id: str) -> dict | None:
+    rows = _fetch(con, ACCOUNT_DETAIL_SQL, _detail_params(account_id))
+    return rows[0] if rows else None
+
+
+def run(sizes: list[int], iterations: int, rebuild: bool) -> list[dict]:
+    results = []
+    for n in sizes:
+        path = build_warehouse(n, rebuild=rebuild)
+        con = duckdb.connect(str(path), read_only=True)
+        rng = random.Random(n)
+        ids = [f"acc_{rng.randint(1, n):07d}" for _ in range(iterations + 3)]
+        iters = max(20, iterations if n <= 5000 else iterations // 5)
+        for label, fn in (("5 queries", _legacy), ("combined", _combined)):
+            it = iter(ids * 2)
+            stats = measure(lambda: fn(con, next(it)), iters)
+            results.append({"accounts": n, "path": label, **stats})
+        con.close()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Account detail latency: five queries vs one combined statement")
+    parser.add_argument("--sizes", default="50,5000,500000")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--rebuild", action="store_true")
+    args = parser.parse_args()
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    print_table(run(sizes, args.iterations, args.rebuild))
+
+
+if __name__ == "__main__":
+    main()
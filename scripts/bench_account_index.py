@@ -0,0 +1,106 @@
+from __future__ import annotations
+import argparse
+import random
+import time
+
+from core.intent import AccountNameIndex, extract_account
+from scripts.bench_warehouse import print_table
+
+SECTORS = [
+    "Logistics", "Analytics", "Systems", "Digital", "Consulting", "Health", "Energy", "Retail",
+    "Robotics", "Media", "Foods", "Capital", "Labs", "Networks", "Mobility", "Security",
+    "Software", "Pharma", "Textiles", "Aerospace", "Finance", "Travel", "Insurance", "Telecom",
+]
+SUFFIXES = ["GmbH", "SE", "AG", "BV", "AB", "Ltd", "SAS", "SARL", "Oy", "ApS"]
+QUESTION_TEMPLATES = [
+    "Is {name} healthy?",
+    "Tell me about {name}",
+    "What is the expansion potential for {name}?",
+    "How is {name} doing on renewals",
+]
+PORTFOLIO_QUESTIONS = [
+    "Show renewals at risk in the next 90 days",
+    "ARR exposure by health band",
+    "Show expansion shortlist",
+]
+
+
+def _stems(rng: random.Random, n: int) -> list[str]:
+    consonants, vowels = "bcdfghklmnprstvwz", "aeiou"
+    out: set[str] = set()
+    while len(out) < n:
+        syllables = rng.randint(2, 3)
+        out.add("".join(rng.choice(consonants) + rng.choice(vowels) for _ in range(syllables)).capitalize())
+    return sorted(out)
+
+
+def make_names(n: int, seed: int = 7) -> list[str]:
+    rng = random.Random(seed)
+    stems = _stems(rng, max(50, n // 40 + 1))
+    names: set[str] = set()
+    while len(names) < n:
+        names.add(f"{rng.choice(stems)} {rng.choice(SECTORS)} {rng.choice(SUFFIXES)}")
+    return sorted(names)
+
+
+def _typo(rng: random.Random, name: str) -> str:
+    i = rng.randrange(1, len(name) - 1)
+    return name[:i] + name[i + 1:]
+
+
+def make_questions(names: list[str], count: int, seed: int = 11) -> list[str]:
+    rng = random.Random(seed)
+    questions = []
+    for i in range(count):
+        if i % 4 == 3:
+            questions.append(rng.choice(PORTFOLIO_QUESTIONS))
+            continue
+        name = rng.choice(names)
+        if rng.random() < 0.3:
+            name = _typo(rng, name)
+        questions.append(rng.choice(QUESTION_TEMPLATES).format(name=name))
+    return questions
+
+
+def run(sizes: list[int], questions_per_size: int) -> list[dict]:
+    results = []
+    for n in sizes:
+        names = make_names(n)
+        questions = make_questions(names, questions_per_size)
+
+        start = time.perf_counter()
+        index = AccountNameIndex(names)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        legacy = [extract_account(q, list(names)) for q in questions]
+        legacy_ms = (time.perf_counter() - start) * 1000 / len(questions)
+
+        start = time.perf_counter()
+        indexed = [index.match(q) for q in questions]
+        indexed_ms = (time.perf_counter() - start) * 1000 / len(questions)
+
+        agree = sum(a == b for a, b in zip(legacy, indexed))
+        results.append({
+            "names": n,
+            "questions": len(questions),
+            "index_build_ms": round(build_ms, 1),
+            "legacy_ms_per_q": round(legacy_ms, 3),
+            "index_ms_per_q": round(indexed_ms, 3),
+            "speedup": round(legacy_ms / indexed_ms, 1) if indexed_ms else None,
+            "same_match": f"{agree}/{len(questions)}",
+        })
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Account-name matching: full fuzzy scan vs prefiltered index")
+    parser.add_argument("--sizes", default="50,10000,100000")
+    parser.add_argument("--questions", type=int, default=200)
+    args = parser.parse_args()
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    print_table(run(sizes, args.questions))
+
+
+if __name__ == "__main__":
+    main()
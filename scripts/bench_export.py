@@ -0,0 +1,76 @@
+from __future__ import annotations
+import argparse
+import json
+import tracemalloc
+from pathlib import Path
+
+from fastapi.encoders import jsonable_encoder
+
+from api.portfolio import RISK_MATRIX_ORDER, RISK_MATRIX_SQL
+from core import columnar, db
+from scripts.bench_warehouse import build_warehouse, measure, print_table
+
+USAGE_EXPORT_SQL = """
+    SELECT account_id, date_day, active_users, key_events
+    FROM ai_fct_account_usage_trend
+    ORDER BY account_id, date_day
+"""
+USAGE_EXPORT_ORDER = ("account_id", "date_day")
+
+
+def _dict_body(sql: str, params: list, order_by: tuple[str, ...]) -> bytes:
+    return json.dumps(jsonable_encoder(db.query(sql, params))).encode()
+
+
+def _columnar_body(sql: str, params: list, order_by: tuple[str, ...]) -> bytes:
+    return columnar.columnar_response(columnar.query_columnar(sql, params, order_by=order_by)).body
+
+
+def _peak_kb(fn) -> float:
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return round(peak / 1024, 1)
+
+
+def run(n_accounts: int, points: int, iterations: int, rebuild: bool) -> list[dict]:
+    path = Path(build_warehouse(n_accounts, points, rebuild=rebuild))
+    db._pool = db.ConnectionPool(path)
+    cases = (
+        ("risk matrix", RISK_MATRIX_SQL, [n_accounts, 0], RISK_MATRIX_ORDER),
+        ("usage trend", USAGE_EXPORT_SQL, [], USAGE_EXPORT_ORDER),
+    )
+    results = []
+    for case, sql, params, order_by in cases:
+        dict_rows = json.loads(_dict_body(sql, params, order_by))
+        data = json.loads(_columnar_body(sql, params, order_by))
+        rebuilt = [dict(zip(data["columns"], vals)) for vals in zip(*(data["data"][c] for c in data["columns"]))]
+        if rebuilt != dict_rows:
+            raise AssertionError(f"columnar {case} export differs from the dict path")
+        for label, fn in (("row dicts + jsonable_encoder", _dict_body), ("duckdb columnar json", _columnar_body)):
+            body = fn(sql, params, order_by)
+            stats = measure(lambda: fn(sql, params, order_by), iterations, warmup=1)
+            results.append({
+                "payload": case,
+                "rows": len(dict_rows),
+                "path": label,
+                "body_kb": round(len(body) / 1024, 1),
+                "py_peak_kb": _peak_kb(lambda: fn(sql, params, order_by)),
+                **stats,
+            })
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Large result export: per-row dicts vs DuckDB-built columnar JSON")
+    parser.add_argument("--accounts", type=int, default=40000)
+    parser.add_argument("--points", type=int, default=10)
+    parser.add_argument("--iterations", type=int, default=3)
+    parser.add_argument("--rebuild", action="store_true")
+    args = parser.parse_args()
+    print_table(run(args.accounts, args.points, args.iterations, args.rebuild))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+from __future__ import annotations
+import argparse
+import random
+import re
+import time
+
+from api.chat import SQL_TEMPLATES
+from core import guardrails
+from scripts.bench_warehouse import print_table
+
+ALLOWED = frozenset({
+    "ai_dm_account_overview", "ai_fct_account_health_score", "ai_fct_account_expansion_potential",
+    "ai_fct_renewals_at_risk", "ai_fct_expansion_shortlist", "ai_arr_exposure",
+})
+EXTRA_SQL = [
+    "SELECT account_name, contact_email, phone FROM ai_dm_account_overview LIMIT {n}",
+    "DELETE FROM ai_fct_renewals_at_risk WHERE days_to_renewal < {n}",
+    "WITH r AS (SELECT * FROM ai_fct_renewals_at_risk) SELECT r.account_name FROM r JOIN raw_customers c ON true LIMIT {n}",
+    "select a.account_id, a.billing_address as addr from ai_dm_account_overview a where a.current_arr_eur > {n}",
+    "SELECT account_id FROM ai_arr_exposure; DROP TABLE ai_arr_exposure -- {n}",
+]
+
+
+def _legacy_normalize(name: str) -> str:
+    return re.sub(r"[^a-zA-Z0-9_]", "", name or "").lower()
+
+
+def _legacy_columns(sql: str) -> list[str]:
+    match = re.search(r"select\s+(.*?)\s+from\s", sql, re.IGNORECASE | re.DOTALL)
+    if not match:
+        return []
+    cols = []
+    for part in re.split(r",(?![^()]*\))", match.group(1)):
+        tok = part.strip()
+        if not tok:
+            continue
+        tok = re.split(r"\s+as\s+", tok, flags=re.IGNORECASE)[0]
+        cols.append(tok.split()[0].split(".")[-1])
+    return cols
+
+
+def legacy_guardrails(sql: str, allowed_assets: set[str], df_shape: tuple[int, int]) -> dict:
+    s = (sql or "").strip()
+    low = s.lower()
+    blocked = [kw.upper() for kw in guardrails.BLOCKED_KEYWORDS if re.search(rf"\b{kw}\b", s, re.IGNORECASE)]
+    tables = [m.group(1) for m in re.finditer(r"(?:from|join)\s+([a-zA-Z0-9_]+)", s, re.IGNORECASE)]
+    cols = _legacy_columns(s)
+    pii_hits = [c for c in cols if any(p in _legacy_normalize(c) for p in guardrails.PII_PATTERNS)]
+    return {
+        "select_only": (low.startswith("select") or low.startswith("with")) and not blocked,
+        "allowlisted_assets": bool(tables) and all(_legacy_normalize(t) in {a.lower() for a in allowed_assets} for t in tables),
+        "row_limit_present": bool(re.search(r"\blimit\s+\d+\b", s, re.IGNORECASE)),
+        "no_pii_columns": len(pii_hits) == 0 if cols else True,
+        "blocked_keywords_found": blocked,
+        "tables_used": tables,
+        "result_rows": df_shape[0],
+        "result_cols": df_shape[1],
+    }
+
+
+def make_corpus(distinct: int, seed: int = 5) -> list[str]:
+    rng = random.Random(seed)
+    literal = {
+        "account_name": lambda: f"'Account {rng.randrange(100000)} GmbH'",
+        "horizon_days": lambda: str(rng.choice([7, 30, 60, 90, 180])),
+        "health_threshold": lambda: str(rng.choice([0.5, 0.75, 1.0])),
+        "limit_n": lambda: str(rng.randrange(1, 50)),
+        "minimum_health": lambda: str(rng.choice([0.5, 0.6, 0.7])),
+        "top_n": lambda: str(rng.randrange(1, 50)),
+    }
+    templates = list(SQL_TEMPLATES.values())
+    corpus = []
+    for i in range(distinct):
+        if i % 10 == 9:
+            corpus.append(rng.choice(EXTRA_SQL).format(n=rng.randrange(1000)))
+            continue
+        sql = rng.choice(templates)
+        corpus.append(re.sub(r"\$(\w+)", lambda m: literal[m.group(1)](), sql))
+    return corpus
+
+
+def _throughput(fn, workload: list[str], seconds: float) -> float:
+    n = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        for sql in workload:
+            fn(sql, ALLOWED, (10, 8))
+        n += len(workload)
+    return n / (time.perf_counter() - start)
+
+
+def run(distinct: int, workload_size: int, seconds: float) -> list[dict]:
+    corpus = make_corpus(distinct)
+    rng = random.Random(9)
+    workload = [rng.choice(corpus) for _ in range(workload_size)]
+
+    def uncached(analyzer):
+        return lambda sql, allowed, shape: guardrails.compute_guardrails(sql, allowed, shape, analyzer(guardrails.fingerprint(sql)))
+
+    def memoized(engine):
+        return lambda sql, allowed, shape: guardrails.compute_guardrails(sql, allowed, shape, guardrails.analyze_sql(sql, engine))
+
+    regex_verdicts = [guardrails.compute_guardrails(sql, ALLOWED, (10, 8), guardrails.analyze_sql(sql, "regex")) for sql in corpus]
+    mismatches = [sql for sql, verdict in zip(corpus, regex_verdicts) if legacy_guardrails(sql, ALLOWED, (10, 8)) != verdict]
+    if mismatches:
+        raise AssertionError(f"regex verdicts differ from legacy on {len(mismatches)} statements, e.g. {mismatches[0]!r}")
+    ast_verdicts = [guardrails.compute_guardrails(sql, ALLOWED, (10, 8), guardrails.analyze_sql(sql, "ast")) for sql in corpus]
+    agree = {"regex": len(corpus), "ast": sum(a == b for a, b in zip(regex_verdicts, ast_verdicts))}
+
+    paths = (
+        ("legacy per-keyword regex", None, legacy_guardrails),
+        ("compiled regex, no memo", "regex", uncached(guardrails._analyze)),
+        ("compiled regex + verdict memo", "regex", memoized("regex")),
+        ("duckdb parse tree, no memo", "ast", uncached(guardrails._analyze_ast)),
+        ("duckdb parse tree + verdict memo", "ast", memoized("ast")),
+    )
+    results = []
+    for label, engine, fn in paths:
+        for cache in guardrails._verdicts.values():
+            cache.clear()
+        rate = _throughput(fn, workload, seconds)
+        results.append({
+            "path": label,
+            "distinct_sql": distinct,
+            "sql_per_s": round(rate),
+            "us_per_sql": round(1e6 / rate, 2),
+            "same_as_regex": f"{agree[engine]}/{len(corpus)}" if engine else "",
+        })
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Guardrail validation throughput: legacy regex scan, compiled regex and DuckDB parse tree, with and without verdict memo")
+    parser.add_argument("--distinct", type=int, default=2000)
+    parser.add_argument("--workload", type=int, default=100000)
+    parser.add_argument("--seconds", type=float, default=2.0)
+    args = parser.parse_args()
+    print_table(run(args.distinct, args.workload, args.seconds))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+from __future__ import annotations
+import argparse
+import copy
+import re
+import time
+
+from core import intent
+from core.intent import detect_intent
+from scripts.bench_warehouse import print_table
+
+LABELLED_QUESTIONS: list[tuple[str, str]] = [
+    ("Give me an account overview", "account_overview"),
+    ("Tell me about Acme GmbH", "account_overview"),
+    ("Who is Nordwind Logistics?", "account_overview"),
+    ("Describe the profile of Helio Systems", "account_overview"),
+    ("What's the current status of Brightpath?", "account_overview"),
+    ("Any details on Vertex Analytics", "account_overview"),
+    ("Is this account healthy?", "health_summary"),
+    ("What is the health score for Acme GmbH?", "health_summary"),
+    ("Is Brightpath struggling?", "health_summary"),
+    ("Should I be concerned about churn at Nordwind?", "health_summary"),
+    ("How troubled is Helio Systems", "health_summary"),
+    ("What is the expansion potential?", "expansion_potential"),
+    ("Can we upsell Acme GmbH more seats?", "expansion_potential"),
+    ("Is there an upgrade opportunity at Vertex?", "expansion_potential"),
+    ("How much could Brightpath grow?", "expansion_potential"),
+    ("Show renewals at risk in the next 90 days", "renewals_at_risk"),
+    ("Which renewals are due in 30 days?", "renewals_at_risk"),
+    ("Upcoming renewals this quarter", "renewals_at_risk"),
+    ("Which contracts expire next month?", "renewals_at_risk"),
+    ("Top 5 accounts renewing soon", "renewals_at_risk"),
+    ("Show expansion shortlist", "expansion_shortlist"),
+    ("Who should we target for expansion? Give me the top accounts", "expansion_shortlist"),
+    ("Best accounts for the upsell pipeline", "expansion_shortlist"),
+    ("Expansion candidates please", "expansion_shortlist"),
+    ("ARR exposure by health band", "arr_exposure_overview"),
+    ("What's our total ARR breakdown?", "arr_exposure_overview"),
+    ("Portfolio distribution across bands", "arr_exposure_overview"),
+    ("Give me a revenue overview of the portfolio", "arr_exposure_overview"),
+]
+
+
+def _legacy_extract_days(q: str) -> int | None:
+    m = re.search(r"next\s+(\d+)\s+days?", q) or re.search(r"in\s+(\d+)\s+days?", q)
+    if m:
+        return int(m.group(1))
+    m = re.search(r"(\d+)\s+days?", q)
+    if m:
+        return int(m.group(1))
+    if re.search(r"next\s+week|this\s+week", q):
+        return 7
+    if re.search(r"next\s+month|this\s+month", q):
+        return 30
+    if re.search(r"quarter", q):
+        return 90
+    return None
+
+
+def _legacy_extract_limit(q: str) -> int | None:
+    m = re.search(r"top\s+(\d+)", q)
+    if m:
+        return int(m.group(1))
+    m = re.search(r"(\d+)\s+accounts?", q)
+    if m:
+        n = int(m.group(1))
+        if 1 <= n <= 100:
+            return n
+    return None
+
+
+def legacy_detect_intent(question: str, account_names: list[str]) -> dict:
+    q = question.lower()
+    scores = {
+        name: sum(1 for kw in keywords if kw in q)
+        for name, keywords in intent.INTENT_PATTERNS.items()
+    }
+    best = max(scores, key=scores.get)
+    if scores[best] == 0:
+        best = "account_overview"
+
+    account = intent.extract_account(question, account_names)
+    params = copy.deepcopy(intent._DEFAULT_PARAMS[best])
+    if "account_name" in params:
+        params["account_name"] = account
+
+    if best == "renewals_at_risk":
+        days = _legacy_extract_days(q)
+        if days is not None:
+            params["horizon_days"] = days
+        limit = _legacy_extract_limit(q)
+        if limit is not None:
+            params["limit_n"] = limit
+        if not any(w in q for w in intent._RISK_WORDS):
+            params["health_threshold"] = 1.0
+
+    if best == "expansion_shortlist":
+        limit = _legacy_extract_limit(q)
+        if limit is not None:
+            params["top_n"] = limit
+
+    return {"intent": best, "params": params, "account_found": bool(account), "account_name": account}
+
+
+def run(seconds: float) -> list[dict]:
+    questions = [q for q, _ in LABELLED_QUESTIONS]
+    mismatches = [
+        q for q in questions
+        if legacy_detect_intent(q, []) != detect_intent(q, [])
+    ]
+    if mismatches:
+        raise AssertionError(f"compiled matcher disagrees with legacy on: {mismatches}")
+
+    results = []
+    for label, fn in (("legacy scan", legacy_detect_intent), ("compiled", detect_intent)):
+        correct = sum(fn(q, [])["intent"] == expected for q, expected in LABELLED_QUESTIONS)
+        n = 0
+        start = time.perf_counter()
+        while time.perf_counter() - start < seconds:
+            for q in questions:
+                fn(q, [])
+            n += len(questions)
+        elapsed = time.perf_counter() - start
+        results.append({
+            "matcher": label,
+            "questions": n,
+            "questions_per_s": round(n / elapsed),
+            "us_per_question": round(elapsed / n * 1e6, 2),
+            "accuracy": f"{correct}/{len(LABELLED_QUESTIONS)}",
+        })
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Intent detection throughput on a labelled question corpus")
+    parser.add_argument("--seconds", type=float, default=2.0)
+    args = parser.parse_args()
+    print_table(run(args.seconds))
+
+
+if __name__ == "__main__":
+    main()
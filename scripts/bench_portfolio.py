@@ -0,0 +1,101 @@
+from __future__ import annotations
+import argparse
+import json
+from collections import defaultdict
+from datetime import date, datetime
+
+import duckdb
+
+from api import portfolio
+from scripts.bench_warehouse import build_warehouse, measure, print_table
+
+LEGACY_RISK_SQL = portfolio.RISK_MATRIX_SQL.replace("LIMIT ? OFFSET ?", "")
+
+
+def _fetch(con: duckdb.DuckDBPyConnection, sql: str, params: list | None = None) -> list[dict]:
+    res = con.execute(sql, params or [])
+    cols = [d[0] for d in res.description]
+    return [dict(zip(cols, row)) for row in res.fetchall()]
+
+
+def legacy_portfolio(con: duckdb.DuckDBPyConnection) -> dict:
+    risk_rows = _fetch(con, LEGACY_RISK_SQL)
+    total_arr = sum(r["current_arr_eur"] or 0 for r in risk_rows)
+    red_arr = sum(r["current_arr_eur"] or 0 for r in risk_rows if r["health_band"] == "red")
+    health_counts: dict[str, int] = {"green": 0, "yellow": 0, "red": 0}
+    for r in risk_rows:
+        band = r["health_band"] or "green"
+        health_counts[band] = health_counts.get(band, 0) + 1
+    eligible = [r for r in risk_rows if r["days_to_renewal"] is not None and r["days_to_renewal"] >= 0]
+    next_renewal = min(eligible, key=lambda x: x["days_to_renewal"]) if eligible else None
+
+    today = date.today()
+    pipeline_raw: dict[str, dict[str, float]] = defaultdict(lambda: {"green": 0.0, "yellow": 0.0, "red": 0.0})
+    for r in risk_rows:
+        rd = r.get("renewal_date")
+        if rd is None:
+            continue
+        if hasattr(rd, "date"):
+            rd = rd.date()
+        if 0 <= (rd - today).days <= 180:
+            pipeline_raw[rd.strftime("%b %Y")][r.get("health_band") or "green"] += r.get("current_arr_eur") or 0
+    pipeline = [
+        {"month": m, "green": round(v["green"]), "yellow": round(v["yellow"]), "red": round(v["red"])}
+        for m, v in sorted(pipeline_raw.items(), key=lambda x: datetime.strptime(x[0], "%b %Y"))
+    ]
+    return {
+        "kpis": {
+            "total_arr": total_arr,
+            "total_accounts": len(risk_rows),
+            "arr_at_risk": red_arr,
+            "red_count": health_counts.get("red", 0),
+            "next_renewal_days": next_renewal["days_to_renewal"] if next_renewal else None,
+        },
+        "arr_bands": _fetch(con, portfolio.ARR_BANDS_SQL),
+        "renewal_pipeline": pipeline,
+        "renewals_90d": _fetch(con, portfolio.RENEWALS_90D_SQL),
+        "risk_matrix": risk_rows,
+    }
+
+
+def aggregated_portfolio(con: duckdb.DuckDBPyConnection) -> dict:
+    kpis = portfolio._kpis(_fetch(con, portfolio.PORTFOLIO_KPI_SQL)[0])
+    return {
+        "kpis": kpis,
+        "arr_bands": _fetch(con, portfolio.ARR_BANDS_SQL),
+        "renewal_pipeline": portfolio._pipeline(_fetch(con, portfolio.RENEWAL_PIPELINE_SQL)),
+        "renewals_90d": _fetch(con, portfolio.RENEWALS_90D_SQL),
+        "risk_matrix": _fetch(con, portfolio.RISK_MATRIX_SQL, [portfolio.RISK_MATRIX_PAGE, 0]),
+        "risk_matrix_total": kpis["total_accounts"],
+    }
+
+
+def run(sizes: list[int], iterations: int, rebuild: bool) -> list[dict]:
+    results = []
+    for n in sizes:
+        con = duckdb.connect(str(build_warehouse(n, rebuild=rebuild)), read_only=True)
+        legacy, aggregated = legacy_portfolio(con), aggregated_portfolio(con)
+        if legacy["renewal_pipeline"] != aggregated["renewal_pipeline"] or any(
+            legacy["kpis"][k] != aggregated["kpis"][k] for k in legacy["kpis"]
+        ):
+            raise AssertionError(f"aggregated portfolio differs from legacy at {n} accounts")
+        for label, fn in (("python loops + full matrix", legacy_portfolio), ("grouped SQL + matrix page", aggregated_portfolio)):
+            payload = json.dumps(fn(con), default=str)
+            stats = measure(lambda: json.dumps(fn(con), default=str), iterations)
+            results.append({"accounts": n, "path": label, "payload_kb": round(len(payload) / 1024, 1), **stats})
+        con.close()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="/api/portfolio: Python aggregation over every account vs grouped SQL with a paginated risk matrix")
+    parser.add_argument("--sizes", default="50,40000")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--rebuild", action="store_true")
+    args = parser.parse_args()
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    print_table(run(sizes, args.iterations, args.rebuild))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+from __future__ import annotations
+import argparse
+import os
+import sqlite3
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+from aos.engine import executor, memory, orchestrator, task_store
+from aos.engine.schemas import Goal, Task
+from scripts.bench_warehouse import measure, print_table
+
+
+def _instant_execute(task, goal_description, prior_task_outputs=None) -> dict:
+    return {"result": f"Completed {task.title}", "summary": f"{task.title} done", "_tokens": 10}
+
+
+@contextmanager
+def _per_call_conn():
+    con = sqlite3.connect(str(task_store.DB_PATH), timeout=10)
+    con.execute("PRAGMA journal_mode=WAL")
+    con.execute("PRAGMA synchronous=NORMAL")
+    con.row_factory = sqlite3.Row
+    try:
+        yield con
+        con.commit()
+    except Exception:
+        con.rollback()
+        raise
+    finally:
+        con.close()
+
+
+@contextmanager
+def _no_unit_of_work():
+    yield None
+
+
+def _run_goal(n_tasks: int, workers: int) -> None:
+    goal = Goal(title="bench", description="benchmark goal", budget_tokens=10 * n_tasks + 1)
+    task_store.create_goal(goal)
+    with orchestrator.unit_of_work():
+        for i in range(n_tasks):
+            task_store.create_task(Task(goal_id=goal.id, title=f"task {i}", description="bench task"))
+    result = orchestrator.run_goal(goal.id, max_workers=workers)
+    if result["status"] != "complete":
+        raise RuntimeError(f"bench goal did not complete: {result['result']}")
+
+
+def run(n_tasks: int, workers: int, iterations: int) -> list[dict]:
+    os.environ.pop("ANTHROPIC_API_KEY", None)
+    workdir = Path(tempfile.mkdtemp(prefix="aos_bench_"))
+    executor.execute_task = _instant_execute
+    orchestrator.TASK_TOKEN_RESERVATION = 10
+    memory.MEMORY_FILE = workdir / "memory.jsonl"
+
+    results = []
+    modes = (
+        ("connection per call", _per_call_conn, _no_unit_of_work),
+        ("persistent + unit of work", task_store._conn, task_store.unit_of_work),
+    )
+    for label, conn_fn, uow_fn in modes:
+        task_store.DB_PATH = workdir / f"{label.split()[0]}.db"
+        task_store._conn, orchestrator.unit_of_work = conn_fn, uow_fn
+        task_store.init_db()
+        stats = measure(lambda: _run_goal(n_tasks, workers), iterations, warmup=1)
+        results.append({"tasks": n_tasks, "workers": workers, "store": label, **stats})
+    task_store._conn, orchestrator.unit_of_work = modes[1][1], modes[1][2]
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="AOS task store: per-call connections vs persistent connection with unit of work")
+    parser.add_argument("--tasks", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--iterations", type=int, default=5)
+    args = parser.parse_args()
+    print_table(run(args.tasks, args.workers, args.iterations))
+
+
+if __name__ == "__main__":
+    main()
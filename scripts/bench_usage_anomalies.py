@@ -0,0 +1,129 @@
+from __future__ import annotations
+import argparse
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+import duckdb
+
+from api.briefing import USAGE_ANOMALIES_SQL
+from scripts.bench_warehouse import _load_models, build_warehouse, measure, print_table, render_model
+
+LEGACY_SQL = """
+    WITH ordered AS (
+        SELECT
+            account_id,
+            active_users,
+            ROW_NUMBER() OVER (PARTITION BY account_id ORDER BY date_day ASC)  AS rn_asc,
+            ROW_NUMBER() OVER (PARTITION BY account_id ORDER BY date_day DESC) AS rn_desc,
+            COUNT(*) OVER (PARTITION BY account_id) AS total_pts
+        FROM ai_fct_account_usage_trend
+    ),
+    early_avg AS (
+        SELECT account_id, AVG(active_users) AS avg_early
+        FROM ordered
+        WHERE rn_asc <= 3
+        GROUP BY account_id
+    ),
+    recent_avg AS (
+        SELECT account_id, AVG(active_users) AS avg_recent
+        FROM ordered
+        WHERE rn_desc <= 3 AND total_pts >= 5
+        GROUP BY account_id
+    )
+    SELECT
+        e.account_id,
+        ao.account_name,
+        ao.current_arr_eur,
+        ROUND(e.avg_early, 1)  AS avg_early,
+        ROUND(r.avg_recent, 1) AS avg_recent,
+        ROUND(1.0 - r.avg_recent / NULLIF(e.avg_early, 0), 2) AS drop_ratio
+    FROM early_avg e
+    JOIN recent_avg r ON e.account_id = r.account_id
+    JOIN ai_dm_account_overview ao ON e.account_id = ao.account_id
+    WHERE e.avg_early > 0 AND r.avg_recent < e.avg_early * 0.7
+    ORDER BY drop_ratio DESC NULLS LAST
+    LIMIT 5
+"""
+
+INCREMENTAL_MODELS = (
+    ("fct_account_usage_rollup", "account_id"),
+    ("fct_account_usage_anomalies", "account_id"),
+)
+
+
+def _refresh(path: Path, incremental: bool) -> float:
+    models = _load_models()
+    con = duckdb.connect(str(path))
+    try:
+        start = time.perf_counter()
+        for name, key in INCREMENTAL_MODELS:
+            sql, _ = render_model(name, *models[name], incremental=incremental)
+            if incremental:
+                con.execute(f"CREATE OR REPLACE TEMP TABLE delta AS {sql}")
+                con.execute(f"DELETE FROM {name} WHERE {key} IN (SELECT {key} FROM delta)")
+                con.execute(f"INSERT INTO {name} SELECT * FROM delta")
+            else:
+                con.execute(f"CREATE OR REPLACE TABLE {name} AS {sql}")
+        sql, _ = render_model("ai_fct_usage_anomalies", *models["ai_fct_usage_anomalies"])
+        con.execute(f"CREATE OR REPLACE TABLE ai_fct_usage_anomalies AS {sql}")
+        return (time.perf_counter() - start) * 1000
+    finally:
+        con.close()
+
+
+def _append_day(path: Path, every: int) -> None:
+    con = duckdb.connect(str(path))
+    try:
+        con.execute(f"""
+            INSERT INTO product_usage_daily
+            SELECT account_id, max(date_day) + 14, greatest(1, min(active_users) // 2), min(key_events)
+            FROM product_usage_daily
+            WHERE hash(account_id) % {int(every)} = 0
+            GROUP BY account_id
+        """)
+    finally:
+        con.close()
+
+
+def run(sizes: list[int], iterations: int, rebuild: bool) -> list[dict]:
+    results = []
+    for n in sizes:
+        path = build_warehouse(n, rebuild=rebuild)
+        con = duckdb.connect(str(path), read_only=True)
+        if not con.execute("SELECT count(*) FROM duckdb_tables() WHERE table_name = 'ai_fct_usage_anomalies'").fetchone()[0]:
+            con.close()
+            path = build_warehouse(n, rebuild=True)
+            con = duckdb.connect(str(path), read_only=True)
+        legacy = con.execute(LEGACY_SQL).fetchall()
+        lookup = con.execute(USAGE_ANOMALIES_SQL).fetchall()
+        same = [r[-1] for r in legacy] == [r[-1] for r in lookup]
+        for label, sql in (("window scan per request", LEGACY_SQL), ("anomaly table top-5", USAGE_ANOMALIES_SQL)):
+            stats = measure(lambda: con.execute(sql).fetchall(), iterations)
+            results.append({"accounts": n, "path": label, "same_drop_ratios": same, **stats})
+        con.close()
+
+        with tempfile.TemporaryDirectory() as tmp:
+            scratch = Path(tmp) / path.name
+            shutil.copy(path, scratch)
+            _append_day(scratch, 100)
+            incremental_ms = _refresh(scratch, incremental=True)
+            full_ms = _refresh(scratch, incremental=False)
+        for label, ms in (("dbt refresh: full", full_ms), ("dbt refresh: incremental, 1% new days", incremental_ms)):
+            results.append({"accounts": n, "path": label, "same_drop_ratios": "", "iterations": 1, "p50_ms": round(ms, 3)})
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Briefing usage anomalies: window scan vs precomputed dbt table")
+    parser.add_argument("--sizes", default="5000,40000")
+    parser.add_argument("--iterations", type=int, default=30)
+    parser.add_argument("--rebuild", action="store_true")
+    args = parser.parse_args()
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    print_table(run(sizes, args.iterations, args.rebuild))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+from __future__ import annotations
+import argparse
+import json
+import random
+
+import duckdb
+from fastapi.encoders import jsonable_encoder
+
+from api.accounts import USAGE_SERIES_SQL, USAGE_SPARKLINE_POINTS
+from scripts.bench_warehouse import build_warehouse, measure, print_table
+
+FULL_SERIES_SQL = """
+    SELECT date_day, active_users, key_events
+    FROM ai_fct_account_usage_trend
+    WHERE account_id = ?
+    ORDER BY date_day ASC
+"""
+
+
+def _fetch(con: duckdb.DuckDBPyConnection, sql: str, params) -> list[dict]:
+    res = con.execute(sql, params)
+    cols = [d[0] for d in res.description]
+    return [dict(zip(cols, row)) for row in res.fetchall()]
+
+
+def run(n_accounts: int, histories: list[int], iterations: int, rebuild: bool) -> list[dict]:
+    results = []
+    for points in histories:
+        path = build_warehouse(n_accounts, points, rebuild=rebuild)
+        con = duckdb.connect(str(path), read_only=True)
+        rng = random.Random(points)
+        ids = [f"acc_{rng.randint(1, n_accounts):07d}" for _ in range(iterations + 3)]
+        paths = (
+            ("full series", lambda a: _fetch(con, FULL_SERIES_SQL, [a])),
+            (f"min/max {USAGE_SPARKLINE_POINTS}", lambda a: _fetch(con, USAGE_SERIES_SQL["day"], {
+                "account_id": a, "start": None, "end": None, "points": USAGE_SPARKLINE_POINTS,
+            })),
+            ("monthly buckets", lambda a: _fetch(con, USAGE_SERIES_SQL["month"], {
+                "account_id": a, "start": None, "end": None, "points": None,
+            })),
+        )
+        for label, fn in paths:
+            sample = fn(ids[0])
+            it = iter(ids * 2)
+            stats = measure(lambda: fn(next(it)), iterations)
+            results.append({
+                "history_points": points,
+                "path": label,
+                "returned": len(sample),
+                "payload_kb": round(len(json.dumps(jsonable_encoder(sample))) / 1024, 1),
+                **stats,
+            })
+        con.close()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Account usage series: full history vs server-side resampling")
+    parser.add_argument("--accounts", type=int, default=1000)
+    parser.add_argument("--histories", default="10,260,2600")
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument("--rebuild", action="store_true")
+    args = parser.parse_args()
+    histories = [int(s) for s in args.histories.split(",") if s]
+    print_table(run(args.accounts, histories, args.iterations, args.rebuild))
+
+
+if __name__ == "__main__":
+    main()
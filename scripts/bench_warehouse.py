@@ -0,0 +1,164 @@
+from __future__ import annotations
+import re
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+import duckdb
+from jinja2 import Environment
+
+MODELS_DIR = Path(__file__).parent.parent / "dbt" / "models"
+BENCH_DIR = Path(tempfile.gettempdir()) / "revenue_intel_bench"
+
+FOLDER_MATERIALIZATION = {"gold": "table", "semantic": "table", "ai": "view"}
+
+_REF_RE = re.compile(r"ref\(\s*['\"]([^'\"]+)['\"]\s*\)")
+
+SEED_SQL = {
+    "customers": """
+        SELECT
+            printf('acc_%07d', i) AS account_id
+          , 'Account ' || i || ' ' || ['GmbH', 'SE', 'BV', 'AB', 'Ltd', 'SAS'][1 + i % 6] AS account_name
+          , ['SMB', 'MidMarket', 'Enterprise'][1 + i % 3] AS segment
+          , ['DE', 'NL', 'FR', 'PL', 'SE', 'GB'][1 + i % 6] AS country
+          , ['piotr', 'anna', 'lukas', 'sofia'][1 + i % 4] AS owner_ae
+        FROM range(1, $n + 1) t(i)
+    """,
+    "subscriptions": """
+        SELECT
+            printf('acc_%07d', i) AS account_id
+          , ['Starter', 'Pro', 'Business', 'Enterprise'][1 + i % 4] AS plan
+          , CASE WHEN i % 23 = 0 THEN 'cancelled' ELSE 'active' END AS status
+          , (current_date - INTERVAL (200 + i % 500) DAY)::DATE AS start_date
+          , (current_date + INTERVAL ((i * 37) % 400 - 30) DAY)::DATE AS renewal_date
+          , 300 + (i * 131) % 9000 AS mrr_eur
+          , 10 + (i * 7) % 190 AS seats_purchased
+        FROM range(1, $n + 1) t(i)
+    """,
+    "invoices": """
+        SELECT
+            printf('acc_%07d', i) AS account_id
+          , printf('inv_%07d_%d', i, j) AS invoice_id
+          , (current_date - INTERVAL (30 * j) DAY)::DATE AS invoice_date
+          , 300 + (i * 131) % 9000 AS amount_eur
+          , (i * (j + 3)) % 11 <> 0 AS paid
+        FROM range(1, $n + 1) t(i), range(0, 3) s(j)
+    """,
+    "product_usage_daily": """
+        SELECT
+            printf('acc_%07d', i) AS account_id
+          , (current_date - INTERVAL (14 * ($points - j)) DAY)::DATE AS date_day
+          , greatest(1, (10 + (i * 7) % 190) * (60 + (i * 13) % 40) // 100
+                - CASE WHEN i % 5 = 0 THEN j * ((i % 7) + 1) ELSE (j * i) % 4 END) AS active_users
+          , greatest(1, (10 + (i * 7) % 190) * 12 - j * (i % 9)) AS key_events
+        FROM range(1, $n + 1) t(i), range(0, $points) s(j)
+    """,
+    "support_tickets": """
+        SELECT
+            printf('acc_%07d', i) AS account_id
+          , printf('tkt_%07d_%d', i, j) AS ticket_id
+          , (current_date - INTERVAL (11 * j + i % 30) DAY)::DATE AS created_date
+          , CASE WHEN (i + j) % 4 = 0 THEN 'high' WHEN (i + j) % 4 = 1 THEN 'medium' ELSE 'low' END AS severity
+          , CASE WHEN j = 0 THEN 'open' ELSE 'closed' END AS status
+        FROM range(1, $n + 1) t(i), range(0, 3) s(j)
+        WHERE (i + j) % 3 <> 0
+    """,
+}
+
+
+def _load_models() -> dict[str, tuple[str, str]]:
+    models = {}
+    for path in sorted(MODELS_DIR.rglob("*.sql")):
+        models[path.stem] = (path.parent.name, path.read_text())
+    return models
+
+
+def _topo_order(models: dict[str, tuple[str, str]]) -> list[str]:
+    order: list[str] = []
+    seen: set[str] = set()
+
+    def visit(name: str) -> None:
+        if name in seen or name not in models:
+            return
+        seen.add(name)
+        for dep in _REF_RE.findall(models[name][1]):
+            visit(dep)
+        order.append(name)
+
+    for name in models:
+        visit(name)
+    return order
+
+
+def render_model(name: str, folder: str, source: str, incremental: bool = False) -> tuple[str, str]:
+    config: dict = {}
+    env = Environment()
+    template = env.from_string(source)
+    sql = template.render(
+        ref=lambda model: model,
+        config=lambda **kw: config.update(kw) or "",
+        is_incremental=lambda: incremental,
+        this=name,
+        var=lambda key, default=None: default,
+    )
+    materialized = config.get("materialized") or FOLDER_MATERIALIZATION.get(folder, "view")
+    return sql, materialized
+
+
+def build_warehouse(
+    n_accounts: int,
+    points_per_account: int = 10,
+    path: Optional[Path] = None,
+    rebuild: bool = False,
+) -> Path:
+    BENCH_DIR.mkdir(parents=True, exist_ok=True)
+    path = path or BENCH_DIR / f"warehouse_{n_accounts}_{points_per_account}.duckdb"
+    if path.exists() and not rebuild:
+        return path
+    if path.exists():
+        path.unlink()
+
+    con = duckdb.connect(str(path))
+    try:
+        for seed, sql in SEED_SQL.items():
+            sql = sql.replace("$n", str(int(n_accounts))).replace("$points", str(int(points_per_account)))
+            con.execute(f"CREATE TABLE {seed} AS {sql}")
+        models = _load_models()
+        for name in _topo_order(models):
+            folder, source = models[name]
+            sql, materialized = render_model(name, folder, source)
+            kind = "VIEW" if materialized == "view" else "TABLE"
+            con.execute(f"CREATE OR REPLACE {kind} {name} AS {sql}")
+    finally:
+        con.close()
+    return path
+
+
+def measure(fn: Callable[[], object], iterations: int, warmup: int = 3) -> dict:
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        "iterations": iterations,
+        "p50_ms": round(statistics.median(samples), 3),
+        "p99_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.99))], 3),
+        "mean_ms": round(statistics.fmean(samples), 3),
+    }
+
+
+def print_table(rows: list[dict]) -> None:
+    if not rows:
+        return
+    cols = list(rows[0].keys())
+    widths = {c: max(len(c), *(len(str(r.get(c, ""))) for r in rows)) for c in cols}
+    print("  ".join(c.ljust(widths[c]) for c in cols))
+    print("  ".join("-" * widths[c] for c in cols))
+    for r in rows:
+        print("  ".join(str(r.get(c, "")).ljust(widths[c]) for c in cols))
@@ -0,0 +1,41 @@
+from __future__ import annotations
+import argparse
+import sys
+import time
+
+import duckdb
+
+from core.db import BUILD_FLAG_PATH, DB_PATH
+
+
+def request_release(timeout: float) -> bool:
+    BUILD_FLAG_PATH.parent.mkdir(parents=True, exist_ok=True)
+    BUILD_FLAG_PATH.touch()
+    if not DB_PATH.exists():
+        return True
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            duckdb.connect(str(DB_PATH)).close()
+            return True
+        except duckdb.IOException:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.5)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Ask running API servers to release the DuckDB file before a dbt build")
+    parser.add_argument("action", choices=("hold", "done"))
+    parser.add_argument("--timeout", type=float, default=60.0)
+    args = parser.parse_args()
+    if args.action == "done":
+        BUILD_FLAG_PATH.unlink(missing_ok=True)
+        return
+    if not request_release(args.timeout):
+        BUILD_FLAG_PATH.unlink(missing_ok=True)
+        sys.exit(f"{DB_PATH} is still locked after {args.timeout:.0f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,38 +1,83 @@
 // Accounts view — table, filter/search, drilldown panel
 
+const ACCOUNTS_PAGE_SIZE = 100;
+const ACCOUNT_LIST_COLUMNS = 'account_name,segment,current_arr_eur,health_band,days_to_renewal,owner_ae';
+
 let allAccounts = [];
+let accountsTotal = 0;
+let accountsCursor = null;
+let accountsRequest = 0;
+let accountsLoading = false;
 let sparklineChart = null;
 let selectedAccountId = null;
 
-async function loadAccounts() {
-  let rows;
+function accountsQuery() {
+  const params = new URLSearchParams({ limit: ACCOUNTS_PAGE_SIZE, columns: ACCOUNT_LIST_COLUMNS });
+  const q = document.getElementById('account-search').value.trim();
+  const seg = document.getElementById('filter-segment').value;
+  const health = document.getElementById('filter-health').value;
+  if (q) params.set('q', q);
+  if (seg) params.set('segment', seg);
+  if (health) params.set('band', health);
+  return params;
+}
+
+async function fetchAccountsPage(reset) {
+  if (!reset && (accountsLoading || !accountsCursor)) return;
+  const request = ++accountsRequest;
+  const params = accountsQuery();
+  if (reset) params.set('include_total', 'true');
+  else params.set('cursor', accountsCursor);
+
+  accountsLoading = true;
+  let page;
   try {
-    const res = await fetch('/api/accounts');
-    rows = await res.json();
+    const res = await fetch(`/api/accounts?${params}`);
+    page = await res.json();
   } catch (e) {
     console.error('Accounts load failed', e);
     return;
+  } finally {
+    if (request === accountsRequest) accountsLoading = false;
+  }
+  if (request !== accountsRequest) return;
+
+  if (reset) {
+    allAccounts = page.rows;
+    accountsTotal = page.total;
+  } else {
+    allAccounts = allAccounts.concat(page.rows);
   }
-  allAccounts = rows;
-  renderAccountsTable(rows);
+  accountsCursor = page.next_cursor;
+  renderAccountsTable(page.rows, !reset);
+}
 
+async function loadAccounts() {
+  await fetchAccountsPage(true);
+  const filtered = accountsQuery();
   const badge = document.getElementById('nav-account-count');
-  if (badge) badge.textContent = `${rows.length} accounts`;
+  if (badge && !filtered.has('q') && !filtered.has('segment') && !filtered.has('band')) {
+    badge.textContent = `${accountsTotal} accounts`;
+  }
 }
 
-function renderAccountsTable(rows) {
+function renderAccountsTable(rows, append = false) {
   const { fmtEur, fmtDays, healthDot, renewalClass } = window.App;
   const tbody = document.getElementById('accounts-tbody');
   const countEl = document.getElementById('accounts-count');
 
-  if (countEl) countEl.textContent = `${rows.length} accounts`;
+  if (countEl) {
+    countEl.textContent = allAccounts.length < accountsTotal
+      ? `${allAccounts.length} of ${accountsTotal} accounts`
+      : `${accountsTotal} accounts`;
+  }
 
-  if (!rows.length) {
+  if (!append && !rows.length) {
     tbody.innerHTML = '<tr><td colspan="6" class="loading-cell">No accounts match filter.</td></tr>';
     return;
   }
 
-  tbody.innerHTML = rows.map(r => `
+  const html = rows.map(r => `
     <tr data-id="${r.account_id}" class="${r.account_id === selectedAccountId ? 'selected' : ''}">
       <td class="td-name">${r.account_name}</td>
       <td style="color:var(--muted)">${r.segment}</td>
@@ -48,7 +93,11 @@ function renderAccountsTable(rows) {
     </tr>
   `).join('');
 
-  tbody.querySelectorAll('tr').forEach(row => {
+  if (append) tbody.insertAdjacentHTML('beforeend', html);
+  else tbody.innerHTML = html;
+
+  tbody.querySelectorAll('tr:not([data-wired])').forEach(row => {
+    row.dataset.wired = '1';
     row.addEventListener('click', () => openPanel(row.dataset.id));
   });
 }
@@ -223,25 +272,23 @@ function renderSignals(health, primaryRisk) {
   `).join('');
 }
 
-function filterAccounts() {
-  const q = document.getElementById('account-search').value.toLowerCase();
-  const seg = document.getElementById('filter-segment').value;
-  const health = document.getElementById('filter-health').value;
+let searchTimer = null;
 
-  const filtered = allAccounts.filter(r => {
-    const matchQ = !q || r.account_name.toLowerCase().includes(q);
-    const matchSeg = !seg || r.segment === seg;
-    const matchHealth = !health || r.health_band === health;
-    return matchQ && matchSeg && matchHealth;
-  });
-
-  renderAccountsTable(filtered);
+function filterAccounts() {
+  clearTimeout(searchTimer);
+  searchTimer = setTimeout(() => fetchAccountsPage(true), 200);
 }
 
 // Wire filters
 document.getElementById('account-search').addEventListener('input', filterAccounts);
-document.getElementById('filter-segment').addEventListener('change', filterAccounts);
-document.getElementById('filter-health').addEventListener('change', filterAccounts);
+document.getElementById('filter-segment').addEventListener('change', () => fetchAccountsPage(true));
+document.getElementById('filter-health').addEventListener('change', () => fetchAccountsPage(true));
+
+// Fetch the next page when the table is scrolled near its end
+document.getElementById('accounts-table-side').addEventListener('scroll', e => {
+  const el = e.currentTarget;
+  if (el.scrollTop + el.clientHeight >= el.scrollHeight - 200) fetchAccountsPage(false);
+});
 
 document.getElementById('panel-close').addEventListener('click', () => {
   document.getElementById('account-panel').hidden = true;
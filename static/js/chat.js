@@ -240,7 +240,7 @@ async function sendMessage(text) {
   chatHistory.push({ role: 'user', content: text });
 
   try {
-    const res = await fetch('/api/chat', {
+    const res = await fetch('/api/chat/stream', {
       method: 'POST',
       headers: { 'Content-Type': 'application/json' },
       body: JSON.stringify({
@@ -251,14 +251,26 @@ async function sendMessage(text) {
       }),
     });
 
-    if (!res.ok) throw new Error(`HTTP ${res.status}`);
-    const data = await res.json();
+    if (!res.ok || !res.body) throw new Error(`HTTP ${res.status}`);
+
+    const data = {};
+    await readEventStream(res, (event, payload) => {
+      if (event === 'meta') {
+        Object.assign(data, payload);
+        setCardStatus(cardEl, data.status || 'Processing…');
+        renderCardMeta(cardEl, data);
+      } else if (event === 'narrative') {
+        appendNarrative(cardEl, payload.delta || '');
+      } else if (event === 'done' || event === 'error') {
+        Object.assign(data, payload);
+      }
+    });
 
     if (data.error) {
       finalizeCardError(cardEl, data.narrative || 'Unknown error', text);
+    } else if (!data.intent) {
+      throw new Error('response ended early');
     } else {
-      setCardStatus(cardEl, data.status || 'Processing…');
-      await typewriterNarrative(cardEl, data.narrative || '');
       finalizeCard(cardEl, data);
       chatHistory.push({ role: 'assistant', content: data.narrative || '' });
       if (chatHistory.length > 12) chatHistory = chatHistory.slice(-12);
@@ -272,19 +284,37 @@ async function sendMessage(text) {
   scrollToBottom();
 }
 
-async function typewriterNarrative(cardEl, text) {
+async function readEventStream(res, onEvent) {
+  const reader = res.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    let sep;
+    while ((sep = buffer.indexOf('\n\n')) !== -1) {
+      const block = buffer.slice(0, sep);
+      buffer = buffer.slice(sep + 2);
+      let event = 'message';
+      const dataLines = [];
+      block.split('\n').forEach(line => {
+        if (line.startsWith('event:')) event = line.slice(6).trim();
+        else if (line.startsWith('data:')) dataLines.push(line.slice(5).trimStart());
+      });
+      if (dataLines.length) onEvent(event, JSON.parse(dataLines.join('\n')));
+    }
+  }
+}
+
+function appendNarrative(cardEl, delta) {
   const status = cardEl.querySelector('#_cstatus');
   const narrative = cardEl.querySelector('#_cnarrative');
   const textEl = cardEl.querySelector('#_cnarr-text');
   if (status) status.style.display = 'none';
   if (narrative) narrative.style.display = '';
-
-  const CHAR_DELAY = 10;
-  for (let i = 0; i < text.length; i++) {
-    if (textEl) textEl.textContent += text[i];
-    if (i % 8 === 0) scrollToBottom();
-    await new Promise(r => setTimeout(r, CHAR_DELAY));
-  }
+  if (textEl) textEl.textContent += delta;
+  scrollToBottom();
 }
 
 // ─── Card Construction ──────────────────────────────────────────────
@@ -324,9 +354,9 @@ function setCardStatus(wrapper, text) {
   if (el) el.textContent = text;
 }
 
-function finalizeCard(wrapper, data) {
-  const cursor = wrapper.querySelector('#_ccursor');
-  if (cursor) cursor.remove();
+function renderCardMeta(wrapper, data) {
+  if (wrapper.dataset.metaRendered) return;
+  wrapper.dataset.metaRendered = '1';
 
   const titleEl = wrapper.querySelector('#_ctitle');
   if (titleEl) titleEl.textContent = data.title || data.intent || 'Response';
@@ -350,6 +380,35 @@ function finalizeCard(wrapper, data) {
     metaEl.prepend(badge);
   }
 
+  const body = wrapper.querySelector('#_cbody');
+  const tableHtml = buildInlineTable(data.intent, data.rows || []);
+  if (body && tableHtml) {
+    const wrap = document.createElement('div');
+    wrap.className = 'chat-inline-table';
+    wrap.innerHTML = tableHtml;
+    body.appendChild(wrap);
+  }
+
+  if (data.evidence && data.evidence.sql) {
+    const card = wrapper.querySelector('.chat-card');
+    card.appendChild(buildEvidence(data.evidence));
+  }
+  scrollToBottom();
+}
+
+function finalizeCard(wrapper, data) {
+  renderCardMeta(wrapper, data);
+
+  const cursor = wrapper.querySelector('#_ccursor');
+  if (cursor) cursor.remove();
+
+  const status = wrapper.querySelector('#_cstatus');
+  if (status) status.style.display = 'none';
+  const narrative = wrapper.querySelector('#_cnarrative');
+  if (narrative) narrative.style.display = '';
+  const textEl = wrapper.querySelector('#_cnarr-text');
+  if (textEl && data.narrative) textEl.textContent = data.narrative;
+
   const body = wrapper.querySelector('#_cbody');
   if (!body) return;
 
@@ -362,15 +421,7 @@ function finalizeCard(wrapper, data) {
       d.textContent = b;
       bulletsDiv.appendChild(d);
     });
-    body.appendChild(bulletsDiv);
-  }
-
-  const tableHtml = buildInlineTable(data.intent, data.rows || []);
-  if (tableHtml) {
-    const wrap = document.createElement('div');
-    wrap.className = 'chat-inline-table';
-    wrap.innerHTML = tableHtml;
-    body.appendChild(wrap);
+    body.insertBefore(bulletsDiv, body.querySelector('.chat-inline-table'));
   }
 
   if (data.next_action) {
@@ -538,6 +589,9 @@ function buildEvidence(ev) {
     { label: 'No PII',       ok: g.no_pii_columns },
     { label: 'Row limit',    ok: g.row_limit_present },
   ].map(b => `<span class="guardrail-badge ${b.ok ? 'guardrail-ok' : 'guardrail-warn'}">${b.label} ${b.ok ? '✓' : '✗'}</span>`).join('');
+  const params = Object.entries(ev.params || {})
+    .map(([k, v]) => `-- $${k} = ${JSON.stringify(v)}`).join('\n');
+  const sqlText = params ? `${ev.sql}\n\n${params}` : ev.sql;
 
   const div = document.createElement('div');
   div.className = 'chat-evidence';
@@ -549,8 +603,8 @@ function buildEvidence(ev) {
     <div class="evidence-body" hidden>
       <div class="guardrail-row">${badges}</div>
       <div class="evidence-sql-wrap">
-        <button class="sql-copy-btn" onclick="copySQL(this)" data-sql="${escAttr(ev.sql)}">Copy</button>
-        <pre class="evidence-sql">${escHtml(ev.sql)}</pre>
+        <button class="sql-copy-btn" onclick="copySQL(this)" data-sql="${escAttr(sqlText)}">Copy</button>
+        <pre class="evidence-sql">${escHtml(sqlText)}</pre>
       </div>
     </div>
   `;
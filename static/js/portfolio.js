@@ -6,6 +6,7 @@ let pipelineChart = null;
 
 let allRenewals = [];
 let allRiskRows = [];
+let riskTotal = 0;
 
 async function loadPortfolio() {
   let data;
@@ -21,7 +22,7 @@ async function loadPortfolio() {
   renderCharts(data.kpis, data.arr_bands);
   renderRenewalPipeline(data.renewal_pipeline || []);
   renderRenewals(data.renewals_90d);
-  renderRiskMatrix(data.risk_matrix);
+  renderRiskMatrix(data.risk_matrix, data.risk_matrix_total);
   wirePortfolioControls();
   loadBriefing();
 
@@ -262,14 +263,32 @@ function applyRenewalsLimit(n) {
 
 // ─── Risk Matrix ────────────────────────────────────────────────────
 
-function renderRiskMatrix(rows) {
+function renderRiskMatrix(rows, total) {
   allRiskRows = rows || [];
+  riskTotal = total ?? allRiskRows.length;
   const ctrl = document.getElementById('risk-limit-ctrl');
   if (ctrl) ctrl.style.display = allRiskRows.length > 0 ? '' : 'none';
   applyRiskLimit(10);
 }
 
-function applyRiskLimit(n) {
+async function loadRiskRows(n) {
+  const want = Math.min(n, riskTotal);
+  while (allRiskRows.length < want) {
+    const limit = Math.min(1000, want - allRiskRows.length);
+    try {
+      const res = await fetch(`/api/portfolio/risk-matrix?limit=${limit}&offset=${allRiskRows.length}`);
+      const page = await res.json();
+      if (!page.rows || !page.rows.length) break;
+      allRiskRows = allRiskRows.concat(page.rows);
+      riskTotal = page.total;
+    } catch (e) {
+      console.error('Risk matrix page load failed', e);
+      break;
+    }
+  }
+}
+
+async function applyRiskLimit(n) {
   const { fmtEur, fmtDays, healthDot, renewalClass } = window.App;
   const tbody = document.getElementById('risk-matrix-body');
   const countEl = document.getElementById('risk-matrix-count');
@@ -282,13 +301,14 @@ function applyRiskLimit(n) {
     return;
   }
 
+  await loadRiskRows(n);
   const limit = Math.max(1, Math.min(n, allRiskRows.length));
   const rows = allRiskRows.slice(0, limit);
-  const showingAll = limit >= allRiskRows.length;
+  const showingAll = limit >= riskTotal;
 
-  if (countEl) countEl.textContent = `${rows.length} of ${allRiskRows.length}`;
+  if (countEl) countEl.textContent = `${rows.length} of ${riskTotal}`;
   if (input) input.value = limit;
-  if (allBtn) allBtn.textContent = showingAll ? 'Collapse' : `Show all (${allRiskRows.length})`;
+  if (allBtn) allBtn.textContent = showingAll ? 'Collapse' : `Show all (${riskTotal})`;
 
   tbody.innerHTML = rows.map(r => {
     const usagePct = r.usage_drop_ratio !== null && r.usage_drop_ratio !== undefined
@@ -340,7 +360,7 @@ function wirePortfolioControls() {
   if (mBtn) {
     mBtn.addEventListener('click', () => {
       const cur = parseInt(mInput?.value) || 10;
-      const next = cur >= allRiskRows.length ? 10 : allRiskRows.length;
+      const next = cur >= riskTotal ? 10 : riskTotal;
       applyRiskLimit(next);
     });
   }
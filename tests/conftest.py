@@ -0,0 +1,31 @@
+from __future__ import annotations
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from core import db  # noqa: E402
+from scripts.bench_warehouse import build_warehouse  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def no_api_key(monkeypatch):
+    monkeypatch.delenv("ANTHROPIC_API_KEY", raising=False)
+
+
+@pytest.fixture(scope="session")
+def warehouse(tmp_path_factory) -> Path:
+    return build_warehouse(250, 3, path=tmp_path_factory.mktemp("warehouse") / "warehouse.duckdb")
+
+
+@pytest.fixture
+def warehouse_pool(warehouse, monkeypatch):
+    pool = db.ConnectionPool(warehouse, max_idle=0)
+    monkeypatch.setattr(db, "DB_PATH", warehouse)
+    monkeypatch.setattr(db, "_pool", pool)
+    yield pool
+    pool.close_all()
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api.accounts import ACCOUNT_SORTS, router
+from core.columnar import COLUMNAR_MEDIA_TYPE
+
+
+@pytest.fixture
+def client(warehouse_pool):
+    app = FastAPI()
+    app.include_router(router)
+    return TestClient(app)
+
+
+def _pages(client, sort: str, limit: int, columnar: bool = False) -> list[list[str]]:
+    headers = {"accept": COLUMNAR_MEDIA_TYPE} if columnar else {}
+    pages, cursor = [], None
+    while True:
+        params = {"sort": sort, "limit": limit, "columns": "account_id"}
+        if cursor:
+            params["cursor"] = cursor
+        resp = client.get("/api/accounts", params=params, headers=headers)
+        assert resp.status_code == 200
+        body = resp.json()
+        ids = body["data"]["account_id"] if columnar else [r["account_id"] for r in body["rows"]]
+        pages.append(ids)
+        cursor = body["next_cursor"]
+        if not cursor:
+            return pages
+
+
+@pytest.mark.parametrize("columnar", [False, True])
+@pytest.mark.parametrize("sort", sorted(ACCOUNT_SORTS))
+def test_keyset_pages_cover_every_account_once(client, warehouse_pool, sort, columnar):
+    with warehouse_pool.connection() as con:
+        expected = con.execute("SELECT count(*) FROM ai_account_snapshot").fetchone()[0]
+
+    pages = _pages(client, sort, limit=17, columnar=columnar)
+    ids = [account_id for page in pages for account_id in page]
+
+    assert len(ids) == expected
+    assert len(set(ids)) == expected
+    assert all(len(page) == 17 for page in pages[:-1])
+    assert ids == _pages(client, sort, limit=1000)[0]
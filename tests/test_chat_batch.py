@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api import chat
+
+
+@pytest.fixture
+def client(warehouse_pool, monkeypatch):
+    monkeypatch.setattr(chat, "_account_index", None)
+    calls = []
+
+    async def fake_insight(intent, rows, question, account_name, history, use_ai=True):
+        calls.append((intent, question, account_name))
+        return {"narrative": f"{intent} for {account_name or 'portfolio'}", "bullets": [], "next_action": "", "followups": []}
+
+    monkeypatch.setattr(chat, "generate_insight", fake_insight)
+    app = FastAPI()
+    app.include_router(chat.router)
+    client = TestClient(app)
+    client.insight_calls = calls
+    return client
+
+
+def _answers(resp) -> list[dict]:
+    assert resp.status_code == 200
+    return [json.loads(line) for line in resp.text.splitlines()]
+
+
+def test_portfolio_insight_is_generated_once_per_batch(client, warehouse_pool):
+    with warehouse_pool.connection() as con:
+        accounts = con.execute("SELECT count(*) FROM ai_dm_account_overview").fetchone()[0]
+    questions = ["Show expansion shortlist", "ARR exposure by health band"]
+    answers = _answers(client.post("/api/chat/batch", json={"questions": questions, "all_accounts": True}))
+
+    assert len(answers) == 2 * accounts
+    assert not any(a.get("error") for a in answers)
+    assert sorted(q for _, q, _ in client.insight_calls) == sorted(questions)
+
+
+def test_account_insights_are_per_account(client, warehouse_pool):
+    with warehouse_pool.connection() as con:
+        ids = [r[0] for r in con.execute("SELECT account_id FROM ai_dm_account_overview ORDER BY account_id LIMIT 3").fetchall()]
+    answers = _answers(client.post(
+        "/api/chat/batch", json={"questions": ["Is this account healthy?"] * 2, "account_ids": ids},
+    ))
+
+    assert len(answers) == 6
+    assert not any(a.get("error") for a in answers)
+    assert len(client.insight_calls) == 3
+    assert len({name for _, _, name in client.insight_calls}) == 3
@@ -0,0 +1,64 @@
+from __future__ import annotations
+import os
+import subprocess
+import sys
+
+import duckdb
+
+from core import db
+
+
+def _write_db(path, value: int) -> None:
+    con = duckdb.connect(str(path))
+    con.execute("CREATE OR REPLACE TABLE t AS SELECT ? AS x", [value])
+    con.close()
+
+
+def _read(pool: db.ConnectionPool) -> int:
+    with pool.connection() as con:
+        return con.execute("SELECT x FROM t").fetchone()[0]
+
+
+def test_pool_reopens_when_build_replaces_file(tmp_path):
+    path = tmp_path / "w.duckdb"
+    _write_db(path, 1)
+    pool = db.ConnectionPool(path, size=2, max_idle=0)
+    try:
+        assert _read(pool) == 1
+        assert _read(pool) == 1
+        assert pool.stats()["reopens"] == 0
+
+        staged = tmp_path / "staged.duckdb"
+        _write_db(staged, 2)
+        os.replace(staged, path)
+
+        assert _read(pool) == 2
+        stats = pool.stats()
+        assert stats["reopens"] == 1
+        assert stats["open"] == 1
+    finally:
+        pool.close_all()
+
+
+def test_build_flag_releases_root_for_writer(tmp_path):
+    path = tmp_path / "w.duckdb"
+    _write_db(path, 1)
+    pool = db.ConnectionPool(path, max_idle=0, timeout=0.5)
+    try:
+        assert _read(pool) == 1
+        pool.build_flag.touch()
+        assert _read_or_timeout(pool) is None
+        writer = f"import duckdb; con = duckdb.connect({str(path)!r}); con.execute('CREATE OR REPLACE TABLE t AS SELECT 2 AS x'); con.close()"
+        subprocess.run([sys.executable, "-c", writer], check=True, timeout=60)
+        pool.build_flag.unlink()
+        assert _read(pool) == 2
+        assert pool.stats()["build_releases"] == 1
+    finally:
+        pool.close_all()
+
+
+def _read_or_timeout(pool: db.ConnectionPool):
+    try:
+        return _read(pool)
+    except db.BuildInProgress:
+        return None
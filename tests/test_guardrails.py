@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import pytest
+
+from api.chat import BATCH_ACCOUNT_SQL, SQL_TEMPLATES
+from core.guardrails import analyze_sql, compute_guardrails
+
+ENGINES = ("regex", "ast")
+ALLOWED = frozenset({
+    "ai_dm_account_overview", "ai_fct_account_health_score", "ai_fct_account_expansion_potential",
+    "ai_fct_renewals_at_risk", "ai_fct_expansion_shortlist", "ai_arr_exposure",
+})
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("sql", [*SQL_TEMPLATES.values(), *BATCH_ACCOUNT_SQL.values()])
+def test_chat_templates_pass(engine, sql):
+    verdict = compute_guardrails(sql, ALLOWED, (1, 1), analyze_sql(sql, engine))
+
+    assert verdict["select_only"]
+    assert verdict["allowlisted_assets"]
+    assert verdict["no_pii_columns"]
+    assert verdict["blocked_keywords_found"] == []
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("sql, blocked", [
+    ("DELETE FROM ai_arr_exposure", ["DELETE"]),
+    ("SELECT * FROM ai_arr_exposure; DROP TABLE ai_arr_exposure", ["DROP"]),
+])
+def test_write_statements_are_rejected(engine, sql, blocked):
+    verdict = analyze_sql(sql, engine)
+
+    assert not verdict["select_only"]
+    assert verdict["blocked_keywords_found"] == blocked
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_pii_columns_and_limits_are_flagged(engine):
+    assert not analyze_sql("SELECT email FROM ai_arr_exposure LIMIT 5", engine)["no_pii_columns"]
+    assert analyze_sql("SELECT health_band FROM ai_arr_exposure LIMIT 5", engine)["row_limit_present"]
+    assert not analyze_sql("SELECT health_band FROM ai_arr_exposure", engine)["row_limit_present"]
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_tables_in_subqueries_are_not_allowlisted(engine):
+    sql = "SELECT account_id FROM (SELECT * FROM raw_contacts) t"
+    verdict = compute_guardrails(sql, ALLOWED, (0, 1), analyze_sql(sql, engine))
+
+    assert "raw_contacts" in verdict["tables_used"]
+    assert not verdict["allowlisted_assets"]
+
+
+def test_ast_engine_resolves_cte_names():
+    sql = "WITH x AS (SELECT * FROM ai_arr_exposure) SELECT * FROM x LIMIT 5"
+
+    assert analyze_sql(sql, "regex")["tables_used"] == ["ai_arr_exposure", "x"]
+    assert analyze_sql(sql, "ast")["tables_used"] == ["ai_arr_exposure"]
@@ -0,0 +1,74 @@
+from __future__ import annotations
+import asyncio
+
+import anthropic
+import pytest
+
+from core import llm, llm_client
+
+
+@pytest.fixture
+def broken_client(monkeypatch):
+    def _raise(*args, **kwargs):
+        raise TypeError("unexpected keyword argument")
+
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test-key")
+    monkeypatch.setattr(anthropic, "AsyncAnthropic", _raise)
+    monkeypatch.setattr(llm_client, "_async_client", None)
+    yield
+    llm_client._async_client = None
+
+
+ROWS: list[dict] = []
+
+
+def test_client_construction_accepts_config(monkeypatch):
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test-key")
+    monkeypatch.setattr(llm_client, "_async_client", None)
+    monkeypatch.setattr(llm_client, "_sync_client", None)
+    try:
+        assert llm_client.get_async_client() is not None
+        assert llm_client.get_client() is not None
+    finally:
+        asyncio.run(llm_client.aclose())
+
+
+def test_insight_falls_back_when_client_construction_fails(broken_client):
+    result = asyncio.run(llm.generate_insight("renewals_at_risk", ROWS, "Which renewals are at risk?", None, []))
+    assert result == llm._insight_fallback("renewals_at_risk", ROWS)
+
+
+def test_stream_falls_back_when_client_construction_fails(broken_client):
+    async def _collect():
+        return [event async for event in llm.stream_insight("renewals_at_risk", ROWS, "Which renewals are at risk?", None, [])]
+
+    events = asyncio.run(_collect())
+    assert [name for name, _ in events] == ["narrative", "done"]
+    assert events[-1][1] == llm._insight_fallback("renewals_at_risk", ROWS)
+
+
+def test_briefing_falls_back_when_client_construction_fails(broken_client):
+    arr = [{"health_band": "red", "cnt": 2, "arr_eur": 1000}]
+    result = asyncio.run(llm.generate_briefing(arr, [], [], []))
+    assert result["ai_generated"] is False
+    assert len(result["insights"]) == 3
+
+
+def test_action_asset_reports_error_when_client_construction_fails(broken_client):
+    result = asyncio.run(llm.generate_action_asset("email", "account_overview", "Acme GmbH", "n", [], "a"))
+    assert result["error"] is True
+
+
+def test_shared_client_bounds_connections(monkeypatch):
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test-key")
+    monkeypatch.setattr(llm_client, "LLM_MAX_CONNECTIONS", 3)
+    monkeypatch.setattr(llm_client, "LLM_MAX_KEEPALIVE", 2)
+    monkeypatch.setattr(llm_client, "_async_client", None)
+    monkeypatch.setattr(llm_client, "_sync_client", None)
+    try:
+        for client in (llm_client.get_async_client(), llm_client.get_client()):
+            pool = client._client._transport._pool
+            assert pool._max_connections == 3
+            assert pool._max_keepalive_connections == 2
+    finally:
+        asyncio.run(llm_client.aclose())
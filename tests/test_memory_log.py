@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import pytest
+
+from aos.engine import task_store
+from aos.engine.memory_log import MemoryLog, replay_into_store
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(task_store, "DB_PATH", tmp_path / "aos.db")
+    yield task_store
+    task_store.close_connection()
+
+
+def _entry(i: int) -> dict:
+    return {
+        "id": f"m{i:04d}", "type": "fact", "content": {"i": i, "pad": "x" * 200}, "tags": [],
+        "created_at": "2026-01-01T00:00:00+00:00", "source_task_id": None, "source_goal_id": None,
+    }
+
+
+def test_prune_compacts_old_segments_and_replay_restores_everything(tmp_path, store):
+    log = MemoryLog(tmp_path / "memory.jsonl", max_bytes=2048, max_segments=2, max_total_bytes=0)
+    for i in range(120):
+        log.append(_entry(i))
+        log.flush()
+    log.append(_entry(3))
+    log.flush()
+
+    assert len(log.segments()) == 2
+    assert log.compacted_segments() > 0
+    assert log.snapshot_path().exists()
+
+    ids = [e["id"] for e in log.replay()]
+    assert set(ids) == {f"m{i:04d}" for i in range(120)}
+
+    result = replay_into_store(log)
+    assert result["inserted"] == 120
+    with store._conn() as con:
+        assert con.execute("SELECT count(*) FROM memory_entries").fetchone()[0] == 120
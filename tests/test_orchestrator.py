@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import threading
+
+import pytest
+
+from aos.engine import executor, memory, orchestrator, task_store
+from aos.engine.schemas import Goal, Task, TaskStatus
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(task_store, "DB_PATH", tmp_path / "aos.db")
+    monkeypatch.setattr(orchestrator, "TASK_TOKEN_RESERVATION", 100)
+    monkeypatch.setattr(executor, "execute_task", lambda task, goal, prior: {
+        "result": f"Completed {task.title}", "summary": f"{task.title} done", "_tokens": 100,
+    })
+    monkeypatch.setattr(memory, "MEMORY_FILE", tmp_path / "memory.jsonl")
+    task_store.init_db()
+    yield task_store
+    task_store.close_connection()
+
+
+def _goal(store, n_tasks: int, budget: int = 50000) -> tuple[Goal, list[Task]]:
+    goal = Goal(title="g", description="d", budget_tokens=budget)
+    store.create_goal(goal)
+    tasks = [Task(goal_id=goal.id, title=f"t{i}", description="d") for i in range(n_tasks)]
+    for task in tasks:
+        store.create_task(task)
+    return goal, tasks
+
+
+def test_budget_is_never_exceeded_by_parallel_tasks(store):
+    goal, _ = _goal(store, 12, budget=350)
+    result = orchestrator.run_goal(goal.id, max_workers=4)
+
+    assert result["status"] == "failed"
+    assert result["tokens_used"] == 300
+    assert result["result"]["reason"].startswith("Token budget exhausted")
+    stored = store.get_goal(goal.id)
+    assert stored.tokens_used == 300
+    with store._conn() as con:
+        assert con.execute("SELECT tokens_reserved FROM goals WHERE id = ?", (goal.id,)).fetchone()[0] == 0
+
+
+def test_task_claimed_by_another_run_is_not_retried(store, monkeypatch):
+    goal, tasks = _goal(store, 3)
+    claims = []
+    claim = orchestrator.claim_task
+
+    def _racing_claim(task):
+        claims.append(task.id)
+        if task.id == tasks[1].id:
+            assert claim(store.get_task(task.id))
+        return claim(task)
+
+    monkeypatch.setattr(orchestrator, "claim_task", _racing_claim)
+    result = orchestrator.run_goal(goal.id, max_workers=2)
+
+    assert claims.count(tasks[1].id) == 1
+    assert result["status"] == "failed"
+    assert result["result"]["reason"] == "1 task(s) claimed by another run"
+    assert [t["status"] for t in result["tasks"]] == ["complete", "claimed", "complete"]
+
+
+def test_task_that_raises_is_failed_and_others_drain(store, monkeypatch):
+    def _execute(task, goal, prior):
+        if task.title == "t1":
+            raise RuntimeError("boom")
+        return {"result": f"Completed {task.title}", "summary": f"{task.title} done", "_tokens": 100}
+
+    monkeypatch.setattr(executor, "execute_task", _execute)
+    goal, tasks = _goal(store, 4)
+    result = orchestrator.run_goal(goal.id, max_workers=4)
+
+    statuses = {t["title"]: t["status"] for t in result["tasks"]}
+    assert statuses == {"t0": "complete", "t1": "failed", "t2": "complete", "t3": "complete"}
+    failed = store.get_task(tasks[1].id)
+    assert failed.status == TaskStatus.failed
+    assert "boom" in failed.error
+
+
+def test_worker_threads_are_reused_across_goals(store, monkeypatch):
+    threads = set()
+
+    def _execute(task, goal, prior):
+        threads.add(threading.get_ident())
+        return {"result": f"Completed {task.title}", "summary": f"{task.title} done", "_tokens": 1}
+
+    monkeypatch.setattr(executor, "execute_task", _execute)
+    for _ in range(3):
+        goal, _ = _goal(store, 4)
+        assert orchestrator.run_goal(goal.id, max_workers=2)["status"] == "complete"
+
+    assert len(threads) <= 2
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import pytest
+
+from aos.engine import task_store
+from aos.engine.schemas import Goal, GoalStatus, MemoryEntry, MemoryType, Task, TaskStatus
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(task_store, "DB_PATH", tmp_path / "aos.db")
+    task_store.init_db()
+    yield task_store
+    task_store.close_connection()
+
+
+def _counters(con) -> dict:
+    return {r["name"]: r["value"] for r in con.execute("SELECT name, value FROM counters") if r["value"]}
+
+
+def _full_scan(con) -> dict:
+    con.execute("SAVEPOINT scan")
+    try:
+        task_store._rebuild_counters(con)
+        return _counters(con)
+    finally:
+        con.execute("ROLLBACK TO scan")
+        con.execute("RELEASE scan")
+
+
+def test_trigger_counters_match_full_scan(store):
+    goals = [Goal(title=f"g{i}", description="d") for i in range(3)]
+    tasks = []
+    for goal in goals:
+        store.create_goal(goal)
+        for j in range(4):
+            task = Task(goal_id=goal.id, title=f"t{j}", description="d")
+            store.create_task(task)
+            tasks.append(task)
+
+    for i, task in enumerate(tasks):
+        assert store.claim_task(task)
+        task.tokens_used = 10 * (i + 1)
+        task.status = TaskStatus.complete if i % 3 else TaskStatus.failed
+        store.update_task(task)
+    tasks[0].tokens_used = 7
+    store.update_task(tasks[0])
+
+    goals[0].status = GoalStatus.complete
+    store.update_goal(goals[0])
+    goals[1].status = GoalStatus.failed
+    store.update_goal(goals[1])
+
+    for i in range(5):
+        store.create_memory_entry(MemoryEntry(type=MemoryType.fact, content={"i": i}))
+
+    with store._conn() as con:
+        con.execute("DELETE FROM tasks WHERE id = ?", (tasks[1].id,))
+        con.execute("DELETE FROM goals WHERE id = ?", (goals[2].id,))
+        con.execute("DELETE FROM memory_entries WHERE id IN (SELECT id FROM memory_entries LIMIT 2)")
+
+    with store._conn() as con:
+        counters = _counters(con)
+        assert counters == _full_scan(con)
+    assert counters["tasks"] == 11
+    assert counters["memory_entries"] == 3
+    assert store.get_metrics_summary()["tokens_total"] == counters["tokens"]